@@ -1,256 +1,1374 @@
 # Ein textbasiertes Adventure-Spiel im Stil der 80er/90er Jahre, inspiriert von "The Matrix"
 # von den Anfängen der Computer- und Hackerkultur.
+import argparse
+import asyncio
+import bisect
+import collections
+import collections.abc
+import contextvars
+import copy
+import cProfile
+import gc
+import gzip
+import hashlib
+import itertools
+import json
+import marshal
+import operator
+import re
 import time
 import textwrap
+import types
+import traceback
+import zlib
 import random
 import sys
 import os
+import select
+import signal
+import socket
+import struct
+import subprocess
+import tempfile
+import threading
 
 # --- Konstanten ---
 WIDTH = 70  # Breite für Textumbruch
 
+# --- Zeitsteuerung ---
+class Clock:
+  """Taktgeber für alle Pausen im Spiel.
+
+  Modi: 'real' wartet wirklich, 'scaled' wartet nur den `scale`-ten Teil
+  (z.B. 10 = zehnmal schneller) und 'instant' wartet gar nicht. In allen
+  Modi zählt `elapsed` die virtuelle Zeit mit, die vergangen wäre.
+  """
+  MODES = ('real', 'scaled', 'instant')
+
+  def __init__(self, mode='real', scale=1.0):
+    self.elapsed = 0.0
+    self.configure(mode, scale)
+
+  def configure(self, mode, scale=1.0):
+    """Stellt Modus und Beschleunigungsfaktor um."""
+    if mode not in self.MODES:
+      raise ValueError(f"Unbekannter Uhr-Modus: {mode!r}")
+    if scale <= 0:
+      raise ValueError("Der Faktor muss groesser als 0 sein.")
+    self.mode = mode
+    self.scale = scale
+
+  def wall_time(self, seconds):
+    """Wie viele echte Sekunden eine virtuelle Pause in diesem Modus dauert."""
+    if self.mode == 'real':
+      return seconds
+    if self.mode == 'scaled':
+      return seconds / self.scale
+    return 0.0
+
+  def sleep(self, seconds):
+    """Pausiert (je nach Modus) und zählt die virtuelle Zeit mit."""
+    if seconds <= 0:
+      return
+    self.elapsed += seconds
+    wall = self.wall_time(seconds)
+    if wall > 0:
+      time.sleep(wall)
+
+clock = Clock() # Alle Pausen im Spiel laufen über diese Uhr
+
+def configure_clock_from_arg(tempo):
+  """Übersetzt '--tempo' (real, instant oder ein Faktor wie 10) in einen Uhr-Modus."""
+  if tempo == 'real':
+    clock.configure('real')
+  elif tempo == 'instant':
+    clock.configure('instant')
+  else:
+    try:
+      factor = float(tempo)
+    except ValueError:
+      raise ValueError(f"Ungueltiges Tempo: {tempo!r}") from None
+    clock.configure('scaled', factor)
+
+# --- Terminal ---
+# Die Spielausgabe markiert "Bildschirm löschen" und Hervorhebungen mit ANSI-
+# Sequenzen. Ein Terminal-Backend übersetzt sie für das jeweilige Ziel: ANSI
+# gibt sie unverändert aus (Terminals, Telnet-Clients), Plain lässt sie weg
+# (Pipes, Dateien) und curses zeichnet in einen Bildschirmpuffer, von dem nur
+# die geänderten Zellen neu übertragen werden. Es wird nie ein Prozess gestartet.
+CLEAR_SCREEN = "\x1b[2J\x1b[H" # Bildschirm löschen, Cursor nach oben links
+RESET_STYLE = "\x1b[0m"
+STYLES = {
+    'titel': "\x1b[1m", # Fett
+    'ort': "\x1b[7m", # Invers
+    'alarm': "\x1b[1;31m", # Fett und rot
+    'nachricht': "\x1b[1;32m", # Fett und grün wie ein alter Monitor
+}
+ANSI_SEQUENCE = re.compile(r'\x1b\[([0-9;]*)([A-Za-z])')
+
+class PlainTerminal:
+  """Nur Text: Steuersequenzen fallen weg (für Pipes, Dateien und schlichte Clients)."""
+  name = 'plain'
+  structured = False # Bekommt typisierte Ereignisse statt Text (siehe emit_event)
+
+  def translate(self, text):
+    """Der Text so, wie er an das Ziel geschickt wird."""
+    return ANSI_SEQUENCE.sub('', text)
+
+  def emit(self, stream, text):
+    """Schreibt einen fertigen Frame (genau ein write/flush)."""
+    stream.write(self.translate(text))
+    stream.flush()
+
+  def key_pressed(self):
+    return _key_pressed()
+
+  def read_line(self, prompt):
+    return input(prompt)
+
+  def close(self):
+    pass
+
+class AnsiTerminal(PlainTerminal):
+  """Gibt die Steuersequenzen unverändert aus."""
+  name = 'ansi'
+
+  def __init__(self):
+    if os.name == 'nt': # Ältere Windows-Konsolen verstehen ANSI erst nach dem Einschalten
+      try:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11) # STD_OUTPUT_HANDLE
+        mode = ctypes.c_ulong()
+        if kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+          kernel32.SetConsoleMode(handle, mode.value | 0x0004) # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+      except (ImportError, AttributeError, OSError):
+        pass
+
+  def translate(self, text):
+    return text
+
+class CursesTerminal(PlainTerminal):
+  """Vollbild über curses mit doppeltem Puffer.
+
+  Alle Ausgaben landen zuerst im virtuellen Bildschirm von curses; doupdate()
+  überträgt danach nur die Zellen, die sich gegenüber dem sichtbaren Bild
+  geändert haben. Löschen leert nur den Puffer, statt neu zu zeichnen.
+  """
+  name = 'curses'
+
+  def __init__(self):
+    import curses
+    import locale
+    locale.setlocale(locale.LC_ALL, '') # Damit Umlaute richtig ankommen
+    self.curses = curses
+    self.screen = curses.initscr()
+    curses.noecho()
+    curses.cbreak()
+    self.screen.scrollok(True)
+    self.screen.idlok(True)
+    self.attributes = {'1': curses.A_BOLD, '7': curses.A_REVERSE}
+    if curses.has_colors():
+      curses.start_color()
+      curses.use_default_colors()
+      curses.init_pair(1, curses.COLOR_RED, -1)
+      curses.init_pair(2, curses.COLOR_GREEN, -1)
+      self.attributes.update({'31': curses.color_pair(1), '32': curses.color_pair(2)})
+    self.attribute = 0 # Aktuelle Hervorhebung
+    self.closed = False
+
+  @property
+  def width(self):
+    return self.screen.getmaxyx()[1]
+
+  def _add(self, text):
+    if text:
+      try:
+        self.screen.addstr(text, self.attribute)
+      except self.curses.error:
+        pass # Schreiben in die allerletzte Zelle meldet curses als Fehler
+
+  def emit(self, stream, text):
+    position = 0
+    for match in ANSI_SEQUENCE.finditer(text):
+      self._add(text[position:match.start()])
+      params, command = match.groups()
+      if command == 'J':
+        self.screen.erase()
+      elif command == 'H':
+        self.screen.move(0, 0)
+      elif command == 'm':
+        for code in params.split(';'):
+          if code in ('', '0'):
+            self.attribute = 0
+          else:
+            self.attribute |= self.attributes.get(code, 0)
+      position = match.end()
+    self._add(text[position:])
+    self.screen.noutrefresh()
+    self.curses.doupdate() # Überträgt nur geänderte Zellen
+
+  def key_pressed(self):
+    self.screen.nodelay(True)
+    try:
+      return self.screen.getch() != -1
+    finally:
+      self.screen.nodelay(False)
+
+  def read_line(self, prompt):
+    self.emit(None, prompt)
+    self.curses.echo()
+    try:
+      return self.screen.getstr().decode('utf-8', errors='replace')
+    finally:
+      self.curses.noecho()
+
+  def close(self):
+    """Wartet auf eine Taste (sonst verschwindet der letzte Bildschirm) und beendet curses."""
+    if self.closed:
+      return
+    self.closed = True
+    try:
+      self.emit(None, "\n-- TASTE DRUECKEN --")
+      self.screen.getch()
+    except (self.curses.error, KeyboardInterrupt):
+      pass
+    self.curses.endwin()
+
+class JsonTerminal(PlainTerminal):
+  """Für Programme statt Menschen: jedes Ereignis als eine kompakte JSON-Zeile.
+
+  Handler melden Ortswechsel, Gegenstände, Alert-Level, Prompts und das
+  Spielende als typisierte Ereignisse (emit_event); aller übrige Text kommt
+  als 'message'. Schreibmaschine und Pausen entfallen, der Client zeigt an.
+  """
+  name = 'json'
+  structured = True
+
+  def translate(self, text):
+    text = ANSI_SEQUENCE.sub('', text).strip('\n')
+    return self.encode_event('message', {'text': text}) if text.strip() else ''
+
+  def encode_event(self, kind, data):
+    return json.dumps({'event': kind, **data}, ensure_ascii=False, separators=(',', ':')) + "\n"
+
+TERMINALS = {'ansi': AnsiTerminal, 'curses': CursesTerminal, 'plain': PlainTerminal, 'json': JsonTerminal}
+
+def default_terminal(stream=None):
+  """ANSI für echte Terminals, sonst reiner Text."""
+  stream = stream or sys.stdout
+  if stream.isatty() and os.environ.get('TERM') != 'dumb':
+    return AnsiTerminal()
+  return PlainTerminal()
+
+# --- Ausgabe ---
+FRAME_TIME = 1 / 20 # Echte Sekunden pro Ausgabe-Frame der Schreibmaschine
+
+def _key_pressed():
+  """Prüft ohne zu blockieren, ob der Spieler eine Taste (bzw. ENTER) gedrückt hat."""
+  try:
+    if os.name == 'nt':
+      import msvcrt
+      if msvcrt.kbhit():
+        msvcrt.getwch()
+        return True
+      return False
+    if not sys.stdin.isatty():
+      return False
+    ready, _, _ = select.select([sys.stdin], [], [], 0)
+    if ready:
+      sys.stdin.readline() # Die Taste "verbrauchen", damit sie kein Befehl wird
+      return True
+  except (OSError, ValueError):
+    pass
+  return False
+
+class TypewriterRenderer:
+  """Schreibmaschinen-Ausgabe, die in Frames statt Zeichen für Zeichen schreibt.
+
+  Statt nach jedem Zeichen zu flushen, sammelt der Renderer so viele Zeichen,
+  wie in einen Frame von `frame_time` Sekunden passen, und schreibt sie mit
+  einem einzigen write/flush. Mit `baud` wird ein Modem emuliert (10 Bit pro
+  Zeichen, z.B. 300, 1200 oder 2400 Baud). Ein Tastendruck während der
+  Animation gibt den Rest des Textes sofort aus.
+  """
+
+  def __init__(self, stream=None, frame_time=FRAME_TIME, baud=None, clock=None, width=WIDTH, terminal=None):
+    self.stream = stream # None = jeweils das aktuelle sys.stdout
+    self.terminal = terminal or default_terminal(stream) # Übersetzt Steuersequenzen für das Ziel
+    self.width = width # Zeilenbreite dieses Clients für den Textumbruch
+    self.frame_time = frame_time
+    self.baud = baud
+    self.clock = clock or globals()['clock']
+    self.pending = [] # Text, der mit dem nächsten Frame geschrieben wird
+    self.transcript = None # Transcript der Sitzung, die gerade über diesen Renderer ausgibt
+
+  def _emit(self, text):
+    """Schreibt einen fertigen Frame (genau ein write/flush)."""
+    self.terminal.emit(self.stream or sys.stdout, text)
+
+  def _emit_encoded(self, data):
+    """Schreibt schon vom Terminal kodierte Daten (z.B. eine JSON-Zeile)."""
+    stream = self.stream or sys.stdout
+    stream.write(data)
+    stream.flush()
+
+  def _wait(self, seconds):
+    """Wartet zwischen zwei Frames."""
+    self.clock.sleep(seconds)
+
+  def _skip_requested(self):
+    """Soll der Rest der aktuellen Animation sofort erscheinen?"""
+    return self.terminal.key_pressed()
+
+  def write(self, text):
+    """Merkt Text für den nächsten Frame vor (ohne Verzögerung)."""
+    self.pending.append(text)
+    if self.transcript is not None:
+      self.transcript.output(text)
+
+  def flush(self):
+    """Schreibt alles Vorgemerkte mit einem einzigen write/flush."""
+    if not self.pending:
+      return
+    self._emit("".join(self.pending))
+    self.pending.clear()
+
+  def pause(self, seconds):
+    """Zeigt alles Vorgemerkte an und wartet dann."""
+    self.flush()
+    if not self.terminal.structured: # Strukturierte Clients bestimmen ihr Tempo selbst
+      self._wait(seconds)
+
+  def event(self, kind, data):
+    """Schickt ein typisiertes Ereignis; vorgemerkter Text geht vorher als eigene Nachricht."""
+    self.flush()
+    self._emit_encoded(self.terminal.encode_event(kind, data))
+
+  def clear(self):
+    """Löscht den Bildschirm (über das Terminal-Backend, ohne externen Prozess)."""
+    self.write(CLEAR_SCREEN)
+    self.flush()
+
+  def type_out(self, text, delay):
+    """Tippt Text mit `delay` Sekunden pro Zeichen (oder Baud-Rate) aus."""
+    if self.terminal.structured: # Ohne Schreibmaschine: eine Nachricht am Stück
+      self.write(text)
+      self.flush()
+      return
+    char_delay = 10 / self.baud if self.baud else delay
+    wall_delay = self.clock.wall_time(char_delay)
+    if wall_delay <= 0:
+      self.write(text)
+      self.flush()
+      self.clock.sleep(len(text) * char_delay)
+      return
+    chars_per_frame = max(1, round(self.frame_time / wall_delay))
+    for start in range(0, len(text), chars_per_frame):
+      if self._skip_requested():
+        self.write(text[start:]) # Rest sofort zeigen
+        self.flush()
+        return
+      chunk = text[start:start + chars_per_frame]
+      self.write(chunk)
+      self.flush()
+      self._wait(len(chunk) * char_delay)
+
+class NullRenderer(TypewriterRenderer):
+  """Verschluckt jede Ausgabe und wartet nie (für die schnelle Wiedergabe)."""
+
+  def write(self, text):
+    pass
+
+  def pause(self, seconds):
+    pass
+
+  def clear(self):
+    pass
+
+  def type_out(self, text, delay):
+    pass
+
+  def event(self, kind, data):
+    pass
+
+renderer = TypewriterRenderer() # Ausgabe für das Spiel im lokalen Terminal
+
+# Der Renderer der gerade laufenden Sitzung. Jede Netzwerk-Verbindung setzt
+# hier ihren eigenen Renderer; asyncio-Tasks haben je einen eigenen Kontext.
+_active_renderer = contextvars.ContextVar('active_renderer', default=renderer)
+
+def current_renderer():
+  """Liefert den Renderer der aktuell laufenden Sitzung."""
+  return _active_renderer.get()
+
+# --- Render-Cache ---
+class RenderCache:
+  """Kleiner LRU-Cache für fertig gerenderten Text.
+
+  Beschreibungen und Ortsbildschirme sind meist statisch; statt sie bei jedem
+  Befehl neu umzubrechen und zusammenzusetzen, werden sie unter einem Schlüssel
+  aus (Text oder Ort, Versionsstand, Breite) gemerkt. Bei mehr als `maxsize`
+  Einträgen fliegt der am längsten nicht benutzte raus.
+  """
+
+  def __init__(self, maxsize):
+    self.maxsize = maxsize
+    self.entries = collections.OrderedDict()
+    self.hits = 0
+    self.misses = 0
+
+  def get(self, key, render):
+    """Liefert den Eintrag zu `key` oder erzeugt ihn mit `render()`."""
+    try:
+      value = self.entries[key]
+    except KeyError:
+      self.misses += 1
+      value = self.entries[key] = render()
+      if len(self.entries) > self.maxsize:
+        self.entries.popitem(last=False)
+      return value
+    self.hits += 1
+    self.entries.move_to_end(key)
+    return value
+
+  def clear(self):
+    self.entries.clear()
+
+WRAP_CACHE = RenderCache(4096) # (Text, Breite) -> umgebrochener Text
+SCREEN_CACHE = RenderCache(2048) # (Ort, Version, Breite, Teil) -> Textblock
+
 # --- Hilfsfunktionen ---
 def clear_screen():
   """Löscht den Bildschirm (funktioniert auf den meisten Systemen)."""
-  os.system('cls' if os.name == 'nt' else 'clear')
+  current_renderer().clear()
+
+def screen_width():
+  """Zeilenbreite des aktuellen Clients."""
+  return current_renderer().width
 
 def wrap_text(text):
-  """Bricht Text für die Konsolenausgabe um."""
-  return "\n".join(textwrap.wrap(text, WIDTH))
+  """Bricht Text für die Konsolenausgabe um (gecacht pro Text und Breite).
+
+  Strukturierte Clients bekommen den Text am Stück und brechen selbst um.
+  """
+  if structured_output():
+    return text
+  width = current_renderer().width
+  return WRAP_CACHE.get((text, width), lambda: "\n".join(textwrap.wrap(text, width)))
 
 def print_slow(text, delay=0.03):
-  """Gibt Text langsam aus, Zeichen für Zeichen."""
-  for char in text:
-    sys.stdout.write(char)
-    sys.stdout.flush()
-    time.sleep(delay)
-  print() # Zeilenumbruch am Ende
+  """Gibt Text langsam aus, Zeichen für Zeichen (gebündelt in Frames)."""
+  out = current_renderer()
+  out.type_out(text, delay)
+  out.write("\n") # Zeilenumbruch am Ende
+
+def print_line(text=""):
+  """Gibt eine Zeile ohne Verzögerung aus (Ersatz für print)."""
+  current_renderer().write(text + "\n")
+
+def print_rule(char="-"):
+  """Gibt eine Linie über die ganze Zeilenbreite aus (nicht an strukturierte Clients, dort ist sie nur Zierde)."""
+  if not structured_output():
+    print_line(char * screen_width())
+
+def print_banner(text, style, delay=0.03):
+  """Gibt eine hervorgehobene Zeile langsam aus (z.B. fett, invers oder rot)."""
+  out = current_renderer()
+  out.write(STYLES[style]) # Steuersequenzen nie tippen, sonst zerreißt sie die Animation
+  out.type_out(text, delay)
+  out.write(RESET_STYLE + "\n")
+
+def pause(seconds):
+  """Zeigt alles bisher Ausgegebene an und wartet dann (über die Spieluhr)."""
+  current_renderer().pause(seconds)
+
+def structured_output():
+  """Bekommt der aktuelle Client typisierte Ereignisse statt Text (--terminal json)?"""
+  return current_renderer().terminal.structured
+
+def emit_event(kind, text=None, **data):
+  """Meldet ein Spielereignis: als JSON-Zeile an strukturierte Clients, sonst nur `text` wie print_slow()."""
+  out = current_renderer()
+  if out.terminal.structured:
+    if text is not None:
+      data['text'] = text
+    out.event(kind, data)
+  elif text is not None:
+    print_slow(text)
+
+async def console_read_line(prompt):
+  """Liest eine Zeile vom lokalen Terminal (Standard-Eingabe einer Sitzung)."""
+  renderer.write(prompt) # Über den Renderer, damit der Prompt auch im Transkript steht
+  renderer.flush()
+  return renderer.terminal.read_line("")
+
+async def read_input(session, prompt):
+  """Zeigt ausstehende Ausgabe an und wartet auf die nächste Zeile des Spielers."""
+  if session.profiler:
+    session.profiler.disable() # Das Warten auf den Spieler gehört nicht ins Profil
+  if structured_output(): # Den Prompt zeigt der Client selbst an
+    emit_event('prompt', text=prompt.strip(), minigame=session.minigame[0] if session.minigame else None)
+    prompt = ""
+  session.at_prompt = True # Jeder Prompt ist ein sicherer Punkt zum Umziehen (auch im Minispiel)
+  try:
+    line = await session.read_line(prompt)
+  finally:
+    session.at_prompt = False
+  if session.transcript:
+    session.transcript.input(line)
+  if session.profiler: # Kann inzwischen per Signal ein- oder ausgeschaltet worden sein
+    session.profiler.enable()
+  session.recording.append(line) # Jede Eingabe, auch in Minispielen, für die Wiedergabe
+  return line
 
 def print_c64_header():
   """Zeigt den C64-Startbildschirm."""
   clear_screen()
-  print_slow("    **** C=64 ZEITMASCHINE ****")
+  print_banner("    **** C=64 ZEITMASCHINE ****", 'titel')
   print_slow(" 64K RAM SYSTEM 38911 BASIC BYTES FREE")
-  print()
+  print_line()
   print_slow("READY.")
-  time.sleep(1)
+  pause(1)
   # Simuliert Laden
   print_slow("LOAD\"*\",8,1")
-  time.sleep(0.5)
+  pause(0.5)
   print_slow("SEARCHING FOR *")
-  time.sleep(1.5)
+  pause(1.5)
   print_slow("LOADING...")
-  time.sleep(2)
+  pause(2)
   print_slow("READY.")
   print_slow("RUN")
-  print("-" * WIDTH)
-  time.sleep(1.5)
+  print_rule()
+  pause(1.5)
   clear_screen()
 
-def get_player_input():
+async def get_player_input(session):
   """Fragt den Spieler nach Eingabe und bereinigt sie."""
-  command = input("\nWAS TUN?> ").strip().upper()
-  return command
+  return (await read_input(session, "\nWAS TUN?> ")).strip().upper()
 
 # --- Spielwelt Daten ---
-
-locations = {
-    'APARTMENT': {
-        'name': 'DEIN APARTMENT',
-        'description': ("EIN SCHLICHTER RAUM MIT EINEM ALTEN BETT, EINEM UEBERLADENEN SCHREIBTISCH "
-                        "UND DEINEM TREUEN HEIMCOMPUTER. DAS FENSTER ZEIGT EINE REGENERISCHE STRASSE. "
-                        "AUF DEM SCHREIBTISCH LIEGT EIN ZETTEL."),
-        'items': ['ZETTEL'],
-        'interactables': ['COMPUTER', 'FENSTER', 'BETT'],
-        'exits': {'RAUS': 'STRASSE'},
-        'details': {
-            'COMPUTER': "DEIN ALTER HEIMCOMPUTER. EIN TURBO-XT Klon. BEREIT FUER BEFEHLE.",
-            'FENSTER': "DU SCHAUST HINAUS AUF DIE NASSE STRASSE. DIE STADT SCHLAEFT NIE.",
-            'BETT': "EIN EINFACHES BETT. NICHT SEHR BEQUEM.",
-            'ZETTEL': "EIN VERGILBTER ZETTEL MIT EINER HANDGESCHRIEBENEN NOTIZ."
-        },
-        'first_visit': True
-    },
-    'STRASSE': {
-        'name': 'STRASSE VOR DEM HAUS',
-        'description': ("DU STEHST AUF DEM NASSEN GEHSTEIG. DER REGEN HAT AUFGEHOERT. LINKS IST EINE TELEFONZELLE, "
-                        "RECHTS GEHT ES ZUM 'CYBER CAFE'. HINTER DIR IST DEIN APARTMENTHAUS."),
-        'items': [],
-        'interactables': ['TELEFONZELLE'],
-        'exits': {'CAFE': 'CAFE', 'ZURUECK': 'APARTMENT', 'TELEFONZELLE': 'TELEFONZELLE_INNERES'},
-        'details': {
-            'TELEFONZELLE': "EINE VERWITTERTE, ALTMODISCHE TELEFONZELLE. SIEHT FUNKTIONSFAEHIG AUS.",
-        }
-    },
-    'CAFE': {
-        'name': 'CYBER CAFE',
-        'description': ("DAS 'CYBER CAFE' IST DUNKEL UND RIECHT NACH ALTEM KAFFEE UND OZON VON DEN MONITOREN. "
-                        "EIN PAAR GESTALTEN SITZEN AN TERMINALS. HINTER DER THEKE STEHT EIN MANN MIT SPIEGELNDER SONNENBRILLE, "
-                        "AUCH NACHTS. DU KANNST ZURUECK AUF DIE STRASSE."),
-        'items': [],
-        'interactables': ['MANN', 'TERMINAL', 'GESTALTEN'], # GESTALTEN hinzugefügt
-        'exits': {'RAUS': 'STRASSE'},
-        'details': {
-             'MANN': "DER MANN POLIERT SEINE SONNENBRILLE. ER MUSTERT DICH KUEHL. 'WAS WILLST DU, NEULING?'",
-             'TERMINAL': "EIN OEFFENTLICHES TERMINAL. KOSTET 1 MARK PRO MINUTE.",
-             'GESTALTEN': "SIE SCHEINEN VERTIEFT IN IHRE ARBEIT ZU SEIN. EINER HAT EIN SILBERNES IMPLANTAT AM HALS." # Kleine Überraschung/Andeutung
-        },
-        'npcs': ['MANN']
-    },
-    'TELEFONZELLE_INNERES': {
-        'name': 'IN DER TELEFONZELLE',
-        'description': ("ES IST ENG HIER DRIN. DAS TELEFON SIEHT ALT AUS, ABER EIN LICHT LEUCHTET. "
-                       "DER HOERER LIEGT NEBEN DEM APPARAT. DU KANNST WIEDER RAUS."),
-        'items': [],
-        'interactables': ['TELEFON', 'HOERER'],
-        'exits': {'RAUS': 'STRASSE'},
-        'details': {
-            'TELEFON': "EIN ALTES WAEHLSCHEIBENTELEFON. EINE GRUENE LED LEUCHTET NEBEN DEM MUENZSCHLITZ.",
-            'HOERER': "DER SCHWARZE HOERER AUS BAKELIT. ER IST NICHT AUFGELEGT."
-        }
-    },
-     'SERVER_FARM_EINGANG': {
-        'name': 'VOR DER SERVER-FARM',
-        'description': "DU STEHST VOR EINEM UNANSEHNLICHEN GEBAEUDE OHNE FENSTER. EINE SCHWERE METALLTUER IST DER EINZIGE EINGANG. NEBEN DER TUER IST EIN KARTENLESER UND EIN NUMPAD.",
-        'items': [],
-        'interactables': ['TUER', 'KARTENLESER', 'NUMPAD'],
-        'exits': {'ZURUECK': 'STRASSE'}, # Annahme: Man kommt von der Strasse hierher (muss noch eingebaut werden, z.B. neue Straße oder Gasse)
-        'details': {
-            'TUER': "EINE SCHWERE, VERSTAERKTE STAHLTUER. KEIN GRIFF VON AUSSEN.",
-            'KARTENLESER': "EIN STANDARD-MAGNETSTREIFENLESER.",
-            'NUMPAD': "EIN NUMPAD ZUR CODE-EINGABE."
-        }
-    },
-    'KANINCHENBAU_FORUM': {
-        'name': 'DAS "KANINCHENBAU" FORUM',
-        'description': "DU BIST IM VERSTECKTEN ONLINE-FORUM 'KANINCHENBAU'. TEXT ZEILEN FLIMMERN UEBER DEN SCHIRM. ES GIBT BEREICHE FUER 'NACHRICHTEN', 'GERUECHTE' UND EINEN PRIVATEN BEREICH DER 'ORACLE'.",
-        'items': [],
-        'interactables': ['NACHRICHTEN', 'GERUECHTE', 'ORACLE'],
-        'exits': {'LOGOUT': 'APARTMENT'}, # Zurück zum Computer im Apartment
-        'details': {
-            'NACHRICHTEN': "'SYSTEM SCAN LAEUFT...', 'NEUE FIREWALL REGELN AKTIV...', 'ACHTUNG: AGENTEN-AKTIVITAET HOCH'",
-            'GERUECHTE': "'HABE EINEN GLITCH GESEHEN...', 'WER IST MORPHEUS?', 'DIE MATRIX HAT DICH...'",
-            'ORACLE': "ZUGANG GESPERRT. BENOETIGT AUTHENTIFIZIERUNG."
-        },
-        'requires_computer': True # Man kann nur vom Computer hierher
-    }
-    # Weitere Orte können hier hinzugefügt werden
-    # Beispiel: Eine Gasse, die zur Serverfarm führt
-    # 'GASSE': { ... }
-    # Dann 'STRASSE': { ... 'exits': {'CAFE': 'CAFE', 'ZURUECK': 'APARTMENT', 'TELEFONZELLE': 'TELEFONZELLE_INNERES', 'GASSE': 'GASSE'}, ...}
-    # Und 'SERVER_FARM_EINGANG': { ... 'exits': {'ZURUECK': 'GASSE'}, ...}
-}
-
-items = {
-    'ZETTEL': {
-        'name': 'ZETTEL',
-        'description': "Eine Notiz mit der Aufschrift: 'PASSWORT HINWEIS: Der erste grosse Film des Regisseurs von 'Bound'. Alles klein geschrieben.'",
-        'location': 'APARTMENT',
-        'can_take': True
-    },
-    'DATEN_DISKETTE': {
-        'name': 'DATEN DISKETTE',
-        'description': "Eine 3.5 Zoll Diskette. Beschriftet mit 'PROTOKOLL 7'.",
-        'location': None, # Startet nicht im Spiel, muss gefunden werden (z.B. nach Hack im Cafe?)
-        'can_take': True
-    },
-    'SCHLUESSELKARTE': {
-        'name': 'SCHLUESSELKARTE',
-        'description': "Eine abgenutzte Magnetstreifenkarte. Sieht aus wie eine Zugangskarte.",
-        'location': None, # Bekommt man vom Mann im Cafe
-        'can_take': True
-    }
-    # Weitere Items
-}
+# Die Welt steht in einer JSON-Datei (Standard: welt.json neben diesem Skript)
+# und wird beim Laden in eine optimierte, geprüfte Form übersetzt.
+WORLD_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'welt.json')
+WORLD_FORMAT = 1 # Version des Dateiformats
+
+class WorldError(ValueError):
+  """Die Weltdefinition ist fehlerhaft (z.B. Ausgang ins Nichts, unerreichbarer Ort)."""
+
+  def __init__(self, problems):
+    self.problems = problems
+    super().__init__("FEHLERHAFTE WELT:\n" + "\n".join(f"- {p}" for p in problems))
+
+_world_serials = itertools.count()
+_NOTHING_CHANGED = {} # Geteilter Platzhalter für noch leere Overlays (wird nie beschrieben)
+_NOTHING_MOVED = frozenset()
+_EMPTY = types.MappingProxyType({}) # Standardwert für fehlende Tabellen (Ausgänge, Details)
+
+class FrozenEntry:
+  """Eingefrorene Vorlage der Welt: jedes Schreiben wirft TypeError."""
+  __slots__ = ()
+
+  def __setattr__(self, name, value):
+    raise TypeError(f"{type(self).EDITABLE.__name__} der Welt ist schreibgeschützt")
+
+class WorldEntry:
+  """Gemeinsame Grundlage von Location und Item: feste Felder statt eines dicts.
+
+  FIELDS bildet jedes Feld auf seinen Standardwert ab, falls es in der
+  Weltdatei fehlt. freeze() macht aus einem Eintrag eine Vorlage der Welt
+  (Klasse FROZEN, Tabellen darin werden schreibgeschützte Sichten); copy()
+  liefert wieder einen veränderbaren Eintrag (Klasse EDITABLE) für eine Sitzung.
+  """
+  __slots__ = ()
+  FIELDS = {}
+
+  def __init_subclass__(cls, **kwargs):
+    super().__init_subclass__(**kwargs)
+    if not issubclass(cls, FrozenEntry):
+      cls.EDITABLE = cls
+      cls.FROZEN = type(f"Frozen{cls.__name__}", (FrozenEntry, cls), {'__slots__': ()})
+
+  def __init__(self, **fields):
+    for name, default in self.FIELDS.items():
+      setattr(self, name, fields.get(name, default))
+
+  def __repr__(self):
+    fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.FIELDS)
+    return f"{type(self).__name__}({fields})"
+
+  def freeze(self):
+    """Friert den Eintrag ein (Tabellen werden zu schreibgeschützten Sichten)."""
+    for name in self.FIELDS:
+      value = getattr(self, name)
+      if isinstance(value, dict):
+        setattr(self, name, types.MappingProxyType(value))
+    self.__class__ = self.FROZEN
+    return self
+
+  def copy(self):
+    """Eine veränderbare Kopie; Tabellen werden mitkopiert."""
+    entry = object.__new__(self.EDITABLE)
+    for name in self.FIELDS:
+      value = getattr(self, name)
+      if isinstance(value, (dict, types.MappingProxyType)):
+        value = value.copy() # Bei schreibgeschützten Sichten eine Kopie des dicts darunter
+      setattr(entry, name, value)
+    return entry
+
+class Location(WorldEntry):
+  """Ein Ort der Welt."""
+  __slots__ = ('name', 'description', 'exits', 'interactables', 'details', 'npcs', 'requires_computer',
+               'first_visit')
+  FIELDS = {
+      'name': None,
+      'description': None,
+      'exits': _EMPTY, # Ausgangsname -> Zielort
+      'interactables': (), # Was sich hier anschauen und benutzen lässt, in Anzeigereihenfolge
+      'details': _EMPTY, # Name -> Beschreibung
+      'npcs': (),
+      'requires_computer': False, # Nur über den Computer zu betreten
+      'first_visit': False, # Beim ersten Betreten kommt die erste Nachricht
+  }
+
+class Item(WorldEntry):
+  """Ein Gegenstand der Welt; `location` ist nur sein Startort (siehe ItemPlacement)."""
+  __slots__ = ('name', 'description', 'location', 'can_take', 'read_text')
+  FIELDS = {
+      'name': None,
+      'description': None,
+      'location': None,
+      'can_take': False,
+      'read_text': None, # Eigener Text für LIES (sonst die Beschreibung)
+  }
+
+class World:
+  """Eine kompilierte, unveränderliche Spielwelt.
+
+  `locations` und `items` sind eingefrorene Location- bzw. Item-Objekte; alle
+  Sitzungen eines Prozesses lesen dieselben und kopieren nur, was sie ändern
+  (siehe WorldOverlay). Daneben hält die Welt vorberechnete Tabellen, die sich
+  nie ändern und deshalb ebenfalls geteilt werden: `go_targets[ort]` bildet
+  Ausgangsnamen UND Zielorte auf das Ziel ab ("GEHE RAUS" wie "GEHE CAFE"),
+  `npcs[ort]` ist die Menge der NPCs, `start_where`/`start_at` die
+  Startverteilung der Gegenstände.
+  """
+
+  def __init__(self, locations, items, start_location, fingerprint=0):
+    self.locations = locations
+    self.fingerprint = fingerprint # CRC32 der Weltdaten; Spielstände passen nur zur gleichen Welt
+    self.items = items
+    self.start_location = start_location
+    self.serial = next(_world_serials) # Unterscheidet Welten im Render-Cache
+    self.go_targets = {}
+    self.npcs = {}
+    for loc_id, location in locations.items():
+      targets = {dest_id: dest_id for dest_id in location.exits.values()}
+      targets.update(location.exits) # Ausgangsnamen haben Vorrang
+      self.go_targets[loc_id] = targets
+      self.npcs[loc_id] = frozenset(location.npcs)
+    self.start_where = {item_id: item.location for item_id, item in items.items()} # Nur der Startort
+    self.start_at = {}
+    for item_id, loc_id in self.start_where.items():
+      if loc_id is not None:
+        self.start_at.setdefault(loc_id, {})[item_id] = None
+    self.pursuit = None # Wegetabelle der Agenten, erst bei Bedarf (siehe pursuit_table)
+
+def _intern_keys(mapping):
+  """Interniert die Schlüssel (IDs) eines dicts, damit Vergleiche nur Zeiger vergleichen."""
+  return {sys.intern(key): value for key, value in mapping.items()}
+
+def compile_world(data):
+  """Prüft eine eingelesene Weltdefinition und übersetzt sie in ein World-Objekt.
+
+  Alle Fehler werden gesammelt und zusammen als WorldError gemeldet, damit
+  kaputte Welten gar nicht erst ins Spiel kommen.
+  """
+  problems = []
+  fingerprint = zlib.crc32(json.dumps(data, sort_keys=True).encode('utf-8'))
+  if data.get('format') != WORLD_FORMAT:
+    raise WorldError([f"UNBEKANNTES FORMAT {data.get('format')!r} (ERWARTET {WORLD_FORMAT})"])
+  locations = _intern_keys(data.get('locations', {}))
+  items = _intern_keys(data.get('items', {}))
+  start = sys.intern(data.get('start_location', ''))
+  if start not in locations:
+    problems.append(f"STARTORT '{start}' EXISTIERT NICHT")
+
+  for loc_id, location in locations.items():
+    for field in location.keys() - Location.FIELDS.keys():
+      problems.append(f"ORT '{loc_id}': UNBEKANNTES FELD '{field}'")
+    for field in ('name', 'description'):
+      if not isinstance(location.get(field), str):
+        problems.append(f"ORT '{loc_id}': FELD '{field}' FEHLT")
+    location['exits'] = {sys.intern(name): sys.intern(dest)
+                         for name, dest in location.get('exits', {}).items()}
+    for name, dest in location['exits'].items():
+      if dest not in locations:
+        problems.append(f"ORT '{loc_id}': AUSGANG '{name}' FUEHRT INS NICHTS ('{dest}')")
+    location['interactables'] = tuple(sys.intern(thing) for thing in location.get('interactables', ()))
+    location['details'] = _intern_keys(location.get('details', {}))
+    location['npcs'] = tuple(sys.intern(npc) for npc in location.get('npcs', ()))
+    for npc in location['npcs']:
+      if npc not in location['interactables']:
+        problems.append(f"ORT '{loc_id}': NPC '{npc}' FEHLT IN 'interactables'")
+
+  for item_id, item in items.items():
+    for field in item.keys() - Item.FIELDS.keys():
+      problems.append(f"GEGENSTAND '{item_id}': UNBEKANNTES FELD '{field}'")
+    if not isinstance(item.get('description'), str):
+      problems.append(f"GEGENSTAND '{item_id}': FELD 'description' FEHLT")
+    if item.get('location') is not None:
+      item['location'] = sys.intern(item['location'])
+      if item['location'] not in locations:
+        problems.append(f"GEGENSTAND '{item_id}': STARTORT '{item['location']}' EXISTIERT NICHT")
+
+  # Erreichbarkeit: vom Startort über Ausgänge; Orte mit 'requires_computer'
+  # betritt man über den Computer, sie zählen deshalb ebenfalls als Einstieg.
+  if start in locations:
+    reached = set()
+    todo = [start] + [loc_id for loc_id, location in locations.items() if location.get('requires_computer')]
+    while todo:
+      loc_id = todo.pop()
+      if loc_id in reached or loc_id not in locations:
+        continue
+      reached.add(loc_id)
+      todo.extend(locations[loc_id]['exits'].values())
+    for loc_id in locations:
+      if loc_id not in reached:
+        problems.append(f"ORT '{loc_id}' IST UNERREICHBAR (KEIN AUSGANG FUEHRT DORTHIN)")
+
+  if problems:
+    raise WorldError(problems)
+  locations = {loc_id: Location(**location).freeze() for loc_id, location in locations.items()}
+  items = {item_id: Item(**item).freeze() for item_id, item in items.items()}
+  return World(locations, items, start, fingerprint)
+
+def load_world(path=WORLD_FILE):
+  """Liest eine Weltdatei (JSON) und kompiliert sie."""
+  with open(path, encoding='utf-8') as f:
+    return compile_world(json.load(f))
+
+WORLD = load_world() # Die Standardwelt, geteilt von allen Sitzungen
 
 # --- Spielzustand ---
+# Alle Ja/Nein-Fortschritte einer Partie liegen als Bits in einer einzigen Zahl
+# (GameState.flags). Die Reihenfolge in GAME_FLAGS legt die Bits fest und steht
+# so auch in Spielständen - neue Flags deshalb nur hinten anhängen.
+GAME_FLAGS = (
+    'computer_logged_in',
+    'apartment_password_cracked',
+    'oracle_contacted',
+    'met_cypher',
+    'phone_ringing', # Überraschung: Das Telefon könnte klingeln
+    'first_message_received',
+    'server_farm_hacked', # Erfolgreicher Port-Scan
+    'server_farm_card_used', # Karte am Leser benutzt
+    'server_farm_code_correct', # Korrekter Code eingegeben
+    'server_farm_access_granted', # Karte UND Code korrekt
+    'diskette_received', # Um zu verhindern, dass die Diskette mehrmals gegeben wird
+    'diskette_read', # Weiss von der Telefonzelle
+)
+_LATE_FLAGS = frozenset({'diskette_read'}) # Standen früher erst im Zustand, sobald sie gesetzt waren
+
+class Flag:
+  """Ein Flag als Attribut von GameState: liest und setzt ein Bit in `flags`."""
+  __slots__ = ('name', 'bit')
+
+  def __init__(self, name, bit):
+    self.name = name
+    self.bit = bit
+
+  def __get__(self, state, owner=None):
+    if state is None:
+      return self
+    return state.flags & self.bit != 0
+
+  def __set__(self, state, value):
+    if value:
+      state.flags |= self.bit
+    else:
+      state.flags &= ~self.bit
+
+class GameState:
+  """Der Spielzustand einer Sitzung: wenige feste Felder, dazu alle Flags als Bitmenge.
+
+  Die Flags aus GAME_FLAGS sind Attribute wie die Felder
+  (`state.met_cypher = True`). `key()` ist ein hashbarer Fingerabdruck des
+  ganzen Zustands; Löser, Ereignisse und Vergleiche brauchen dafür keine
+  Kopie.
+  """
+  __slots__ = ('flags', 'current_location', 'alert_level', 'known_codeword', 'decrypted_message_content',
+               'server_farm_access_code')
+
+  def __init__(self, current_location=None):
+    self.flags = 0
+    self.current_location = current_location # Wird beim Start auf den Startort der Welt gesetzt
+    self.alert_level = 0 # 0 = niedrig, 7 = sehr hoch (Game Over)
+    self.known_codeword = None # Für die erste Nachricht
+    self.decrypted_message_content = None
+    self.server_farm_access_code = "1999" # Beispiel-Code, wird ggf. im Spiel 'entdeckt'
+
+  def key(self):
+    """Der ganze Zustand als Tupel (Flags zuerst, Reihenfolge wie __slots__)."""
+    return _state_key(self)
+
+  def copy(self):
+    state = GameState.__new__(GameState)
+    state.restore_key(self.key())
+    return state
+
+  def restore_key(self, key):
+    """Gegenstück zu key()."""
+    for field, value in zip(GameState.__slots__, key):
+      setattr(self, field, value)
+
+  def changed(self, key):
+    """Namen der Felder und Flags, die sich seit einem früheren key() geändert haben (None = alle)."""
+    if key is None:
+      return GameState.__slots__[1:] + GAME_FLAGS
+    names = [field for field, old, new in zip(GameState.__slots__[1:], key[1:], self.key()[1:]) if old != new]
+    bits = key[0] ^ self.flags
+    if bits:
+      names += [name for index, name in enumerate(GAME_FLAGS) if bits >> index & 1]
+    return names
+
+  def diff(self):
+    """Was vom Anfangszustand abweicht, als {Name: Wert} (Flags zusammen als 'flags')."""
+    initial = _INITIAL_STATE_KEY
+    return {field: value for field, value, original in zip(GameState.__slots__, self.key(), initial)
+            if value != original}
+
+  def update(self, diff):
+    """Setzt Felder und Flags nach Namen (Gegenstück zu diff(), auch einzelne Flags)."""
+    for name, value in diff.items():
+      if name not in GameState.__slots__ and name not in GAME_FLAGS:
+        raise KeyError(name)
+      setattr(self, name, value)
+
+  def as_dict(self):
+    """Der Zustand als dict mit einem Eintrag je Feld und Flag (Format der Prüfsummen)."""
+    state = {field: getattr(self, field) for field in GameState.__slots__[1:]}
+    for name in GAME_FLAGS:
+      value = getattr(self, name)
+      if value or name not in _LATE_FLAGS:
+        state[name] = value
+    return state
+
+for _bit, _name in enumerate(GAME_FLAGS):
+  setattr(GameState, _name, Flag(_name, 1 << _bit))
+del _bit, _name
+_state_key = operator.attrgetter(*GameState.__slots__)
+_INITIAL_STATE_KEY = GameState().key()
+
+# --- Gegenstände ---
+INVENTORY = '@INVENTAR' # Pseudo-Ort im Platzierungsindex: Gegenstände, die der Spieler trägt
+
+class ItemPlacement:
+  """Index, wo welcher Gegenstand liegt - in beide Richtungen.
+
+  `where` bildet Gegenstand -> Ort ab (None = nicht im Spiel), `at` Ort ->
+  Gegenstände dort. Die Gegenstände eines Ortes sind ein dict als geordnete
+  Menge, damit Anzeigen ihre Reihenfolge behalten. Das Inventar ist der
+  Pseudo-Ort INVENTORY; jede Bewegung läuft über `move()`. Gespeichert werden
+  nur Abweichungen von der Startverteilung der Welt (copy-on-write): bewegte
+  Gegenstände und die Orte, deren Inhalt sich geändert hat.
+  """
+  __slots__ = ('start_where', 'start_at', 'moved_to', 'changed_at', 'on_change', 'moved')
+
+  def __init__(self, start_where, start_at, on_change=None):
+    self.start_where = start_where # Geteilt von allen Sitzungen, wird nie verändert
+    self.start_at = start_at
+    self.moved_to = _NOTHING_CHANGED # Gegenstand -> Ort, nur für bewegte Gegenstände
+    self.changed_at = _NOTHING_CHANGED # Ort -> eigene Gegenstände, nur für Orte mit geändertem Inhalt
+    self.on_change = on_change # Wird mit jedem betroffenen Ort aufgerufen
+    self.moved = _NOTHING_MOVED # Gegenstände, die seit dem Start bewegt wurden (für Spielstände)
+
+  @property
+  def where(self):
+    """Gegenstand -> Ort für alle Gegenstände (zusammengesetzte Sicht, nur zum Lesen)."""
+    return collections.ChainMap(self.moved_to, self.start_where)
+
+  @property
+  def at(self):
+    """Ort -> Gegenstände dort (zusammengesetzte Sicht, nur zum Lesen)."""
+    return collections.ChainMap(self.changed_at, self.start_at)
+
+  def location_of(self, item_id):
+    """Wo liegt der Gegenstand? (None = nicht im Spiel)"""
+    moved_to = self.moved_to
+    return moved_to[item_id] if item_id in moved_to else self.start_where.get(item_id)
+
+  def _own_bucket(self, loc_id):
+    """Die eigene, veränderbare Gegenstandsliste eines Ortes (beim ersten Mal kopiert)."""
+    if self.changed_at is _NOTHING_CHANGED:
+      self.changed_at = {}
+    bucket = self.changed_at.get(loc_id)
+    if bucket is None:
+      bucket = self.changed_at[loc_id] = dict(self.start_at.get(loc_id, ()))
+    return bucket
+
+  def move(self, item_id, loc_id):
+    """Legt einen Gegenstand an einen Ort (oder mit None aus dem Spiel)."""
+    if self.moved is _NOTHING_MOVED:
+      self.moved = set()
+    self.moved.add(item_id)
+    old_loc = self.location_of(item_id)
+    if old_loc is not None:
+      del self._own_bucket(old_loc)[item_id]
+      if self.on_change:
+        self.on_change(old_loc)
+    if self.moved_to is _NOTHING_CHANGED:
+      self.moved_to = {}
+    self.moved_to[item_id] = loc_id
+    if loc_id is not None:
+      self._own_bucket(loc_id)[item_id] = None
+      if self.on_change:
+        self.on_change(loc_id)
+
+  def moves(self):
+    """Die bewegten Gegenstände mit Ziel: je Ort in der Reihenfolge dort, aus dem Spiel genommene zuletzt.
+
+    Auf der Startverteilung in dieser Reihenfolge nachgespielt, ergibt sich
+    genau die jetzige Verteilung samt Reihenfolge (Inventar!), unabhängig von
+    der Hash-Reihenfolge der Menge `moved`.
+    """
+    moved = self.moved
+    order = [(item_id, loc_id) for loc_id, bucket in self.changed_at.items()
+             for item_id in bucket if item_id in moved]
+    order += sorted((item_id, None) for item_id in moved if self.moved_to[item_id] is None)
+    return order
+
+  def items_at(self, loc_id):
+    """Die Gegenstände an einem Ort (in Einfügereihenfolge)."""
+    bucket = self.changed_at.get(loc_id)
+    if bucket is None:
+      bucket = self.start_at.get(loc_id, _NOTHING_CHANGED)
+    return bucket.keys()
+
+  def is_at(self, item_id, loc_id):
+    """Liegt der Gegenstand an diesem Ort?"""
+    bucket = self.changed_at.get(loc_id)
+    if bucket is None:
+      bucket = self.start_at.get(loc_id, ())
+    return item_id in bucket
+
+# --- Spielsitzung ---
+class SessionRandom(random.Random):
+  """Der Zufallsgenerator einer Sitzung."""
+
+  def one_in(self, n):
+    """Trifft mit der Chance 1 zu n zu."""
+    return self.randint(1, n) == 1
+
+SAVE_DIR = 'spielstaende' # Verzeichnis für SPEICHERN/LADEN im lokalen Spiel
+_location_versions = itertools.count(1) # Prozessweit eindeutige Versionsnummern für veränderte Orte
+
+class WorldOverlay(collections.abc.Mapping):
+  """Copy-on-write-Sicht einer Sitzung auf die Orte oder Gegenstände der Welt.
+
+  Gelesen wird aus den eingefrorenen Vorlagen der Welt, die sich alle
+  Sitzungen teilen (schreibgeschützt: versehentliches Schreiben wirft
+  TypeError). Erst `edit()` legt eine eigene Kopie eines Eintrags an.
+  """
+  __slots__ = ('template', 'own')
+
+  def __init__(self, template):
+    self.template = template # ID -> eingefrorene Location bzw. Item
+    self.own = _NOTHING_CHANGED # ID -> eigene Kopie, nur für geänderte Einträge
+
+  def __getitem__(self, key):
+    entry = self.own.get(key)
+    return self.template[key] if entry is None else entry
+
+  def __contains__(self, key):
+    return key in self.template
+
+  def __iter__(self):
+    return iter(self.template)
+
+  def __len__(self):
+    return len(self.template)
+
+  def edit(self, key):
+    """Die eigene, veränderbare Kopie eines Eintrags."""
+    entry = self.own.get(key)
+    if entry is None:
+      if self.own is _NOTHING_CHANGED:
+        self.own = {}
+      entry = self.own[key] = self.template[key].copy()
+    return entry
+
+  def revert(self, key):
+    """Verwirft die eigene Kopie eines Eintrags; danach gilt wieder die Vorlage."""
+    self.own.pop(key, None)
+
+  def put(self, key, entry):
+    """Übernimmt eine schon fertige eigene Kopie eines Eintrags (z.B. aus einem Spielstand)."""
+    if self.own is _NOTHING_CHANGED:
+      self.own = {}
+    self.own[key] = entry
+
+class GameSession:
+  """Eine laufende Partie mit eigenem Spielzustand und eigener Sicht auf die Welt.
+
+  Alle Handler bekommen die Sitzung übergeben und verändern nur deren Daten,
+  so dass beliebig viele Spieler in einem Prozess nebeneinander spielen können.
+  Orte und Gegenstände liest die Sitzung aus der geteilten Welt; was sie ändert,
+  geht über edit_location()/edit_item() in ihre eigenen Kopien.
+  """
+
+  def __init__(self, read_line=console_read_line, world=None, save_dir=SAVE_DIR, seed=None, record_dir=None,
+               admin=False):
+    self.read_line = read_line # async (prompt) -> Zeile; Terminal oder Netzwerk
+    self.world = world or WORLD
+    self.seed = seed if seed is not None else random.getrandbits(32)
+    self.rng = SessionRandom(self.seed) # Eigener Zufall pro Sitzung, damit sie sich nachspielen lässt
+    self.recording = [] # Alle Eingaben der Sitzung in Reihenfolge
+    self.record_dir = record_dir # Wohin die Aufzeichnung am Ende geschrieben wird (None = nirgends)
+    self.save_dir = save_dir # None = Spielstände nur im Speicher (z.B. im Server)
+    self.save_slots = {}
+    self.game_state = GameState(self.world.start_location)
+    self.locations = WorldOverlay(self.world.locations)
+    self.items = WorldOverlay(self.world.items)
+    self.placement = ItemPlacement(self.world.start_where, self.world.start_at, on_change=self.touch)
+    self.versions = {} # Ort -> Versionsstand für den Render-Cache (0 = unverändert)
+    self.touched_items = set() # Gegenstände mit geänderten Feldern (z.B. ZETTEL-Text)
+    self.admin = admin # Darf MESSUNG und PROFIL benutzen (nur das lokale Spiel)
+    self.profiler = None # cProfile.Profile, solange diese Sitzung profiliert wird
+    self.triggers = TriggerState() # Welche Ereignisse gerade eintreten können
+    self.client = None # Gegenstelle, z.B. 'IP:PORT' im Server (für Transkripte)
+    self.transcript = None # Transcript, solange Transkripte geschrieben werden
+    self.at_prompt = False # Wartet die Sitzung gerade auf eine Eingabe (sicherer Punkt zum Umziehen)
+    self.minigame = None # Zustand des laufenden Minispiels (siehe MINIGAMES) oder None
+    self.pending_tick = None # Von der Weltuhr gemeldete, noch nicht angezeigte Alert-Änderung
+
+  def touch(self, loc_id):
+    """Markiert einen Ort als verändert, damit gecachte Bildschirme neu gerendert werden.
+
+    Die Versionen kommen aus einem prozessweiten Zähler; unveränderte Orte
+    haben in allen Sitzungen Version 0 und teilen sich ihre Cache-Einträge.
+    """
+    self.versions[loc_id] = next(_location_versions)
+
+  def touch_item(self, item_id):
+    """Merkt sich, dass Felder eines Gegenstands geändert wurden."""
+    self.touched_items.add(item_id)
+
+  def edit_location(self, loc_id):
+    """Ein Ort zum Ändern: die eigene Kopie der Sitzung (gilt ab jetzt als verändert)."""
+    self.touch(loc_id)
+    return self.locations.edit(loc_id)
+
+  def edit_item(self, item_id):
+    """Ein Gegenstand zum Ändern: die eigene Kopie der Sitzung (gilt ab jetzt als verändert)."""
+    self.touch_item(item_id)
+    return self.items.edit(item_id)
+
+  @property
+  def inventory(self):
+    """Was der Spieler bei sich trägt (Mitgliedschaft in O(1))."""
+    return self.placement.items_at(INVENTORY)
+
+# --- Spielstände ---
+# Ein Spielstand enthält nur die Abweichungen von der unberührten Welt:
+# geänderte Zustandswerte, bewegte Gegenstände und geänderte Felder von Orten
+# und Gegenständen, dazu der Zustand eines laufenden Minispiels. Aufbau: Kopf
+# (Kennung, Formatversion, Prüfsumme der Welt), dahinter die Abweichungen als
+# marshal-Daten (Format 4). Version 1 kannte noch keine Minispiele.
+SNAPSHOT_MAGIC = b'MXSV'
+SNAPSHOT_VERSION = 2
+SNAPSHOT_VERSIONS = (1, 2) # Lesbare Formate
+_SNAPSHOT_HEADER = struct.Struct('>4sBI')
+_MISSING = object()
+
+class SnapshotError(ValueError):
+  """Der Spielstand ist beschädigt, veraltet oder gehört zu einer anderen Welt."""
+
+def _field_diff(current, template):
+  """Felder, die von der Vorlage abweichen; bei Tabellen (z.B. 'details') nur die geänderten Schlüssel."""
+  diff = {}
+  for key in current.FIELDS:
+    value = getattr(current, key)
+    original = getattr(template, key)
+    if value == original:
+      continue
+    if isinstance(value, dict) and isinstance(original, collections.abc.Mapping):
+      diff[key] = {k: v for k, v in value.items() if original.get(k, _MISSING) != v}
+    else:
+      diff[key] = value
+  return diff
+
+def _apply_field_diff(target, diff):
+  """Gegenstück zu _field_diff: schreibt die Abweichungen in eine frische Kopie."""
+  for key, value in diff.items():
+    if key not in target.FIELDS:
+      raise SnapshotError(f"UNBEKANNTES FELD '{key}' IM SPIELSTAND")
+    if isinstance(value, dict) and isinstance(getattr(target, key), dict):
+      getattr(target, key).update(value)
+    else:
+      setattr(target, key, value)
+
+def save_snapshot(session):
+  """Speichert den Stand einer Sitzung als kompakte Bytes (nur Abweichungen von der Welt)."""
+  world = session.world
+  state_diff = session.game_state.diff()
+  placement = dict(session.placement.moves()) # Geordnet wie die Orte selbst, siehe ItemPlacement.moves()
+  location_diffs = {}
+  for loc_id in session.versions: # Nur Orte, an denen sich etwas geändert hat
+    if loc_id in world.locations:
+      diff = _field_diff(session.locations[loc_id], world.locations[loc_id])
+      if diff:
+        location_diffs[loc_id] = diff
+  item_diffs = {}
+  for item_id in session.touched_items:
+    diff = _field_diff(session.items[item_id], world.items[item_id])
+    if diff:
+      item_diffs[item_id] = diff
+  payload = marshal.dumps((state_diff, placement, location_diffs, item_diffs, session.minigame), 4)
+  return _SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, world.fingerprint) + payload
+
+def _patched_copy(template, diff):
+  """Eine eigene Kopie von `template` mit den Abweichungen aus einem Spielstand."""
+  entry = template.copy()
+  _apply_field_diff(entry, diff)
+  return entry
+
+def restore_snapshot(session, data):
+  """Setzt eine Sitzung auf einen mit save_snapshot() gespeicherten Stand.
+
+  Der Spielstand wird zuerst vollständig gelesen und geprüft; erst dann wird
+  die Sitzung geändert. Ein fehlerhafter Spielstand (SnapshotError) lässt sie
+  also unverändert. Zurückgesetzt werden nur Orte und Gegenstände, die in der
+  Sitzung oder im Spielstand verändert sind - der Rest der Welt bleibt unangetastet.
+  """
+  world = session.world
+  if len(data) < _SNAPSHOT_HEADER.size:
+    raise SnapshotError("SPIELSTAND IST ZU KURZ")
+  magic, version, fingerprint = _SNAPSHOT_HEADER.unpack_from(data)
+  if magic != SNAPSHOT_MAGIC:
+    raise SnapshotError("KEIN SPIELSTAND")
+  if version not in SNAPSHOT_VERSIONS:
+    raise SnapshotError(f"SPIELSTAND-FORMAT {version} WIRD NICHT UNTERSTUETZT")
+  if fingerprint != world.fingerprint:
+    raise SnapshotError("SPIELSTAND GEHOERT ZU EINER ANDEREN WELT")
+  try:
+    payload = marshal.loads(data[_SNAPSHOT_HEADER.size:])
+    if version == 1:
+      payload += (None,)
+    state_diff, placement, location_diffs, item_diffs, minigame = payload
+    game_state = GameState(world.start_location)
+    game_state.update(state_diff) # Ältere Spielstände nennen die Flags einzeln
+    locations = {loc_id: _patched_copy(world.locations[loc_id], diff) for loc_id, diff in location_diffs.items()}
+    items = {item_id: _patched_copy(world.items[item_id], diff) for item_id, diff in item_diffs.items()}
+    moves = list(placement.items()) # In gespeicherter Reihenfolge, siehe ItemPlacement.moves()
+    for item_id, loc_id in moves:
+      if item_id not in world.items or not (loc_id is None or loc_id == INVENTORY or loc_id in world.locations):
+        raise SnapshotError(f"UNBEKANNTER GEGENSTAND ODER ORT IM SPIELSTAND: {item_id!r} -> {loc_id!r}")
+  except SnapshotError:
+    raise
+  except (EOFError, ValueError, TypeError, KeyError, AttributeError):
+    raise SnapshotError("SPIELSTAND IST BESCHAEDIGT") from None
+  if minigame is not None and not (isinstance(minigame, tuple) and minigame and minigame[0] in MINIGAMES):
+    raise SnapshotError("UNBEKANNTES MINISPIEL IM SPIELSTAND")
+
+  # Ab hier kann nichts mehr schiefgehen
+  session.game_state = game_state
+  session.minigame = minigame
+
+  for loc_id in set(session.versions) | set(locations):
+    if loc_id in world.locations:
+      session.locations.revert(loc_id)
+      if loc_id in locations:
+        session.touch(loc_id)
+        session.locations.put(loc_id, locations[loc_id])
+      else:
+        session.versions.pop(loc_id, None) # Wieder unverändert; bewegte Gegenstände melden sich unten selbst
 
-game_state = {
-    'current_location': 'APARTMENT',
-    'player_inventory': [],
-    'alert_level': 0, # 0 = niedrig, 7 = sehr hoch (Game Over)
-    'known_codeword': None, # Für die erste Nachricht
-    'computer_logged_in': False,
-    'decrypted_message_content': None,
-    'apartment_password_cracked': False,
-    'oracle_contacted': False,
-    'met_cypher': False,
-    'phone_ringing': False, # Überraschung: Das Telefon könnte klingeln
-    'first_message_received': False,
-    'server_farm_access_code': "1999", # Beispiel-Code, wird ggf. im Spiel 'entdeckt'
-    'server_farm_hacked': False, # Flag für erfolgreichen Port-Scan
-    'server_farm_card_used': False, # Flag für Benutzung der Karte am Leser
-    'server_farm_code_correct': False, # Flag für korrekte Code-Eingabe
-    'server_farm_access_granted': False, # Flag wenn Karte UND Code korrekt
-    'diskette_received': False # Um zu verhindern, dass die Diskette mehrmals gegeben wird
-}
+  for item_id in session.touched_items | set(items):
+    session.items.revert(item_id)
+    if item_id in items:
+      session.items.put(item_id, items[item_id])
+  session.touched_items = set(items)
+
+  # Von der Startverteilung aus nachspielen, damit auch die Reihenfolge an jedem Ort stimmt
+  session.placement = ItemPlacement(world.start_where, world.start_at, on_change=session.touch)
+  for item_id, loc_id in moves:
+    session.placement.move(item_id, loc_id)
 
 # --- Parser & Befehlsverarbeitung ---
+PREPOSITIONS = ('MIT', 'AN', 'AUF') # Trennen direktes und indirektes Objekt
+ARTICLES = ('DER', 'DIE', 'DAS', 'DEN', 'DEM', 'EIN', 'EINE', 'EINEN') # Werden am Objektanfang ignoriert
+
+# Ein fertig geparster Befehl. `verb` ist das kanonische Verb (None, wenn unbekannt),
+# `word` das tatsächlich eingegebene Verb, `obj`/`indirect` die normalisierten Objekte
+# vor bzw. nach der Präposition `prep` und `args` alle Wörter nach dem Verb.
+Command = collections.namedtuple('Command', 'verb word obj prep indirect args')
+
+CODE_TARGETS = ('NACHRICHT', 'SERVER', 'PORTS', 'NETZWERK') # Ziele, die nur im Code stehen, nicht in der Welt
+
+COMMANDS = {} # Alias (ein Wort) -> kanonisches Verb
+MULTIWORD_COMMANDS = {} # Erstes Wort -> [(Wörter, kanonisches Verb)], längste zuerst
+COMMAND_HANDLERS = {} # Kanonisches Verb -> Handler(session, cmd)
+
+def command(verb, *aliases):
+  """Dekorator: registriert einen Handler für ein Verb und seine Aliase.
+
+  Aliase mit Leerzeichen (z.B. 'REDE MIT') landen in der Tabelle für
+  mehrteilige Verben und werden beim Parsen per Längster-Treffer erkannt.
+  """
+  def register(handler):
+    COMMAND_HANDLERS[verb] = handler
+    for alias in (verb,) + aliases:
+      words = tuple(alias.split())
+      if len(words) == 1:
+        COMMANDS[alias] = verb
+      else:
+        phrases = MULTIWORD_COMMANDS.setdefault(words[0], [])
+        phrases.append((words, verb))
+        phrases.sort(key=lambda phrase: len(phrase[0]), reverse=True)
+    return handler
+  return register
+
+def _normalize_object(words):
+  """Fügt Objekt-Wörter zusammen und lässt führende Artikel weg."""
+  while words and words[0] in ARTICLES:
+    words = words[1:]
+  return " ".join(words)
+
 def parse_command(command):
-  """Zerlegt den Befehl in Verb und Argumente."""
-  parts = command.split()
+  """Zerlegt den Befehl einmalig in ein Command (oder None bei leerer Eingabe)."""
+  parts = command.upper().split()
   if not parts:
-    return None, None
-  verb = parts[0]
-  args = parts[1:]
-  return verb, args
-
-def handle_command(verb, args):
-  """Verarbeitet den geparsten Befehl."""
-  if verb in ['GEHE', 'G', 'LAUFE']:
-    handle_go(args)
-  elif verb in ['NIMM', 'NEHMEN', 'N']:
-    handle_take(args)
-  elif verb in ['SCHAU', 'UMSCHAUEN', 'L', 'LOOK']:
-    handle_look(args)
-  elif verb in ['BENUTZE', 'USE', 'U']:
-    handle_use(args)
-  elif verb in ['INVENTAR', 'INV', 'I']:
-    handle_inventory()
-  elif verb in ['HILFE', 'HELP', '?']:
-    handle_help()
-  elif verb in ['DEKRYPTIERE', 'DECRYPT']:
-    handle_decrypt(args)
-  elif verb in ['HACKE', 'HACK']:
-      handle_hack(args)
-  elif verb in ['REDE', 'SPRECHE', 'TALK']:
-      handle_talk(args)
-  elif verb in ['LIES', 'LESEN', 'READ']:
-        handle_read(args)
-  elif verb in ['OEFFNE', 'OPEN']: # Bspw. für Türen
-        handle_open(args)
-  elif verb in ['DRUECKE', 'PUSH']: # Bspw. für Knöpfe
-        handle_push(args)
-  elif verb in ['SCANNE', 'SCAN']: # Für Hacking-Minispiel
-        handle_scan(args)
-  elif verb in ['CODE', 'EINGABE']: # Für Numpad
-        handle_code_input(args)
-  elif verb == 'QUIT' or verb == 'EXIT' or verb == 'ENDE':
-      print_slow("BIS BALD IM DIGITALEN NIRVANA...")
-      sys.exit()
-  else:
-    # Versuch, mehrteilige Verben zu erkennen (z.B. "REDE MIT")
-    if len(verb) > 0 and len(args) > 0:
-        combined_verb = verb + " " + args[0]
-        if combined_verb == "REDE MIT":
-            handle_talk(args[1:])
-            return
-        elif combined_verb == "ONLINE GEHEN" and game_state['computer_logged_in']: # Sonderfall für Computer
-             use_computer_command('ONLINE GEHEN')
-             return
-
-    print_slow("ICH VERSTEHE '{}' NICHT.".format(verb))
+    return None
+  verb = COMMANDS.get(parts[0])
+  verb_length = 1
+  for words, phrase_verb in MULTIWORD_COMMANDS.get(parts[0], ()):
+    if tuple(parts[:len(words)]) == words:
+      verb, verb_length = phrase_verb, len(words)
+      break
+  args = tuple(parts[verb_length:])
+  # Präposition erst nach mindestens einem Objekt-Wort beachten ("BENUTZE KARTE MIT LESER")
+  for i in range(1, len(args)):
+    if args[i] in PREPOSITIONS:
+      return Command(verb, parts[0], _normalize_object(args[:i]), args[i],
+                     _normalize_object(args[i + 1:]), args)
+  return Command(verb, parts[0], _normalize_object(args), None, "", args)
+
+def handle_command(session, cmd):
+  """Verarbeitet den geparsten Befehl über die Befehlstabelle (Minispiele starten nur, siehe MINIGAMES)."""
+  handler = COMMAND_HANDLERS.get(cmd.verb)
+  if handler is None:
+    print_slow("ICH VERSTEHE '{}' NICHT.".format(cmd.word))
+    verb = verb_index().suggest(cmd.word)
+    if verb:
+      print_slow("MEINTEST DU '{}'?".format(" ".join((verb,) + cmd.args)))
+    return
+  handler(session, cmd)
+
+# --- Vorschläge bei Tippfehlern ---
+# Unbekannte Verben und Objekte werden mit dem Wortschatz verglichen, der gerade
+# Sinn ergibt: alle Verben bzw. die Ausgänge, Details und NPCs des Ortes und die
+# Gegenstände, die dort liegen oder die der Spieler trägt. Der Index eines Ortes
+# wird pro Welt einmal gebaut und enthält alle Gegenstände; ob einer gerade
+# sichtbar ist, wird erst bei der Suche geprüft.
+SUGGESTION_MIN_LENGTH = 3 # Kürzere Wörter bekommen keinen Vorschlag und werden nie vorgeschlagen
+SUGGESTION_CACHE = RenderCache(1024) # (Welt, Ort, Art) -> TypoIndex
+
+def _deletions(word):
+  """Das Wort selbst und alle Varianten mit einem Zeichen weniger."""
+  return {word} | {word[:i] + word[i + 1:] for i in range(len(word))}
+
+def typo_distance(a, b):
+  """Editierdistanz, bei der auch das Vertauschen zweier Nachbarzeichen ein Fehler ist."""
+  before, previous = None, list(range(len(b) + 1))
+  for i in range(1, len(a) + 1):
+    current = [i] + [0] * len(b)
+    for j in range(1, len(b) + 1):
+      current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+      if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+        current[j] = min(current[j], before[j - 2] + 1)
+    before, previous = previous, current
+  return previous[-1]
+
+class TypoIndex:
+  """Findet zu einem Wort den Eintrag, der höchstens einen Tippfehler entfernt ist.
+
+  Jedes Wort wird unter sich selbst und allen Varianten mit einem gelöschten
+  Zeichen abgelegt. Zwei Wörter, die ein Tippfehler trennt (Einfügen, Löschen,
+  Ersetzen, Vertauschen), haben immer eine solche Variante gemeinsam - eine
+  Suche braucht also nur len(wort) + 1 Nachschlagevorgänge und prüft danach
+  eine Handvoll Kandidaten. Anders als ein BK-Baum bleibt das auch bei
+  zehntausenden Wörtern weit unter einer Millisekunde.
+  """
+
+  def __init__(self, words):
+    self.words = {word for word in words if len(word) >= SUGGESTION_MIN_LENGTH}
+    self.variants = {} # Variante -> Wörter
+    for word in sorted(self.words):
+      for variant in _deletions(word):
+        self.variants.setdefault(variant, []).append(word)
+
+  def suggest(self, word, accept=None):
+    """Das nächstgelegene Wort, für das `accept` gilt, oder None (auch wenn `word` selbst bekannt ist)."""
+    if word in self.words or len(word) < SUGGESTION_MIN_LENGTH:
+      return None
+    candidates = set()
+    for variant in _deletions(word):
+      candidates.update(self.variants.get(variant, ()))
+    for distance, candidate in sorted((typo_distance(word, candidate), candidate) for candidate in candidates):
+      if distance > 1:
+        break
+      if accept is None or accept(candidate):
+        return candidate
+    return None
+
+def verb_index():
+  """Index aller Verben und ihrer Aliase (ohne Admin-Befehle)."""
+  def build():
+    words = [alias for alias, verb in COMMANDS.items() if verb not in ADMIN_COMMANDS]
+    words += MULTIWORD_COMMANDS # Erste Wörter wie ONLINE aus ONLINE GEHEN
+    return TypoIndex(words)
+  return SUGGESTION_CACHE.get(('verben', len(COMMANDS)), build)
+
+def object_index(world, loc_id, exits_only=False):
+  """Index der Namen, die an einem Ort Sinn ergeben können (oder nur der Ausgänge)."""
+  def build():
+    words = list(world.go_targets[loc_id])
+    if not exits_only:
+      location = world.locations[loc_id]
+      words += location.interactables
+      words += location.details
+      words += world.npcs[loc_id]
+      words += world.items
+      words += CODE_TARGETS
+    return TypoIndex(words)
+  return SUGGESTION_CACHE.get((world.serial, loc_id, exits_only), build)
+
+def did_you_mean(session, *names, exits_only=False):
+  """Schlägt für unbekannte Objektnamen den nächstgelegenen bekannten vor."""
+  loc_id = session.game_state.current_location
+  index = object_index(session.world, loc_id, exits_only)
+  def visible(name): # Gegenstände nur, wenn sie hier liegen oder der Spieler sie trägt
+    return name not in session.items or name in session.inventory or session.placement.is_at(name, loc_id)
+  for name in names:
+    suggestion = index.suggest(name, visible)
+    if suggestion:
+      print_slow(f"MEINTEST DU '{suggestion}'?")
 
 # --- Befehls-Handler ---
-def display_location():
+def display_location(session):
   """Zeigt die Beschreibung des aktuellen Ortes an."""
-  loc_id = game_state['current_location']
-  location = locations[loc_id]
-  print("-" * WIDTH)
-  print(f"ORT: {location['name']}")
-  print("-" * WIDTH)
+  loc_id = session.game_state.current_location
+  location = session.locations[loc_id]
+  structured = structured_output()
+  if structured: # Der Client baut den Bildschirm selbst
+    emit_event('location_entered', id=loc_id, name=location.name, description=location.description,
+               items=list(session.placement.items_at(loc_id)), exits=list(location.exits))
+  else:
+    header, description, footer = location_screen(session, loc_id)
+    print_line(header)
   # Beim ersten Betreten des Apartments die Einleitung zeigen
-  if loc_id == 'APARTMENT' and location.get('first_visit', False):
+  if loc_id == 'APARTMENT' and location.first_visit:
       print_slow(wrap_text(
           "Du sitzt in deinem spartanisch eingerichteten Apartment. Dein CRT-Monitor flackert vor dir, "
           "die Tastatur deines alten Heimcomputers knistert leise unter deinen Fingern. Draussen pulsiert "
@@ -262,60 +1380,64 @@ def display_location():
           "erklaerbar sind, Codesequenzen, die keinen Sinn ergeben. Es ist, als wuerde etwas unter der "
           "Oberflaeche der digitalen Welt lauern."
       ))
-      location['first_visit'] = False # Nur einmal anzeigen
-      time.sleep(1)
+      session.edit_location(loc_id).first_visit = False # Nur einmal anzeigen
+      pause(1)
       # Die erste Nachricht auslösen
-      trigger_first_message()
-  else:
-      print_slow(wrap_text(location['description']))
-
+      trigger_first_message(session)
+  elif not structured:
+      print_slow(description)
+
+  if not structured and footer:
+    print_line(footer)
+
+def location_screen(session, loc_id):
+  """Die statischen Teile des Ortsbildschirms: (Kopf, Beschreibung, Gegenstände + Ausgänge).
+
+  Gecacht nach (Ort, Versionsstand, Breite); der Stand ändert sich nur, wenn
+  sich an diesem Ort etwas ändert (z.B. ein Gegenstand auftaucht).
+  """
+  width = screen_width()
+  key = (session.world.serial, loc_id, session.versions.get(loc_id, 0), width, 'screen')
+  return SCREEN_CACHE.get(key, lambda: _render_location_screen(session, loc_id, width))
+
+def _render_location_screen(session, loc_id, width):
+  location = session.locations[loc_id]
+  header = "\n".join(["-" * width, STYLES['ort'] + f"ORT: {location.name}" + RESET_STYLE, "-" * width])
+  lines = []
   # Zeige sichtbare Gegenstände am Ort
-  visible_items = [item_name for item_name, item_data in items.items()
-                   if item_data['location'] == loc_id]
+  visible_items = session.placement.items_at(loc_id)
   if visible_items:
-    print("\nDU SIEHST HIER:")
+    lines.append("\nDU SIEHST HIER:")
     for item_name in visible_items:
-      print(f"- {item_name}")
+      lines.append(f"- {item_name}")
 
   # Zeige mögliche Ausgänge
-  exits = location.get('exits', {})
+  exits = location.exits
   if exits:
-    print("\nMOEGLICHE AUSGAENGE:")
-    print(", ".join(exits.keys()))
+    lines.append("\nMOEGLICHE AUSGAENGE:")
+    lines.append(", ".join(exits.keys()))
+  return header, wrap_text(location.description), "\n".join(lines)
 
-def handle_go(args):
+@command('GEHE', 'G', 'LAUFE')
+def handle_go(session, cmd):
   """Bewegt den Spieler zu einem anderen Ort."""
-  if not args:
+  if not cmd.obj:
     print_slow("WOHIN SOLL ES GEHEN?")
     return
 
-  direction = args[0] # Richtung oder Zielname
-  loc_id = game_state['current_location']
-  location = locations[loc_id]
-  exits = location.get('exits', {})
-
-  target_loc_id = None
-  # Prüfe direkte Richtungen
-  if direction in exits:
-    target_loc_id = exits[direction]
-  else:
-    # Prüfe, ob ein Zielort direkt angesprochen wurde (z.B. "GEHE CAFE")
-    for exit_name, dest_id in exits.items():
-        if dest_id == direction: # Wenn der ZIELORT direkt als Befehl gegeben wird
-            target_loc_id = dest_id
-            break
-        elif exit_name == direction: # Sollte eigentlich schon oben abgedeckt sein
-             target_loc_id = dest_id
-             break
+  direction = cmd.obj # Richtung oder Zielname
+  loc_id = session.game_state.current_location
 
+  # Richtung (z.B. "GEHE RAUS") oder direkt angesprochener Zielort (z.B. "GEHE CAFE")
+  target_loc_id = session.world.go_targets[loc_id].get(direction)
 
   if target_loc_id:
     # Prüfe, ob der Zielort spezielle Bedingungen hat
-    if locations[target_loc_id].get('requires_computer', False) and not game_state['computer_logged_in']:
+    if session.locations[target_loc_id].requires_computer and not session.game_state.computer_logged_in:
         print_slow("DU MUSST DAFUER DEN COMPUTER BENUTZEN.")
         return
     # Logik für die Telefonzelle leicht angepasst: Man kann immer rein, aber nur wenn sie klingelt, passiert was beim Abheben.
-    # if target_loc_id == 'TELEFONZELLE_INNERES' and not game_state['phone_ringing']:
+    # if target_loc_id == 'TELEFONZELLE_INNERES' and not session.game_state.phone_ringing:
     #    print_slow("DIE TELEFONZELLE IST STUMM. WARUM SOLLTEST DU HINEINGEHEN?")
     #    return # Kleine Hürde/Logik - Entfernt, um Erkundung zu ermöglichen
 
@@ -324,221 +1446,238 @@ def handle_go(args):
     #     print_slow("DU KANNST DEN WEG ZUR SERVER-FARM NOCH NICHT FINDEN.")
     #     return
 
-    game_state['current_location'] = target_loc_id
-    display_location()
+    session.game_state.current_location = target_loc_id
+    display_location(session)
     # Event: Betreten der Telefonzelle während sie klingelt (Effekt beim Abheben)
-    if target_loc_id == 'TELEFONZELLE_INNERES' and game_state['phone_ringing']:
+    if target_loc_id == 'TELEFONZELLE_INNERES' and session.game_state.phone_ringing:
         print_slow("Das Klingeln ist hier drinnen ohrenbetaeubend!")
 
   else:
     print_slow(f"DU KANNST NICHT NACH '{direction}' GEHEN.")
+    did_you_mean(session, direction, exits_only=True)
 
 
-def handle_take(args):
+@command('NIMM', 'NEHMEN', 'N')
+def handle_take(session, cmd):
     """Nimmt einen Gegenstand auf."""
-    if not args:
+    if not cmd.obj:
         print_slow("WAS MOECHTEST DU NEHMEN?")
         return
 
-    item_name_arg = " ".join(args).upper() # Falls Item-Namen Leerzeichen haben
-    loc_id = game_state['current_location']
+    item_name_arg = cmd.obj # Falls Item-Namen Leerzeichen haben
+    loc_id = session.game_state.current_location
     found_item_name = None
 
     # Finde das Item am aktuellen Ort
-    for item_id, item_data in items.items():
-        if item_data['location'] == loc_id and item_id == item_name_arg:
-             # Spezialfall für Zettel im Apartment (wenn Passwort schon geknackt)
-            if item_id == 'ZETTEL' and game_state['apartment_password_cracked']:
-                 print_slow("DU HAST DIE INFO VOM ZETTEL BEREITS VERWENDET. ER IST JETZT UNWICHTIG.")
-                 return
-
-            if item_data.get('can_take', False):
-                found_item_name = item_id
-                break
-            else:
-                print_slow(f"DU KANNST '{item_name_arg}' NICHT NEHMEN.")
-                return
+    if session.placement.is_at(item_name_arg, loc_id):
+        # Spezialfall für Zettel im Apartment (wenn Passwort schon geknackt)
+        if item_name_arg == 'ZETTEL' and session.game_state.apartment_password_cracked:
+            print_slow("DU HAST DIE INFO VOM ZETTEL BEREITS VERWENDET. ER IST JETZT UNWICHTIG.")
+            return
+
+        if session.items[item_name_arg].can_take:
+            found_item_name = item_name_arg
+        else:
+            print_slow(f"DU KANNST '{item_name_arg}' NICHT NEHMEN.")
+            return
 
     if found_item_name:
-        game_state['player_inventory'].append(found_item_name)
-        items[found_item_name]['location'] = None # Aus der Welt entfernen
-        print_slow(f"DU NIMMST: {found_item_name}")
-        increase_alert_level(1) # Kleinigkeit aufheben ist minimal verdächtig
+        session.placement.move(found_item_name, INVENTORY) # Aus der Welt ins Inventar
+        emit_event('item_taken', f"DU NIMMST: {found_item_name}", item=found_item_name)
+        increase_alert_level(session, 1) # Kleinigkeit aufheben ist minimal verdächtig
     else:
         print_slow(f"HIER GIBT ES KEIN '{item_name_arg}'.")
+        did_you_mean(session, item_name_arg)
 
-def handle_look(args):
+@command('SCHAU', 'UMSCHAUEN', 'L', 'LOOK')
+def handle_look(session, cmd):
   """Schaut sich den Ort oder einen Gegenstand genauer an."""
-  loc_id = game_state['current_location']
-  location = locations[loc_id]
+  loc_id = session.game_state.current_location
+  location = session.locations[loc_id]
 
-  if not args:
+  if not cmd.obj:
     # Einfach nur 'SCHAU' -> Zeige die Ortsbeschreibung erneut detaillierter
-    display_location()
+    display_location(session)
     # Zeige Details zu Interactables
-    if location.get('interactables'):
-      print("\nINTERESSANTE DINGE HIER:")
-      for thing in location['interactables']:
-          # Prüfen ob das Ding noch 'da' ist (z.B. wenn es ein NPC ist, der weggehen könnte)
-          is_npc = thing in location.get('npcs', [])
-          is_item = thing in items and items[thing]['location'] == loc_id
-
-          # Wenn es ein NPC ist oder KEIN Item (also ein festes Merkmal des Raums) oder ein Item AM ORT ist
-          if is_npc or not is_item or (is_item and items[thing]['location'] == loc_id) :
-              print(f"- {thing}")
-              if thing in location.get('details', {}):
-                   # Kurze Beschreibung in Klammern anzeigen
-                   detail_text = location['details'][thing]
-                   # Optional: Kürzen, wenn zu lang für eine Klammeranzeige
-                   if len(detail_text) > 50:
-                       detail_text = detail_text[:47] + "..."
-                   print(f"  ({detail_text})")
+    key = (session.world.serial, loc_id, session.versions.get(loc_id, 0), screen_width(), 'interactables')
+    block = SCREEN_CACHE.get(key, lambda: _render_interactables(session, loc_id))
+    if block:
+      print_line(block)
 
 
   else:
-    target_name = " ".join(args).upper()
+    target_name = cmd.obj
 
     # Ist es ein Detail im Raum (Interactable oder NPC)?
-    if target_name in location.get('details', {}):
-      print_slow(wrap_text(location['details'][target_name]))
+    if target_name in location.details:
+      print_slow(wrap_text(location.details[target_name]))
     # Ist es ein Gegenstand im Inventar?
-    elif target_name in game_state['player_inventory']:
-      print_slow(wrap_text(items[target_name]['description']))
+    elif target_name in session.inventory:
+      print_slow(wrap_text(session.items[target_name].description))
     # Ist es ein Gegenstand am Ort?
-    elif target_name in items and items[target_name]['location'] == loc_id:
-         print_slow(wrap_text(items[target_name]['description']))
+    elif session.placement.is_at(target_name, loc_id):
+         print_slow(wrap_text(session.items[target_name].description))
          # Spezieller Text für den Zettel, wenn man ihn anschaut
-         if target_name == 'ZETTEL' and not game_state['apartment_password_cracked']:
+         if target_name == 'ZETTEL' and not session.game_state.apartment_password_cracked:
               # Die Standardbeschreibung reicht hier, da sie den Hinweis enthält
               pass
-         elif target_name == 'ZETTEL' and game_state['apartment_password_cracked']:
+         elif target_name == 'ZETTEL' and session.game_state.apartment_password_cracked:
              print_slow("Die Schrift ist verwischt und kaum noch lesbar.")
 
     else:
       print_slow(f"DU SIEHST NICHTS BESONDERES AN '{target_name}'.")
-
-
-def handle_read(args):
+      did_you_mean(session, target_name)
+
+
+def _render_interactables(session, loc_id):
+  """Der Block "INTERESSANTE DINGE HIER" für 'SCHAU' (gecacht wie der Ortsbildschirm)."""
+  location = session.locations[loc_id]
+  if not location.interactables:
+    return ""
+  lines = ["\nINTERESSANTE DINGE HIER:"]
+  for thing in location.interactables:
+      # Prüfen ob das Ding noch 'da' ist (z.B. wenn es ein NPC ist, der weggehen könnte)
+      is_npc = thing in location.npcs
+      is_item = session.placement.is_at(thing, loc_id)
+
+      # Wenn es ein NPC ist oder KEIN Item (also ein festes Merkmal des Raums) oder ein Item AM ORT ist
+      if is_npc or not is_item or (is_item and session.placement.is_at(thing, loc_id)) :
+          lines.append(f"- {thing}")
+          if thing in location.details:
+               # Kurze Beschreibung in Klammern anzeigen
+               detail_text = location.details[thing]
+               # Optional: Kürzen, wenn zu lang für eine Klammeranzeige
+               if len(detail_text) > 50:
+                   detail_text = detail_text[:47] + "..."
+               lines.append(f"  ({detail_text})")
+  return "\n".join(lines)
+
+@command('LIES', 'LESEN', 'READ')
+def handle_read(session, cmd):
     """Liest einen Gegenstand."""
-    if not args:
+    if not cmd.obj:
         print_slow("WAS MOECHTEST DU LESEN?")
         return
 
-    item_name_arg = " ".join(args).upper()
-    loc_id = game_state['current_location']
+    item_name_arg = cmd.obj
+    loc_id = session.game_state.current_location
 
     # Ist es der Zettel am Ort?
-    if item_name_arg == 'ZETTEL' and items['ZETTEL']['location'] == loc_id:
-        if game_state['apartment_password_cracked']:
+    if item_name_arg == 'ZETTEL' and session.placement.is_at('ZETTEL', loc_id):
+        if session.game_state.apartment_password_cracked:
              print_slow("DU HAST DIE INFO VOM ZETTEL BEREITS VERWENDET. Die Schrift ist verwischt.")
         else:
             print_slow(f"DU LIEST DEN {item_name_arg}:")
-            print_slow(wrap_text(items['ZETTEL']['description']))
+            print_slow(wrap_text(session.items['ZETTEL'].description))
         return
     # Ist es der Zettel im Inventar?
-    elif item_name_arg == 'ZETTEL' and 'ZETTEL' in game_state['player_inventory']:
-        if game_state['apartment_password_cracked']:
+    elif item_name_arg == 'ZETTEL' and 'ZETTEL' in session.inventory:
+        if session.game_state.apartment_password_cracked:
              print_slow("DU HAST DIE INFO VOM ZETTEL BEREITS VERWENDET. Die Schrift ist verwischt.")
         else:
             print_slow(f"DU LIEST DEN {item_name_arg} AUS DEINEM INVENTAR:")
-            print_slow(wrap_text(items['ZETTEL']['description']))
+            print_slow(wrap_text(session.items['ZETTEL'].description))
         return
     # Ist es ein anderer lesbarer Gegenstand im Inventar?
-    elif item_name_arg in game_state['player_inventory'] and item_name_arg in items:
+    elif item_name_arg in session.inventory:
          # Hier könnte man spezifische Logik für andere lesbare Items einfügen
          if item_name_arg == 'DATEN_DISKETTE':
               print_slow("DU KANNST EINE DISKETTE NICHT EINFACH SO LESEN. DU BRAUCHST EINEN COMPUTER. (BENUTZE COMPUTER, DANN LIES DISKETTE)")
          else:
             # Generische Lese-Aktion für andere Items, falls vorhanden
-            if 'read_text' in items[item_name_arg]: # Wenn ein spezieller Lesetext definiert ist
+            if session.items[item_name_arg].read_text is not None: # Wenn ein spezieller Lesetext definiert ist
                  print_slow(f"DU LIEST {item_name_arg}:")
-                 print_slow(wrap_text(items[item_name_arg]['read_text']))
+                 print_slow(wrap_text(session.items[item_name_arg].read_text))
             else: # Ansonsten nur die Beschreibung anzeigen
                  print_slow(f"DU SCHAUST DIR {item_name_arg} AN:")
-                 print_slow(wrap_text(items[item_name_arg]['description']))
+                 print_slow(wrap_text(session.items[item_name_arg].description))
          return
     # Ist es ein lesbares Objekt am Ort (z.B. Schild)?
-    elif item_name_arg in locations[loc_id].get('details', {}):
+    elif item_name_arg in session.locations[loc_id].details:
         # Prüfen, ob es als 'lesbar' markiert ist oder einfach nur Text anzeigen
         print_slow(f"DU LIEST {item_name_arg}:")
-        print_slow(wrap_text(locations[loc_id]['details'][item_name_arg]))
+        print_slow(wrap_text(session.locations[loc_id].details[item_name_arg]))
         return
 
     else:
         print_slow(f"DU KANNST '{item_name_arg}' NICHT LESEN ODER HAST ES NICHT.")
+        did_you_mean(session, item_name_arg)
 
 
-def handle_use(args):
+@command('BENUTZE', 'USE', 'U')
+def handle_use(session, cmd):
   """Benutzt einen Gegenstand oder ein Objekt."""
-  if not args:
+  if not cmd.obj:
     print_slow("WAS MOECHTEST DU BENUTZEN?")
     return
 
-  target_name = args[0].upper()
-  loc_id = game_state['current_location']
-  location = locations[loc_id]
+  target_name = cmd.obj
+  loc_id = session.game_state.current_location
+  location = session.locations[loc_id]
 
   # Fall 1: Benutze Computer
   if target_name == 'COMPUTER' and loc_id == 'APARTMENT':
-    use_computer()
+    use_computer(session)
   # Fall 2: Benutze Telefon in der Zelle
   elif target_name == 'TELEFON' and loc_id == 'TELEFONZELLE_INNERES':
-      use_phone()
+      use_phone(session)
   # Fall 3: Benutze Hoerer in der Zelle
   elif target_name == 'HOERER' and loc_id == 'TELEFONZELLE_INNERES':
-      use_phone_receiver()
+      use_phone_receiver(session)
   # Fall 4: Benutze Gegenstand mit Objekt (z.B. BENUTZE KARTE MIT LESER)
-  elif len(args) >= 3 and args[1].upper() in ['MIT', 'AN', 'AUF']: # Flexibler
-      item_to_use = args[0].upper()
-      target_object = " ".join(args[2:]).upper() # Rest ist das Objekt
+  elif cmd.prep and cmd.indirect: # MIT, AN oder AUF
+      item_to_use = cmd.obj
+      target_object = cmd.indirect # Rest ist das Objekt
 
       # Ist der Gegenstand im Inventar?
-      if item_to_use not in game_state['player_inventory']:
+      if item_to_use not in session.inventory:
           print_slow(f"DU HAST '{item_to_use}' NICHT.")
+          did_you_mean(session, item_to_use)
           return
 
       # Spezifische Interaktionen
       # Schlüsselkarte mit Kartenleser
       if item_to_use == 'SCHLUESSELKARTE' and target_object == 'KARTENLESER' and loc_id == 'SERVER_FARM_EINGANG':
           print_slow("DU ZIEHST DIE SCHLUESSELKARTE DURCH DEN LESER...")
-          time.sleep(1)
+          pause(1)
           # Hier eine Erfolgschance einbauen oder es einfach funktionieren lassen
           print_slow("...EIN GRUENES LICHT BLINKT KURZ AUF. KARTE AKZEPTIERT.")
-          game_state['server_farm_card_used'] = True
-          increase_alert_level(1)
+          session.game_state.server_farm_card_used = True
+          increase_alert_level(session, 1)
           # Prüfen, ob auch Code schon korrekt war
-          if game_state.get('server_farm_code_correct', False):
-               game_state['server_farm_access_granted'] = True
+          if session.game_state.server_farm_code_correct:
+               session.game_state.server_farm_access_granted = True
                print_slow("EIN KLICKEN IST ZU HOEREN. DIE TUER SCHEINT ENTSPERRT ZU SEIN. (VERSUCHE 'OEFFNE TUER')")
           else:
                print_slow("DIE KARTE WURDE AKZEPTIERT, ABER DIE TUER BLEIBT ZU. FEHLT NOCH DER CODE?")
 
       # Diskette mit Computer
       elif item_to_use == 'DATEN_DISKETTE' and target_object == 'COMPUTER' and loc_id == 'APARTMENT':
-          if game_state['computer_logged_in']:
+          if session.game_state.computer_logged_in:
               print_slow("DU SCHIEBST DIE DISKETTE 'PROTOKOLL 7' IN DAS LAUFWERK.")
               # Hinweis, wie man sie liest (innerhalb der Computer-Interaktion)
               print_slow("(IM COMPUTER-MODUS KANNST DU JETZT 'LIES DISKETTE' EINGEBEN.)")
-              increase_alert_level(1) # Zugriff auf unbekannte Daten
+              increase_alert_level(session, 1) # Zugriff auf unbekannte Daten
           else:
               print_slow("DU MUSST ZUERST DEN COMPUTER STARTEN/BENUTZEN (BENUTZE COMPUTER).")
       else:
           print_slow(f"DU KANNST '{item_to_use}' NICHT MIT '{target_object}' BENUTZEN.")
+          did_you_mean(session, target_object)
 
   # Fall 5: Benutze einfaches Interactable am Ort
-  elif target_name in location.get('interactables', []):
+  elif target_name in location.interactables:
        # Generische Nachricht oder spezifische Aktionen hier hinzufügen
        if target_name == 'TERMINAL' and loc_id == 'CAFE':
            print_slow("DU SETZT DICH AN DAS OEFFENTLICHE TERMINAL. ES RIECHT NACH STAUB UND NIKOTIN.")
            print_slow("ES VERLANGT NACH EINER ANMELDUNG ODER MUENZEN...")
            print_slow("(VIELLEICHT KANNST DU ES HACKEN? 'HACKE TERMINAL')")
-           increase_alert_level(1)
+           increase_alert_level(session, 1)
        elif target_name == 'NUMPAD' and loc_id == 'SERVER_FARM_EINGANG':
             print_slow("DAS NUMPAD IST BEREIT FUER EINE EINGABE. (BENUTZE 'CODE [NUMMER]')")
        elif target_name == 'KARTENLESER' and loc_id == 'SERVER_FARM_EINGANG':
             print_slow("DER KARTENLESER WARTET AUF EINE KARTE. (BENUTZE 'SCHLUESSELKARTE MIT KARTENLESER')")
        elif target_name == 'FENSTER' and loc_id == 'APARTMENT':
-            print_slow(wrap_text(location['details']['FENSTER'])) # Zeige einfach die Beschreibung
+            print_slow(wrap_text(location.details['FENSTER'])) # Zeige einfach die Beschreibung
        elif target_name == 'BETT' and loc_id == 'APARTMENT':
              print_slow("DU SETZT DICH AUFS BETT. ES IST NICHT SEHR BEQUEM. AUSRUHEN?")
              # Hier könnte man eine 'warte' Funktion einbauen
@@ -548,17 +1687,20 @@ def handle_use(args):
            print_slow(f"DU VERSUCHST '{target_name}' ZU BENUTZEN, ABER NICHTS SINNVOLLES PASSIERT.")
   else:
     print_slow(f"DU KANNST '{target_name}' HIER NICHT BENUTZEN.")
+    did_you_mean(session, target_name)
 
-def handle_inventory():
+@command('INVENTAR', 'INV', 'I')
+def handle_inventory(session, cmd):
   """Zeigt das Inventar des Spielers an."""
-  if not game_state['player_inventory']:
+  if not session.inventory:
     print_slow("DU TRAEGST NICHTS BEI DIR.")
   else:
     print_slow("DU TRAEGST:")
-    for item_name in game_state['player_inventory']:
-      print(f"- {item_name}")
+    for item_name in session.inventory:
+      print_line(f"- {item_name}")
 
-def handle_help():
+@command('HILFE', 'HELP', '?')
+def handle_help(session, cmd):
   """Zeigt eine Liste möglicher Befehle."""
   print_slow("MOEGLICHE BEFEHLE SIND:")
   print_slow("- GEHE [RICHTUNG/ORT] (ODER G)")
@@ -574,257 +1716,373 @@ def handle_help():
   print_slow("- SCANNE [ZIEL/PORTS]")
   print_slow("- CODE [NUMMER] (Fuer Numpads)")
   print_slow("- OEFFNE [TUER/OBJEKT]")
+  print_slow("- SPEICHERN [NAME] / LADEN [NAME]")
   # print_slow("- DRUECKE [KNOPF]") # Momentan nicht verwendet
   print_slow("- HILFE (?)")
   print_slow("- QUIT (ODER EXIT, ENDE)")
 
-def handle_decrypt(args):
+@command('DEKRYPTIERE', 'DECRYPT')
+def handle_decrypt(session, cmd):
     """Versucht, etwas zu dekryptieren."""
     # Beispiel: DEKRYPTIERE NACHRICHT MIT REDPILL
-    if len(args) < 3 or args[1].upper() != 'MIT':
+    if cmd.prep != 'MIT' or not cmd.obj or not cmd.indirect:
         print_slow("BENUTZE: DEKRYPTIERE [WAS] MIT [SCHLUESSEL]")
         return
 
-    target = args[0].upper()
-    key = " ".join(args[2:]).upper() # Schlüssel kann mehrere Worte sein
+    target = cmd.obj
+    key = cmd.indirect # Schlüssel kann mehrere Worte sein
 
     # Szenario 1: Erste Nachricht dekryptieren
-    if target == 'NACHRICHT' and game_state['current_location'] == 'APARTMENT' and game_state['first_message_received'] and not game_state['decrypted_message_content']:
+    if target == 'NACHRICHT' and session.game_state.current_location == 'APARTMENT' and session.game_state.first_message_received and not session.game_state.decrypted_message_content:
         # Das Codewort/Schlüssel (Groß-/Kleinschreibung ignorieren beim Vergleich)
         correct_key = 'REDPiLL'.upper() # Im Code immer Großbuchstaben verwenden für Konsistenz
         if key == correct_key:
-            game_state['known_codeword'] = 'REDPiLL' # Spieler kennt das Wort (in Originalschreibweise speichern?)
-            game_state['decrypted_message_content'] = "FOLGE DEM WEISSEN KANINCHEN."
+            session.game_state.known_codeword = 'REDPiLL' # Spieler kennt das Wort (in Originalschreibweise speichern?)
+            session.game_state.decrypted_message_content = "FOLGE DEM WEISSEN KANINCHEN."
             print_slow("DEKRYPTION ERFOLGREICH!")
-            print_slow(f"NACHRICHT ENTSCHLUESSELT: '{game_state['decrypted_message_content']}'")
+            print_slow(f"NACHRICHT ENTSCHLUESSELT: '{session.game_state.decrypted_message_content}'")
             print_slow("WAS BEDEUTET DAS NUR? VIELLEICHT EIN HINWEIS AUF EIN ONLINE FORUM?")
-            increase_alert_level(1)
+            increase_alert_level(session, 1)
             # Möglicher Hinweis: Der Computer könnte jetzt für 'ONLINE GEHEN' genutzt werden
             print_slow("(VIELLEICHT KANNST DU JETZT MIT DEM COMPUTER 'ONLINE GEHEN'?)")
         else:
             print_slow("FALSCHER SCHLUESSEL. DEKRYPTION FEHLGESCHLAGEN.")
-            increase_alert_level(1) # Versuch macht verdächtig
+            increase_alert_level(session, 1) # Versuch macht verdächtig
     # Hier könnten weitere Dekryptier-Rätsel eingefügt werden
-    # elif target == 'PROTOKOLL 7' and 'DATEN_DISKETTE' in game_state['player_inventory'] and key == 'MORPHEUS':
+    # elif target == 'PROTOKOLL 7' and 'DATEN_DISKETTE' in session.inventory and key == 'MORPHEUS':
     #    ... (Vielleicht muss die Diskette erst dekryptiert werden?)
     else:
-        if target == 'NACHRICHT' and game_state['decrypted_message_content']:
+        if target == 'NACHRICHT' and session.game_state.decrypted_message_content:
              print_slow("DU HAST DIESE NACHRICHT BEREITS DEKRYPTIERT.")
         else:
              print_slow(f"ES GIBT HIER KEIN '{target}' ZUM DEKRYPTIEREN, DU HAST ES NICHT, ODER DER SCHLUESSEL IST FALSCH.")
+             did_you_mean(session, target) # Nur das Ziel, der Schlüssel wird nicht verraten
 
 
-def handle_hack(args):
+@command('HACKE', 'HACK')
+def handle_hack(session, cmd):
     """Startet einen Hacking-Versuch."""
-    if not args:
+    if not cmd.obj:
         print_slow("WAS MOECHTEST DU HACKEN?")
         return
 
-    target = " ".join(args).upper()
-    loc_id = game_state['current_location']
+    target = cmd.obj
+    loc_id = session.game_state.current_location
 
     # Szenario 1: Computer-Passwort im Apartment knacken (wird jetzt über 'BENUTZE COMPUTER' ausgelöst)
-    # if target == 'COMPUTER' and loc_id == 'APARTMENT' and not game_state['apartment_password_cracked']:
-    #    crack_apartment_password()
+    # if target == 'COMPUTER' and loc_id == 'APARTMENT' and not session.game_state.apartment_password_cracked:
+    #    crack_apartment_password(session)
 
     # Szenario 2: Server-Farm Zugang (Port Scan Minispiel)
     if target in ['SERVER', 'SERVER-FARM', 'SERVERFARM', 'PORTS'] and loc_id == 'SERVER_FARM_EINGANG':
          # Hier könnte das Port-Scanning Minispiel starten
-         start_port_scan_minigame()
+         start_port_scan_minigame(session)
     # Szenario 3: Terminal im Cafe
     elif target == 'TERMINAL' and loc_id == 'CAFE':
         print_slow("DU VERSUCHST, DIE ANMELDUNG DES TERMINALS ZU UMGEHEN...")
-        time.sleep(1.5)
-        if random.randint(1, 3) == 1: # Einfache Zufallschance
+        pause(1.5)
+        if session.rng.one_in(3): # Einfache Zufallschance
             print_slow("ERFOLG! DU HAST EINE TEMPORAERE SITZUNG ERLANGT.")
             print_slow("DU FINDEST EINE HERUM LIEGENDE DATEI 'TRANSFER.LOG'.")
-            time.sleep(1)
+            pause(1)
             # Belohnung: Finde die Daten-Diskette
-            if not game_state.get('diskette_received', False):
+            if not session.game_state.diskette_received:
                 print_slow("IN DEN LOGS WIRD EINE VERSCHOBENE 'PROTOKOLL 7' DATEI ERWÄHNT. JEMAND HAT EINE KOPIE AUF EINER DISKETTE ZURÜCKGELASSEN!")
                 # Die Diskette erscheint jetzt im Cafe
-                items['DATEN_DISKETTE']['location'] = 'CAFE'
-                game_state['diskette_received'] = True
+                session.placement.move('DATEN_DISKETTE', 'CAFE')
+                session.game_state.diskette_received = True
                 print_slow("DU SIEHST HIER JETZT: DATEN DISKETTE")
-                increase_alert_level(3)
+                increase_alert_level(session, 3)
             else:
                 print_slow("DU DURCHSUCHST DIE LOGS, FINDEST ABER NICHTS NEUES VON INTERESSE.")
-                increase_alert_level(1)
+                increase_alert_level(session, 1)
         else:
             print_slow("FEHLGESCHLAGEN! DAS SYSTEM HAT DEINEN VERSUCH REGISTRIERT.")
-            increase_alert_level(4)
-            check_alert_level()
+            increase_alert_level(session, 4)
+            check_alert_level(session)
     elif target == 'COMPUTER' and loc_id == 'APARTMENT':
          print_slow("DU MUSST DEN COMPUTER ZUERST BENUTZEN ('BENUTZE COMPUTER'), UM ZU VERSUCHEN, DICH EINZULOGGEN.")
     else:
         print_slow(f"DU KANNST '{target}' HIER NICHT HACKEN.")
+        did_you_mean(session, target)
 
 
-def handle_talk(args):
+@command('REDE', 'SPRECHE', 'TALK', 'REDE MIT', 'SPRECHE MIT')
+def handle_talk(session, cmd):
     """Initiert ein Gespräch mit einem NPC."""
-    if not args:
+    if not cmd.obj:
         print_slow("MIT WEM MOECHTEST DU SPRECHEN? (BENUTZE 'REDE MIT [NAME]')")
         return
 
-    npc_name = " ".join(args).upper()
-    loc_id = game_state['current_location']
-    location = locations[loc_id]
+    npc_name = cmd.obj
+    loc_id = session.game_state.current_location
+    location = session.locations[loc_id]
 
-    if npc_name in location.get('npcs', []):
+    if npc_name in session.world.npcs[loc_id]:
         # Spezifische Dialoge
         if npc_name == 'MANN' and loc_id == 'CAFE':
-            talk_to_cypher_like_npc(npc_name)
+            talk_to_cypher_like_npc(session, npc_name)
         # Hier könnten weitere NPCs eingefügt werden
         # elif npc_name == 'ORACLE' and loc_id == 'KANINCHENBAU_FORUM':
         #    talk_to_oracle()
         else:
              # Generischer Fall für andere NPCs ohne spezifischen Dialog
-             npc_detail = location.get('details', {}).get(npc_name, f"{npc_name} scheint beschaeftigt.")
+             npc_detail = location.details.get(npc_name, f"{npc_name} scheint beschaeftigt.")
              print_slow(wrap_text(npc_detail))
              print_slow(f"{npc_name} IGNORIERT DICH WEITGEHEND.")
     else:
         print_slow(f"HIER IST NIEMAND MIT DEM NAMEN '{npc_name}'.")
+        did_you_mean(session, npc_name)
 
-def handle_open(args):
+@command('OEFFNE', 'OPEN') # Bspw. für Türen
+def handle_open(session, cmd):
     """Versucht etwas zu öffnen."""
-    if not args:
+    if not cmd.obj:
         print_slow("WAS MOECHTEST DU OEFFNEN?")
         return
 
-    target_name = " ".join(args).upper()
-    loc_id = game_state['current_location']
-    location = locations[loc_id]
+    target_name = cmd.obj
+    loc_id = session.game_state.current_location
+    location = session.locations[loc_id]
 
     # Beispiel: Öffne Tür zur Serverfarm
     if target_name == 'TUER' and loc_id == 'SERVER_FARM_EINGANG':
-        if game_state.get('server_farm_access_granted', False):
+        if session.game_state.server_farm_access_granted:
              print_slow("DIE SCHWERE STAHLTUER SCHWINGT MIT EINEM LEISEN SUMMEN AUF.")
              # Hier den Spieler in die Serverfarm bewegen (neuen Ort definieren!)
-             # game_state['current_location'] = 'SERVER_FARM_INNERES'
-             # display_location()
+             # session.game_state.current_location = 'SERVER_FARM_INNERES'
+             # display_location(session)
              print_slow("(DEBUG: Zugang zur Serverfarm gewaehrt, aber der Ort 'SERVER_FARM_INNERES' ist noch nicht implementiert.)")
              # Man könnte hier ein Flag setzen, dass die Tür offen ist.
-             locations['SERVER_FARM_EINGANG']['details']['TUER'] = "Die schwere Stahltür steht einen Spalt offen."
+             session.edit_location('SERVER_FARM_EINGANG').details['TUER'] = "Die schwere Stahltür steht einen Spalt offen."
              # Optional: Ausgang hinzufügen, wenn offen?
-             # locations['SERVER_FARM_EINGANG']['exits']['REIN'] = 'SERVER_FARM_INNERES'
+             # session.locations['SERVER_FARM_EINGANG'].exits['REIN'] = 'SERVER_FARM_INNERES'
 
-        elif game_state.get('server_farm_card_used', False) and game_state.get('server_farm_code_correct', False):
+        elif session.game_state.server_farm_card_used and session.game_state.server_farm_code_correct:
              # Sollte eigentlich durch server_farm_access_granted abgedeckt sein, aber als Fallback
              print_slow("DIE TUER KLICKT, SCHEINT ABER NOCH VERKLEMMT. VERSUCH ES NOCHMAL?")
-             game_state['server_farm_access_granted'] = True # Setzen wir es hier sicherheitshalber
-        elif game_state.get('server_farm_card_used', False):
+             session.game_state.server_farm_access_granted = True # Setzen wir es hier sicherheitshalber
+        elif session.game_state.server_farm_card_used:
              print_slow("DIE TUER BLEIBT VERSCHLOSSEN. DER KARTENLESER LEUCHTETE, ABER ES FEHLT WOHL NOCH DER CODE.")
-        elif game_state.get('server_farm_code_correct', False):
+        elif session.game_state.server_farm_code_correct:
              print_slow("DIE TUER BLEIBT VERSCHLOSSEN. DAS NUMPAD LEUCHTETE, ABER ES FEHLT WOHL NOCH DIE KARTE.")
         else:
              print_slow("DIE TUER IST FEST VERSCHLOSSEN. SIE BENOETIGT WOHL EINE SCHLUESSELKARTE UND EINEN CODE.")
     # Beispiel: Tür der Telefonzelle (eigentlich unnötig, da 'GEHE TELEFONZELLE' funktioniert)
     elif target_name == 'TELEFONZELLE' and loc_id == 'STRASSE':
          print_slow("Du öffnest die Tür zur Telefonzelle und gehst hinein.")
-         handle_go(['TELEFONZELLE']) # Nutze die GEHE Funktion
+         handle_go(session, parse_command('GEHE TELEFONZELLE')) # Nutze die GEHE Funktion
     else:
          print_slow(f"DU KANNST '{target_name}' NICHT OEFFNEN.")
+         did_you_mean(session, target_name)
 
-def handle_push(args):
+@command('DRUECKE', 'PUSH') # Bspw. für Knöpfe
+def handle_push(session, cmd):
     """Drückt etwas."""
-    if not args:
+    if not cmd.obj:
         print_slow("WAS MOECHTEST DU DRUECKEN?")
         return
-    target_name = " ".join(args).upper()
-    loc_id = game_state['current_location']
+    target_name = cmd.obj
+    loc_id = session.game_state.current_location
     # Hier Logik für Knöpfe etc.
     if target_name == 'KNOPF' and loc_id == 'TELEFONZELLE_INNERES': # Beispiel
         print_slow("DU DRUECKST EINEN KLEINEN, UNBESCHRIFTETEN KNOPF NEBEN DEM MUENZSCHLITZ.")
         print_slow("NICHTS SCHEINT ZU PASSIEREN.")
     else:
         print_slow(f"DU KANNST '{target_name}' NICHT DRUECKEN ODER ES GIBT HIER NICHTS ZU DRUECKEN.")
+        did_you_mean(session, target_name)
 
-def handle_scan(args):
+@command('SCANNE', 'SCAN') # Für Hacking-Minispiel
+def handle_scan(session, cmd):
      """Startet einen Scan."""
-     if not args:
+     if not cmd.obj:
         print_slow("WAS MOECHTEST DU SCANNEN? (Z.B. SCANNE PORTS)")
         return
 
-     target = " ".join(args).upper()
-     loc_id = game_state['current_location']
+     target = cmd.obj
+     loc_id = session.game_state.current_location
 
      if target == 'PORTS' and loc_id == 'SERVER_FARM_EINGANG':
           # Direkter Aufruf des Port-Scans auch möglich
-          start_port_scan_minigame()
-     elif target == 'PORTS' and game_state['computer_logged_in'] and loc_id == 'APARTMENT':
+          start_port_scan_minigame(session)
+     elif target == 'PORTS' and session.game_state.computer_logged_in and loc_id == 'APARTMENT':
          print_slow("DU STARTETST EINEN NETZWERK-SCAN VON DEINEM COMPUTER AUS...")
          # Hier könnte man Infos über erreichbare Systeme geben
          print_slow("SCAN ERGEBNISSE: Lokales Netzwerk (HEIMBASIS), Oeffentliches Terminal (CYBER CAFE), Unbekannte Adresse (SERVER-FARM IP)")
-         increase_alert_level(1)
+         increase_alert_level(session, 1)
      else:
           print_slow(f"HIER GIBT ES NICHTS SINNVOLLES ZU SCANNEN MIT '{target}'.")
+          did_you_mean(session, target)
 
-def handle_code_input(args):
+@command('CODE', 'EINGABE') # Für Numpad
+def handle_code_input(session, cmd):
     """Verarbeitet Code-Eingabe am Numpad."""
-    if not args:
+    if not cmd.obj:
         print_slow("WELCHEN CODE MOECHTEST DU EINGEBEN? (BENUTZE 'CODE [NUMMER]')")
         return
 
-    code = args[0]
-    loc_id = game_state['current_location']
+    code = cmd.obj
+    loc_id = session.game_state.current_location
 
     # Nur am Server-Farm Eingang gibt es ein relevantes Numpad
     if loc_id == 'SERVER_FARM_EINGANG':
-        numpad_interactable = 'NUMPAD' in locations[loc_id].get('interactables', [])
+        numpad_interactable = 'NUMPAD' in session.locations[loc_id].interactables
         if not numpad_interactable:
              print_slow("HIER GIBT ES KEIN NUMPAD.")
              return
 
         print_slow(f"DU GIBST DEN CODE '{code}' AM NUMPAD EIN...")
-        time.sleep(1.5)
+        pause(1.5)
         # Prüfe, ob der Spieler den Code überhaupt kennen kann (z.B. nach erfolgreichem Port-Scan)
-        if not game_state.get('server_farm_hacked', False):
+        if not session.game_state.server_farm_hacked:
             print_slow("DU HAST KEINE AHNUNG, WELCHEN CODE DU EINGEBEN SOLLST.")
-            increase_alert_level(1)
+            increase_alert_level(session, 1)
             return
 
         # Vergleiche mit dem korrekten Code
-        if code == game_state['server_farm_access_code']:
+        if code == session.game_state.server_farm_access_code:
             print_slow("EIN GRUENES LICHT LEUCHTET AM NUMPAD. CODE AKZEPTIERT.")
-            game_state['server_farm_code_correct'] = True
-            increase_alert_level(1)
+            session.game_state.server_farm_code_correct = True
+            increase_alert_level(session, 1)
             # Prüfen, ob auch Karte schon benutzt wurde
-            if game_state.get('server_farm_card_used', False):
-                 game_state['server_farm_access_granted'] = True
+            if session.game_state.server_farm_card_used:
+                 session.game_state.server_farm_access_granted = True
                  print_slow("EIN KLICKEN IST ZU HOEREN. DIE TUER SCHEINT ENTSPERRT ZU SEIN. (VERSUCHE 'OEFFNE TUER')")
             else:
                  print_slow("DAS NUMPAD LEUCHTET GRUEN, ABER DIE TUER BLEIBT ZU. FEHLT NOCH DIE SCHLUESSELKARTE?")
         else:
             print_slow("FALSCHER CODE. EIN ROTES LICHT BLINKT WARNEND.")
-            increase_alert_level(3)
-            check_alert_level()
-            game_state['server_farm_code_correct'] = False
+            increase_alert_level(session, 3)
+            check_alert_level(session)
+            session.game_state.server_farm_code_correct = False
     else:
         print_slow("HIER GIBT ES KEIN NUMPAD, UM EINEN CODE EINZUGEBEN.")
 
+@command('QUIT', 'EXIT', 'ENDE')
+def handle_quit(session, cmd):
+    """Beendet das Spiel."""
+    print_slow("BIS BALD IM DIGITALEN NIRVANA...")
+    emit_event('game_over', reason='quit', alert_level=session.game_state.alert_level)
+    sys.exit()
+
+def _save_slot_name(text):
+    """Prüft den Namen eines Spielstands (nur Buchstaben, Ziffern, - und _)."""
+    name = text or 'SPIELSTAND'
+    return name if re.fullmatch(r'[A-Z0-9_-]{1,32}', name) else None
+
+@command('SPEICHERN', 'SAVE')
+def handle_save(session, cmd):
+    """Speichert den Spielstand (SPEICHERN [NAME])."""
+    name = _save_slot_name(cmd.obj)
+    if name is None:
+        print_slow("UNGUELTIGER NAME. ERLAUBT SIND BUCHSTABEN, ZIFFERN, - UND _.")
+        return
+    data = save_snapshot(session)
+    if session.save_dir is None:
+        session.save_slots[name] = data
+    else:
+        try:
+            os.makedirs(session.save_dir, exist_ok=True)
+            with open(os.path.join(session.save_dir, name.lower() + '.sav'), 'wb') as f:
+                f.write(data)
+        except OSError as e:
+            print_slow(f"SPEICHERN FEHLGESCHLAGEN: {e.strerror}")
+            return
+    print_slow(f"SPIELSTAND '{name}' GESPEICHERT ({len(data)} BYTES).")
+
+@command('LADEN', 'LOAD')
+def handle_load(session, cmd):
+    """Lädt einen Spielstand (LADEN [NAME])."""
+    name = _save_slot_name(cmd.obj)
+    if name is None:
+        print_slow("UNGUELTIGER NAME. ERLAUBT SIND BUCHSTABEN, ZIFFERN, - UND _.")
+        return
+    if session.save_dir is None:
+        data = session.save_slots.get(name)
+    else:
+        try:
+            with open(os.path.join(session.save_dir, name.lower() + '.sav'), 'rb') as f:
+                data = f.read()
+        except OSError:
+            data = None
+    if data is None:
+        print_slow(f"KEIN SPIELSTAND MIT DEM NAMEN '{name}'.")
+        return
+    try:
+        restore_snapshot(session, data)
+    except SnapshotError as e:
+        print_slow(f"LADEN FEHLGESCHLAGEN: {e}")
+        return
+    print_slow(f"SPIELSTAND '{name}' GELADEN.")
+    display_location(session)
+
+ADMIN_COMMANDS = ('MESSUNG', 'PROFIL') # Nur mit session.admin; werden nie vorgeschlagen
+
+@command('MESSUNG', 'METRICS')
+def handle_metrics(session, cmd):
+    """Admin: Laufzeitmessung steuern (MESSUNG [AN|AUS])."""
+    if not session.admin:
+        print_slow("ICH VERSTEHE '{}' NICHT.".format(cmd.word))
+        return
+    if cmd.obj in ('AN', 'ON'):
+        METRICS.reset()
+        enable_metrics()
+        print_slow("MESSUNG LAEUFT.")
+    elif cmd.obj in ('AUS', 'OFF'):
+        disable_metrics()
+        for line in METRICS.report():
+            print_line(line)
+    elif metrics_enabled():
+        for line in METRICS.report():
+            print_line(line)
+    else:
+        print_slow("MESSUNG IST AUS. 'MESSUNG AN' STARTET SIE.")
+
+@command('PROFIL', 'PROFILE')
+def handle_profile(session, cmd):
+    """Admin: cProfile für diese Sitzung ein- bzw. ausschalten."""
+    if not session.admin:
+        print_slow("ICH VERSTEHE '{}' NICHT.".format(cmd.word))
+        return
+    if session.profiler is None:
+        start_profiling(session)
+        print_slow("PROFIL LAEUFT AB DEM NAECHSTEN BEFEHL. 'PROFIL' BEENDET ES.")
+        return
+    path = stop_profiling(session)
+    if path:
+        print_slow(f"PROFIL GESPEICHERT: {path}")
+
+@command('ONLINE GEHEN')
+def handle_online(session, cmd):
+    """Sonderfall: 'ONLINE GEHEN' funktioniert auch außerhalb des Computer-Modus, wenn man eingeloggt ist."""
+    if session.game_state.computer_logged_in:
+        use_computer_command(session, 'ONLINE GEHEN')
+    else:
+        print_slow("ICH VERSTEHE '{}' NICHT.".format(cmd.word))
+
 # --- NPCs und Dialoge ---
-def talk_to_cypher_like_npc(npc_name):
+def talk_to_cypher_like_npc(session, npc_name):
     """Dialog mit dem Mann im Cafe (Cypher-Anspielung)."""
-    loc_id = game_state['current_location']
+    loc_id = session.game_state.current_location
     if loc_id != 'CAFE': return # Nur im Cafe
 
-    if not game_state['met_cypher']:
+    if not session.game_state.met_cypher:
         print_slow(f"'NA?', sagt {npc_name}, ohne dich anzusehen. 'NEU HIER IM SCHATTEN?'")
-        time.sleep(1)
+        pause(1)
         print_slow("'SEI VORSICHTIG, WEM DU TRAUST. NICHTS IST, WIE ES SCHEINT.'")
-        time.sleep(1)
+        pause(1)
         print_slow("'MANCHE SUCHEN DIE WAHRHEIT, ANDERE NUR DEN AUSWEG.'")
-        game_state['met_cypher'] = True
-        increase_alert_level(1) # Gespräch mit zwielichtiger Gestalt
+        session.game_state.met_cypher = True
+        increase_alert_level(session, 1) # Gespräch mit zwielichtiger Gestalt
 
         # Schenkt dem Spieler die Schlüsselkarte, wenn er sie noch nicht hat
         # Und wenn sie nicht schon im Cafe liegt (z.B. von früherem Versuch)
-        if 'SCHLUESSELKARTE' not in game_state['player_inventory'] and items['SCHLUESSELKARTE']['location'] is None:
-            time.sleep(1.5)
+        if session.placement.location_of('SCHLUESSELKARTE') is None: # Weder im Inventar noch irgendwo abgelegt
+            pause(1.5)
             print_slow(f"{npc_name} schiebt dir unauffaellig etwas ueber die Theke.")
             print_slow("'VIELLEICHT HILFT DIR DAS BEI EINER VERSCHLOSSENEN TUER IRGENDWO IN DER STADT. ABER FRAG NICHT, WOher ICH ES HABE.'")
             # Schlüsselkarte erscheint im Cafe zum Aufheben
-            items['SCHLUESSELKARTE']['location'] = game_state['current_location']
+            session.placement.move('SCHLUESSELKARTE', session.game_state.current_location)
             print_slow("\nDU SIEHST HIER JETZT: SCHLUESSELKARTE")
     else:
         # Wiederholungsdialog
@@ -834,169 +2092,212 @@ def talk_to_cypher_like_npc(npc_name):
              f"{npc_name} murmelt: 'Ignoranz ist manchmal ein Segen... aber selten profitabel.'",
              f"{npc_name} schaut kurz auf. 'Pass auf die Agenten auf. Sie sind ueberall.'"
          ]
-         print_slow(random.choice(responses))
+         print_slow(session.rng.choice(responses))
 
 # --- Minispiele und Rätsel ---
-def trigger_first_message():
+# Minispiele sind Zustandsautomaten. Ein Handler startet eines, indem er
+# session.minigame auf (Name, Daten...) setzt; die Spielschleife reicht dann
+# jede Eingabe an den Schritt des Minispiels weiter, bis dieser None liefert.
+# Der Zustand besteht nur aus einfachen Werten und steht mit im Spielstand:
+# Eine Sitzung lässt sich mitten im Minispiel speichern, auf einen anderen
+# Worker verschieben oder von einem Programm Eingabe für Eingabe treiben.
+Minigame = collections.namedtuple('Minigame', 'prompt step')
+
+MINIGAMES = {} # Name -> Minigame(Eingabeaufforderung, Schritt)
+
+def minigame(name, prompt):
+  """Dekorator: registriert den Schritt eines Minispiels.
+
+  `prompt(*daten)` liefert die Eingabeaufforderung, der Schritt
+  `(session, zeile, *daten)` den nächsten Zustand (None = Minispiel vorbei).
+  """
+  def register(step):
+    MINIGAMES[name] = Minigame(prompt, step)
+    return step
+  return register
+
+def minigame_prompt(session):
+  """Die Eingabeaufforderung des laufenden Minispiels."""
+  name, *data = session.minigame
+  return MINIGAMES[name].prompt(*data)
+
+def minigame_step(session, line):
+  """Gibt eine Eingabe an das laufende Minispiel weiter."""
+  name, *data = session.minigame
+  session.minigame = None # Endet der Schritt mit Game Over, ist auch das Minispiel vorbei
+  session.minigame = MINIGAMES[name].step(session, line, *data)
+
+def trigger_first_message(session):
     """Zeigt die initiale verschlüsselte Nachricht an."""
-    if not game_state['first_message_received']:
-        print("\n" + "="*WIDTH)
+    if not session.game_state.first_message_received:
+        print_line()
+        print_rule("=")
         print_slow("PLOETZLICH BLINKT EIN FENSTER AUF DEINEM COMPUTERBILDSCHIRM AUF.")
-        time.sleep(1)
-        print_slow(" EINGEHENDE NACHRICHT:")
+        pause(1)
+        print_banner(" EINGEHENDE NACHRICHT:", 'nachricht')
         print_slow(" QUELLE: UNBEKANNT")
         print_slow(" VERSCHLUESSELUNG: STANDARD ROT13 (DEBUG: Eigentlich REDPiLL)") # Hinweis für Spieler/Tester
         print_slow(" NACHRICHT: 'SBYTR QHZ JRVFFRA XNAVAPURA.' (ROT13)") # Verschlüsselte Nachricht direkt anzeigen
-        print("="*WIDTH + "\n")
+        print_rule("=")
+        print_line()
         print_slow("(DU KOENNTEST VERSUCHEN: DEKRYPTIERE NACHRICHT MIT REDPiLL)") # Klarer Hinweis
-        game_state['first_message_received'] = True
+        session.game_state.first_message_received = True
 
-def crack_apartment_password():
+def crack_apartment_password(session):
     """Passwort-Knack-Minispiel für den Computer."""
     print_slow("DU VERSUCHST, DICH AM COMPUTER EINZULOGGEN.")
     print_slow("PASSWORT GESCHUETZT. SYSTEM: 'HEIMBASIS'.")
 
     # Hinweis holen (wenn Zettel vorhanden oder gelesen wurde)
     hint = ""
-    zettel_readable = ('ZETTEL' in game_state['player_inventory'] or items['ZETTEL']['location'] == 'APARTMENT') and not game_state['apartment_password_cracked']
+    zettel_readable = ('ZETTEL' in session.inventory or session.placement.is_at('ZETTEL', 'APARTMENT')) and not session.game_state.apartment_password_cracked
     if zettel_readable:
         hint = " (HINWEIS AUF DEM ZETTEL VERFUEGBAR - 'LIES ZETTEL')"
-    elif game_state['apartment_password_cracked']:
+    elif session.game_state.apartment_password_cracked:
          hint = " (PASSWORT BEREITS GEKNACKT)" # Sollte nicht passieren, wenn schon eingeloggt
     else:
         hint = " (DU HAST KEINEN HINWEIS)"
 
-    attempts = 3
-    while attempts > 0:
-        # Passwortabfrage (Kleinschreibung erzwingen für einfachere Eingabe)
-        password_guess = input(f"PASSWORT EINGEBEN{hint}: ").strip().lower()
-
-        # Das korrekte Passwort (Matrix, erster Film der Wachowskis nach Bound)
-        correct_password = "matrix"
-
-        if password_guess == correct_password:
-            print_slow("ZUGRIFF GEWAEHRT. WILLKOMMEN ZURUECK.")
-            game_state['computer_logged_in'] = True
-            game_state['apartment_password_cracked'] = True
-            increase_alert_level(1) # Erfolgreicher Login ist ok
-             # Optional: Zettel "unwichtig" machen
-            if 'ZETTEL' in game_state['player_inventory'] or items['ZETTEL']['location'] == 'APARTMENT':
-                print_slow("(Der Zettel mit dem Hinweis scheint nun ueberfluessig.)")
-                items['ZETTEL']['description'] = "Ein zerknuellter Zettel. Die Schrift ist kaum noch lesbar."
-                items['ZETTEL']['read_text'] = "Die Schrift auf dem Zettel ist verwischt und kaum noch lesbar." # Eigener Lesetext
-            return True # Erfolg signalisieren
-        else:
-            attempts -= 1
-            print_slow(f"PASSWORT FALSCH. VERBLEIBENDE VERSUCHE: {attempts}")
-            increase_alert_level(2) # Fehlversuch ist schlecht
-            check_alert_level() # Sofort prüfen, ob das Konsequenzen hat
-            if attempts == 0:
-                print_slow("ZU VIELE FEHLVERSUCHE. SYSTEM TEMPORAER GESPERRT.")
-                # Hier könnte eine Wartezeit oder ein anderer Nachteil eingebaut werden
-                # Z.B. Computer für eine Weile unbenutzbar machen
-                return False # Misserfolg signalisieren
-
-    return False # Falls Schleife endet (sollte nicht passieren)
-
-def use_computer():
+    session.minigame = ('passwort', 3, hint) # 3 Versuche
+
+# Passwortabfrage (Kleinschreibung erzwingen für einfachere Eingabe)
+@minigame('passwort', prompt=lambda attempts, hint: f"PASSWORT EINGEBEN{hint}: ")
+def password_attempt(session, line, attempts, hint):
+    """Ein Versuch im Passwort-Minispiel."""
+    password_guess = line.strip().lower()
+
+    # Das korrekte Passwort (Matrix, erster Film der Wachowskis nach Bound)
+    correct_password = "matrix"
+
+    if password_guess == correct_password:
+        print_slow("ZUGRIFF GEWAEHRT. WILLKOMMEN ZURUECK.")
+        session.game_state.computer_logged_in = True
+        session.game_state.apartment_password_cracked = True
+        increase_alert_level(session, 1) # Erfolgreicher Login ist ok
+         # Optional: Zettel "unwichtig" machen
+        if 'ZETTEL' in session.inventory or session.placement.is_at('ZETTEL', 'APARTMENT'):
+            print_slow("(Der Zettel mit dem Hinweis scheint nun ueberfluessig.)")
+            zettel = session.edit_item('ZETTEL')
+            zettel.description = "Ein zerknuellter Zettel. Die Schrift ist kaum noch lesbar."
+            zettel.read_text = "Die Schrift auf dem Zettel ist verwischt und kaum noch lesbar." # Eigener Lesetext
+        return open_computer_interface(session) # Erfolg: weiter ins Computer-Interface
+
+    attempts -= 1
+    print_slow(f"PASSWORT FALSCH. VERBLEIBENDE VERSUCHE: {attempts}")
+    increase_alert_level(session, 2) # Fehlversuch ist schlecht
+    check_alert_level(session) # Sofort prüfen, ob das Konsequenzen hat
+    if attempts == 0:
+        print_slow("ZU VIELE FEHLVERSUCHE. SYSTEM TEMPORAER GESPERRT.")
+        # Hier könnte eine Wartezeit oder ein anderer Nachteil eingebaut werden
+        # Z.B. Computer für eine Weile unbenutzbar machen
+        return None # Misserfolg
+    return ('passwort', attempts, hint)
+
+def use_computer(session):
     """Interaktion mit dem Computer im Apartment."""
-    # Wenn noch nicht eingeloggt, Passwort knacken versuchen
-    if not game_state['computer_logged_in']:
-        if not crack_apartment_password():
-            return # Abbruch, wenn Passwort-Knacken fehlschlägt
+    # Wenn noch nicht eingeloggt, zuerst das Passwort knacken
+    if not session.game_state.computer_logged_in:
+        crack_apartment_password(session)
+    else:
+        session.minigame = open_computer_interface(session)
 
+def open_computer_interface(session):
+    """Zeigt das Computer-Interface an; liefert den Zustand des Computer-Modus."""
     # Ab hier ist der Spieler eingeloggt
     print_slow("\n--- COMPUTER INTERFACE ---")
     print_slow("SYSTEM 'HEIMBASIS' BEREIT.")
     print_slow("MOEGLICHE AKTIONEN: ONLINE GEHEN, LIES DISKETTE, SCANNE NETZWERK, LOGOUT")
-
-    in_computer_mode = True
-    while in_computer_mode:
-        comp_cmd = input("COMPUTER> ").strip().upper()
-        use_computer_command(comp_cmd)
-        # Prüfen, ob der Befehl den Modus beendet hat (z.B. Logout oder Wechsel ins Forum)
-        if game_state['current_location'] != 'APARTMENT' or not game_state['computer_logged_in']:
-            in_computer_mode = False
-            if game_state['current_location'] == 'APARTMENT': # Wenn nur ausgeloggt wurde
-                 print_slow("--- COMPUTER INTERFACE GESCHLOSSEN ---")
-
-
-def use_computer_command(comp_cmd):
+    return ('computer',)
+
+@minigame('computer', prompt=lambda: "COMPUTER> ")
+def computer_step(session, line):
+    """Ein Befehl im Computer-Modus."""
+    comp_cmd = line.strip().upper()
+    use_computer_command(session, comp_cmd)
+    # Prüfen, ob der Befehl den Modus beendet hat (z.B. Logout oder Wechsel ins Forum)
+    if session.game_state.current_location != 'APARTMENT' or not session.game_state.computer_logged_in:
+        if session.game_state.current_location == 'APARTMENT': # Wenn nur ausgeloggt wurde
+             print_slow("--- COMPUTER INTERFACE GESCHLOSSEN ---")
+        return None
+    return ('computer',)
+
+
+def use_computer_command(session, comp_cmd):
      """Verarbeitet Befehle innerhalb des Computer-Modus."""
      if comp_cmd == 'ONLINE GEHEN' or comp_cmd == 'ONLINE':
          # Prüfen ob die erste Nachricht entschlüsselt wurde als Voraussetzung
-         if game_state['decrypted_message_content'] == "FOLGE DEM WEISSEN KANINCHEN.":
+         if session.game_state.decrypted_message_content == "FOLGE DEM WEISSEN KANINCHEN.":
              print_slow("DU VERBINDEST DICH MIT DEM NETZWERK...")
-             time.sleep(1.5)
+             pause(1.5)
              print_slow("SUCHE NACH DEM 'KANINCHENBAU' FORUM...")
-             time.sleep(2)
+             pause(2)
              print_slow("VERBINDUNG HERGESTELLT.")
-             game_state['current_location'] = 'KANINCHENBAU_FORUM'
-             display_location()
+             session.game_state.current_location = 'KANINCHENBAU_FORUM'
+             display_location(session)
              # Verlässt implizit den Computer-Modus durch Ortswechsel
          else:
              print_slow("DU WEISST NICHT, WONACH DU SUCHEN SOLLST... DU BRAUCHST EINEN HINWEIS ODER EIN ZIEL.")
              print_slow("(Hast du schon die erste Nachricht auf dem Bildschirm dekryptiert?)")
 
      elif comp_cmd == 'LIES DISKETTE':
-         if 'DATEN_DISKETTE' in game_state['player_inventory']:
+         if 'DATEN_DISKETTE' in session.inventory:
              print_slow("Lese Diskette 'PROTOKOLL 7'...")
-             time.sleep(2)
+             pause(2)
              # Hier den Inhalt der Diskette enthüllen
              disk_content = ("INHALT: Verschluesselte Uebertragungslogs. Zeitstempel stimmen mit den 'Glitches' ueberein. Eine Signatur: 'Morpheus'. Eine Koordinatenangabe zu einer oeffentlichen Telefonzelle auf der STRASSE VOR DEM HAUS.")
              print_slow(wrap_text(disk_content))
              # Telefonzelle wird zum Ziel / wichtiger
              print_slow("\n(Die TELEFONZELLE auf der STRASSE erscheint nun sehr wichtig. Koennte sie der naechste Schritt sein?)")
-             increase_alert_level(2)
+             increase_alert_level(session, 2)
              # Flag setzen, damit das Telefon-Event ausgelöst werden kann
-             game_state['diskette_read'] = True
+             session.game_state.diskette_read = True
 
          else:
              print_slow("KEINE DISKETTE IM LAUFWERK. HAST DU SIE IM INVENTAR?")
 
      elif comp_cmd in ['SCANNE NETZWERK', 'SCAN NETZWERK', 'NETZWERK SCAN']:
           print_slow("DU STARTETST EINEN NETZWERK-SCAN...")
-          time.sleep(1.5)
+          pause(1.5)
           print_slow("SCAN ERGEBNISSE:")
           print_slow("- Lokales Netzwerk: HEIMBASIS (AKTUELL)")
           # Zeige andere bekannte/erreichbare Orte an
-          if 'CAFE' in locations: # Wenn das Cafe bekannt ist
+          if 'CAFE' in session.locations: # Wenn das Cafe bekannt ist
                 print_slow("- Oeffentliches Netzwerk: CYBER CAFE TERMINAL (IP: 192.168.1.101)")
-          if 'SERVER_FARM_EINGANG' in locations: # Wenn die Server Farm bekannt ist
+          if 'SERVER_FARM_EINGANG' in session.locations: # Wenn die Server Farm bekannt ist
                 print_slow("- Externe Adresse: SERVER-FARM (IP: 213.45.67.89 - HOHE SICHERHEIT)")
-          increase_alert_level(1)
+          increase_alert_level(session, 1)
 
      elif comp_cmd == 'LOGOUT':
          print_slow("DU LOGGST DICH VOM COMPUTER AUS.")
-         # game_state['computer_logged_in'] = False # Spieler bleibt eingeloggt, bis er das Spiel beendet? Oder hier ausloggen?
+         # session.game_state.computer_logged_in = False # Spieler bleibt eingeloggt, bis er das Spiel beendet? Oder hier ausloggen?
          # Entscheidung: Ausloggen macht Sinn, um Passwort erneut eingeben zu müssen.
-         game_state['computer_logged_in'] = False
+         session.game_state.computer_logged_in = False
          # Beendet die Computer-Schleife im aufrufenden use_computer()
      else:
          print_slow(f"UNBEKANNTER COMPUTER-BEFEHL: '{comp_cmd}'. Verfügbar: ONLINE GEHEN, LIES DISKETTE, SCANNE NETZWERK, LOGOUT")
 
 
-def start_port_scan_minigame():
+def start_port_scan_minigame(session):
     """Port-Scanning Minispiel für die Server-Farm."""
-    loc_id = game_state['current_location']
+    loc_id = session.game_state.current_location
     if loc_id != 'SERVER_FARM_EINGANG':
         print_slow("DU MUSST VOR DER SERVER-FARM STEHEN, UM PORTS ZU SCANNEN.")
         return
 
-    if game_state['server_farm_hacked']:
+    if session.game_state.server_farm_hacked:
         print_slow("DU HAST BEREITS EINEN ZUGANG ZUM SYSTEM ÜBER TELNET GEFUNDEN.")
         return
 
     print_slow("DU STARTETST EINEN PORT SCAN AUF DIE IP DER SERVER-FARM (213.45.67.89)...")
-    increase_alert_level(2) # Port Scan ist auffällig
-    time.sleep(2)
+    increase_alert_level(session, 2) # Port Scan ist auffällig
+    pause(2)
     # Ports, einer davon ist der richtige (Telnet für den Hinweis)
     ports = ['21 (FTP)', '22 (SSH)', '23 (TELNET)', '80 (HTTP)', '443 (HTTPS)', '6667 (IRC)']
-    random.shuffle(ports) # Mische die Reihenfolge für jeden Versuch
+    session.rng.shuffle(ports) # Mische die Reihenfolge für jeden Versuch
     print_slow("OFFENE PORTS GEFUNDEN:")
     for i, port_info in enumerate(ports):
-        print(f"{i+1}: {port_info}")
-        time.sleep(0.3)
+        print_line(f"{i+1}: {port_info}")
+        pause(0.3)
 
     print_slow("\nEINE VERSTECKTE SYSTEMNACHRICHT WIRD ABGEFANGEN:")
     # Einfache ROT13 Verschlüsselung für den Hinweis
@@ -1014,61 +2315,62 @@ def start_port_scan_minigame():
         print_slow("FEHLER: KORREKTER PORT NICHT IN LISTE GEFUNDEN (DEBUGGING)")
         return
 
-    attempts = 2
-    while attempts > 0:
-        try:
-            choice = input(f"WELCHEN PORT VERSUCHST DU ZU VERBINDEN (1-{len(ports)})?> ")
-            choice_index = int(choice)
-
-            if not (1 <= choice_index <= len(ports)):
-                 print_slow("UNGÜLTIGE AUSWAHL.")
-                 continue # Neue Eingabeaufforderung
-
-            chosen_port_info = ports[choice_index - 1]
-            print_slow(f"VERSUCHE VERBINDUNG MIT PORT {chosen_port_info}...")
-            time.sleep(1.5)
-
-            if choice_index == correct_port_index:
-                print_slow("VERBINDUNG UEBER PORT 23 HERGESTELLT!")
-                time.sleep(1)
-                print_slow(">>> TELNET-BANNER: 'UNAUTORISIERTER ZUGRIFF STRENGSTENS VERBOTEN! LOGGING AKTIV!' <<<")
-                print_slow("DU BIST DRIN! DU HAST EINE MINIMALE SHELL-SITZUNG.")
-                # Erfolg! Hier könnte Zugang zu Infos oder weiteren Hacks erfolgen.
-                game_state['server_farm_hacked'] = True
-                increase_alert_level(4) # Erfolgreicher Hack ist sehr auffällig
-                check_alert_level()
-                # Belohnung: Finde den Hinweis auf den Türcode
-                print_slow("\nIN DEN WILLKOMMENSNACHRICHTEN DER ALTEN SHELL FINDEST DU EINEN VERGESSENEN HINWEIS:")
-                print_slow("'ADMIN-NOTIZ: TUERCODE IST DAS JAHR, IN DEM DER ERSTE FILM IN DIE KINOS KAM.'") # Hinweis auf 1999 (Matrix)
-                game_state['server_farm_access_code'] = "1999" # Sicherstellen, dass er jetzt 'bekannt' ist
-                print_slow("(DU KANNST JETZT VERSUCHEN, DEN CODE AM NUMPAD EINZUGEBEN: 'CODE 1999')")
-                return # Minispiel erfolgreich beendet
-            else:
-                attempts -= 1
-                print_slow(f"VERBINDUNG FEHLGESCHLAGEN ODER ABGELEHNT. {attempts} VERSUCH(E) UEBRIG.")
-                increase_alert_level(2)
-                check_alert_level()
-                if attempts == 0:
-                    print_slow("SYSTEM HAT MEHRERE FEHLGESCHLAGENE VERBINDUNGSVERSUCHE REGISTRIERT! VERBINDUNG BLOCKIERT.")
-                    increase_alert_level(3) # Extra Strafe
-                    check_alert_level()
-                    return # Minispiel gescheitert
-        except ValueError:
-            print_slow("UNGÜLTIGE EINGABE. BITTE EINE ZAHL EINGEBEN.")
-        except IndexError:
-             print_slow("UNGÜLTIGE AUSWAHL. BITTE EINE ZAHL ZWISCHEN 1 UND {len(ports)} EINGEBEN.")
-
-
-    print_slow("DER PORT SCAN UND VERBINDUNGSVERSUCH WAR NICHT ERFOLGREICH.")
-
-
-def use_phone():
+    session.minigame = ('portscan', tuple(ports), correct_port_index, 2) # 2 Versuche
+
+@minigame('portscan', prompt=lambda ports, correct_port_index, attempts:
+          f"WELCHEN PORT VERSUCHST DU ZU VERBINDEN (1-{len(ports)})?> ")
+def port_scan_attempt(session, line, ports, correct_port_index, attempts):
+    """Ein Verbindungsversuch im Port-Scan-Minispiel."""
+    state = ('portscan', ports, correct_port_index, attempts) # Bei ungültiger Eingabe unverändert
+    try:
+        choice_index = int(line)
+    except ValueError:
+        print_slow("UNGÜLTIGE EINGABE. BITTE EINE ZAHL EINGEBEN.")
+        return state
+
+    if not (1 <= choice_index <= len(ports)):
+         print_slow("UNGÜLTIGE AUSWAHL.")
+         return state # Neue Eingabeaufforderung
+
+    chosen_port_info = ports[choice_index - 1]
+    print_slow(f"VERSUCHE VERBINDUNG MIT PORT {chosen_port_info}...")
+    pause(1.5)
+
+    if choice_index == correct_port_index:
+        print_slow("VERBINDUNG UEBER PORT 23 HERGESTELLT!")
+        pause(1)
+        print_slow(">>> TELNET-BANNER: 'UNAUTORISIERTER ZUGRIFF STRENGSTENS VERBOTEN! LOGGING AKTIV!' <<<")
+        print_slow("DU BIST DRIN! DU HAST EINE MINIMALE SHELL-SITZUNG.")
+        # Erfolg! Hier könnte Zugang zu Infos oder weiteren Hacks erfolgen.
+        session.game_state.server_farm_hacked = True
+        increase_alert_level(session, 4) # Erfolgreicher Hack ist sehr auffällig
+        check_alert_level(session)
+        # Belohnung: Finde den Hinweis auf den Türcode
+        print_slow("\nIN DEN WILLKOMMENSNACHRICHTEN DER ALTEN SHELL FINDEST DU EINEN VERGESSENEN HINWEIS:")
+        print_slow("'ADMIN-NOTIZ: TUERCODE IST DAS JAHR, IN DEM DER ERSTE FILM IN DIE KINOS KAM.'") # Hinweis auf 1999 (Matrix)
+        session.game_state.server_farm_access_code = "1999" # Sicherstellen, dass er jetzt 'bekannt' ist
+        print_slow("(DU KANNST JETZT VERSUCHEN, DEN CODE AM NUMPAD EINZUGEBEN: 'CODE 1999')")
+        return None # Minispiel erfolgreich beendet
+
+    attempts -= 1
+    print_slow(f"VERBINDUNG FEHLGESCHLAGEN ODER ABGELEHNT. {attempts} VERSUCH(E) UEBRIG.")
+    increase_alert_level(session, 2)
+    check_alert_level(session)
+    if attempts == 0:
+        print_slow("SYSTEM HAT MEHRERE FEHLGESCHLAGENE VERBINDUNGSVERSUCHE REGISTRIERT! VERBINDUNG BLOCKIERT.")
+        increase_alert_level(session, 3) # Extra Strafe
+        check_alert_level(session)
+        return None # Minispiel gescheitert
+    return ('portscan', ports, correct_port_index, attempts)
+
+
+def use_phone(session):
     """Benutzt das Telefon in der Zelle."""
-    if game_state['current_location'] != 'TELEFONZELLE_INNERES':
+    if session.game_state.current_location != 'TELEFONZELLE_INNERES':
         print_slow("DU BIST NICHT IN EINER TELEFONZELLE.")
         return
 
-    if game_state['phone_ringing']:
+    if session.game_state.phone_ringing:
          print_slow("DAS TELEFON KLINGELT LAUT! NIMM LIEBER DEN HOERER AB ('BENUTZE HOERER').")
     else:
          print_slow("DU NIMMST DEN HOERER AB. ES IST EIN WAEHLTON ZU HOEREN.")
@@ -1077,36 +2379,36 @@ def use_phone():
          # z.B. input("NUMMER WAEHLEN?> ") und dann prüfen.
 
 
-def use_phone_receiver():
+def use_phone_receiver(session):
      """Nimmt den Hörer in der klingelnden Zelle ab."""
-     if game_state['current_location'] != 'TELEFONZELLE_INNERES':
+     if session.game_state.current_location != 'TELEFONZELLE_INNERES':
         print_slow("WO IST EIN HOERER?")
         return
 
-     if game_state['phone_ringing']:
+     if session.game_state.phone_ringing:
          print_slow("DU NIMMST DEN SCHWEREN, KUEHLEN BAKELIT-HOERER ANS OHR. DAS KLINGELN STOPPT SOFORT.")
-         increase_alert_level(1) # Auffällige Aktion
-         time.sleep(1.5)
+         increase_alert_level(session, 1) # Auffällige Aktion
+         pause(1.5)
          print_slow("Eine ruhige, tiefe, vertrauenswürdig klingende Stimme sagt: 'Hallo?'")
-         time.sleep(1.5)
+         pause(1.5)
          # Hier könnte der Dialog mit Morpheus beginnen oder eine wichtige Info kommen
          print_slow("'Ich weiss, wonach du suchst', sagt die Stimme. 'Die Anomalien. Die Glitches in der Realitaet.'")
-         time.sleep(2)
+         pause(2)
          print_slow("'Die Wahrheit ist da draussen, aber sie ist gefaehrlich.'")
-         time.sleep(1.5)
+         pause(1.5)
          print_slow("'Du hast einen ersten Schritt gemacht. Aber sei vorsichtig. Sie beobachten dich jetzt.'")
-         time.sleep(2)
+         pause(2)
          print_slow("'Es gibt andere wie uns. Suche im 'KANINCHENBAU' nach dem ORACLE. Sie erwartet dich.'")
-         time.sleep(2.5)
+         pause(2.5)
          print_slow("KLICK.")
          print_slow("Die Verbindung bricht ab. Nur noch Stille und das leise Rauschen der Leitung.")
-         game_state['phone_ringing'] = False # Klingeln hört auf
-         increase_alert_level(-1) # Etwas Entspannung oder Fokus?
+         session.game_state.phone_ringing = False # Klingeln hört auf
+         increase_alert_level(session, -1) # Etwas Entspannung oder Fokus?
          # Wichtiger Story-Fortschritt markieren
-         game_state['oracle_contacted'] = True # Flag, dass Morpheus kontaktiert wurde
+         session.game_state.oracle_contacted = True # Flag, dass Morpheus kontaktiert wurde
          # Zugang zum Oracle im Forum freischalten (Beispiel)
-         if 'KANINCHENBAU_FORUM' in locations:
-              locations['KANINCHENBAU_FORUM']['details']['ORACLE'] = "DER PRIVATE BEREICH DES ORACLES. ZUGANG JETZT MOEGLICH."
+         if 'KANINCHENBAU_FORUM' in session.locations:
+              session.edit_location('KANINCHENBAU_FORUM').details['ORACLE'] = "DER PRIVATE BEREICH DES ORACLES. ZUGANG JETZT MOEGLICH."
               # Eventuell einen neuen Befehl freischalten oder Hinweis geben:
               print_slow("(Du koenntest jetzt im KANINCHENBAU Forum versuchen, das ORACLE zu kontaktieren.)")
 
@@ -1115,142 +2417,2602 @@ def use_phone_receiver():
 
 
 # --- Spielmechanik ---
-def increase_alert_level(amount):
+def increase_alert_level(session, amount):
   """Erhöht oder verringert den Alert-Level und gibt Feedback."""
   if amount == 0:
       return
 
-  game_state['alert_level'] += amount
-  game_state['alert_level'] = max(0, game_state['alert_level']) # Nicht unter 0 fallen
-  game_state['alert_level'] = min(10, game_state['alert_level']) # Obergrenze (optional)
+  old_level = session.game_state.alert_level
+  session.game_state.alert_level += amount
+  session.game_state.alert_level = max(0, session.game_state.alert_level) # Nicht unter 0 fallen
+  session.game_state.alert_level = min(10, session.game_state.alert_level) # Obergrenze (optional)
 
   # Feedback basierend auf dem NEUEN Level
-  level = game_state['alert_level']
+  level = session.game_state.alert_level
   if amount > 0:
       if level <= 2:
-          print_slow("(Du fuehlst dich noch relativ unbemerkt.)")
+          tier, feedback = 'unbemerkt', "(Du fuehlst dich noch relativ unbemerkt.)"
       elif level <= 4:
-          print_slow("(Ein ungutes Gefühl... als ob jemand deine Aktivitaeten bemerkt.)")
+          tier, feedback = 'beobachtet', "(Ein ungutes Gefühl... als ob jemand deine Aktivitaeten bemerkt.)"
       elif level <= 6:
-           print_slow("[SYSTEM WARNUNG: Erhoehte Ueberwachungsaktivitaet in deinem Sektor!]")
+           tier, feedback = 'warnung', "[SYSTEM WARNUNG: Erhoehte Ueberwachungsaktivitaet in deinem Sektor!]"
       else: # level >= 7
-           print_slow("[ALARM! HOECHSTE GEFAHRENSTUFE! DEINE POSITION IST WAHRSCHEINLICH KOMPROMITTIERT!]")
-  elif amount < 0:
-       print_slow("(Die digitale Anspannung laesst etwas nach.)")
+           tier, feedback = 'alarm', "[ALARM! HOECHSTE GEFAHRENSTUFE! DEINE POSITION IST WAHRSCHEINLICH KOMPROMITTIERT!]"
+  else:
+       tier, feedback = 'entspannung', "(Die digitale Anspannung laesst etwas nach.)"
+  emit_event('alert_changed', feedback, old=old_level, new=level, tier=tier)
+
+  # print(f"DEBUG: Alert Level = {session.game_state.alert_level}") # Zum Testen
 
-  # print(f"DEBUG: Alert Level = {game_state['alert_level']}") # Zum Testen
 
+ALERT_LIMIT = 8 # Ab diesem Alert-Level ist das Spiel verloren
 
-def check_alert_level():
+def check_alert_level(session):
     """Prüft, ob der Alert-Level zu hoch ist und löst Konsequenzen aus."""
-    level = game_state['alert_level']
-
-    if level >= 8: # Game Over Schwelle
-        print_slow("\n" + "!" * WIDTH)
-        print_slow("!!! SYSTEM ALARM !!!")
-        time.sleep(1)
-        print_slow("DEINE VERBINDUNG WIRD GEKAPERT! MEHRERE EXTERNE ZUGRIFFE!")
-        time.sleep(1.5)
-        # Abhängig vom Ort andere Meldungen?
-        current_loc = game_state['current_location']
-        if current_loc == 'APARTMENT':
-            print_slow("DU HOERST SIRENEN AUF DER STRASSE! SCHRITTE POLTERN IM TREPPENHAUS!")
-            time.sleep(1)
-            print_slow("DIE TUER ZU DEINEM APARTMENT WIRD AUFGEBROCHEN!")
-        elif current_loc == 'CAFE':
-            print_slow("DER MANN HINTER DER THEKE ZIEHT EINE WAFFE! DIE ANDEREN GESTALTEN STEHEN AUF!")
-            time.sleep(1)
-            print_slow("LICHTER ZUCKEN VOR DEM FENSTER!")
-        elif current_loc == 'STRASSE' or current_loc == 'TELEFONZELLE_INNERES':
-             print_slow("SCHWARZE LIMOUSINEN RASEN UM DIE ECKE! MAENNER IN SCHWARZEN ANZUEGEN SPRINGEN HERAUS!")
-        else: # Generisch
-             print_slow("EIN OHRENBETAEUBENDES RAUSCHEN ERFUELLT DEINE SINNE! DEINE SICHT VERSCHWIMMT!")
-             time.sleep(1)
-             print_slow("DU WIRST GEWALTSAM AUS DEM SYSTEM GEWORFEN!")
-
-        time.sleep(1.5)
-        print_slow("'Wir haben ihn.', hörst du eine kalte Stimme sagen.")
-        time.sleep(1)
-        print_slow("Alles wird schwarz...")
-        print_slow("\n" + "-"*WIDTH)
-        print_slow("--- VERBINDUNG PERMANENT UNTERBROCHEN ---")
-        print_slow("--- SPIEL ENDE ---")
-        print("!" * WIDTH)
-        sys.exit()
-
-    elif level >= 6 and random.randint(1, 3) == 1: # Zufällige niedrigere Bedrohung bei hohem Level
-         print_slow("\n[SYSTEM WARNUNG: Unbekannte Prozesse analysieren deine Netzwerkverbindung intensiv... SEI EXTREM VORSICHTIG!]")
-         time.sleep(1)
-    elif level >= 4 and random.randint(1, 5) == 1: # Zufällige niedrigere Bedrohung bei mittlerem Level
-        print_slow("\n(Ein kurzer Glitch auf deinem Monitor... oder bildest du dir das nur ein?)")
-        time.sleep(0.5)
+    fire_triggers(session, 'alarm')
 
 
 # --- Ereignisse und Überraschungen ---
-
-def trigger_phone_event_check():
-    """Prüft, ob das Telefon klingeln sollte."""
-    # Bedingungen:
-    # 1. Spieler hat die Diskette gelesen (weiss von der Telefonzelle)
-    # 2. Spieler ist auf der Strasse (in der Nähe der Zelle)
-    # 3. Telefon klingelt nicht bereits
-    # 4. Morpheus/Oracle wurde noch nicht kontaktiert
-    # 5. Zufällige Chance
-    should_ring = (
-        game_state.get('diskette_read', False) and
-        game_state['current_location'] == 'STRASSE' and
-        not game_state['phone_ringing'] and
-        not game_state['oracle_contacted'] and
-        random.randint(1, 8) == 1 # Chance 1 zu 8 pro Zug auf der Strasse
-    )
-
-    if should_ring:
-         print_slow("\n*** RIIING RIIING... RIIING RIIING ***")
-         time.sleep(0.8)
-         print_slow("Das oeffentliche Telefon in der Zelle neben dir beginnt laut und eindringlich zu klingeln!")
-         game_state['phone_ringing'] = True
-         # Hinweis geben
-         print_slow("(Du koenntest zur 'TELEFONZELLE' gehen und den 'HOERER' benutzen, um abzunehmen.)")
-         increase_alert_level(1) # Das Klingeln könnte Aufmerksamkeit erregen
+# Ereignisse werden deklariert: welche Felder und Flags aus game_state ihre Bedingung liest
+# (depends), wann sie eintreten können (when) und mit welcher Chance pro Prüfung
+# (chance, gezogen aus session.rng). Eine Bedingung wird nur neu ausgewertet,
+# wenn sich eines ihrer Flags geändert hat; geprüft werden nur die Ereignisse,
+# deren Bedingung gerade erfüllt ist. Pro Prüfung tritt in jeder Gruppe höchstens
+# ein Ereignis ein - das erste in Deklarationsreihenfolge (wie eine if/elif-Kette).
+Trigger = collections.namedtuple('Trigger', 'name group depends when chance')
+
+TRIGGERS = [] # Alle Ereignisse in Prüfreihenfolge
+TRIGGER_ACTIONS = {} # Name -> Aktion(session)
+TRIGGER_DEPENDENTS = {} # Flag -> Indizes der Ereignisse, deren Bedingung es liest
+
+def trigger(group, depends, when, chance=None):
+  """Dekorator: registriert eine Aktion als Ereignis der Gruppe `group`."""
+  def register(action):
+    index = len(TRIGGERS)
+    TRIGGERS.append(Trigger(action.__name__, group, tuple(depends), when, chance))
+    TRIGGER_ACTIONS[action.__name__] = action
+    for flag in depends:
+      TRIGGER_DEPENDENTS.setdefault(flag, []).append(index)
+    return action
+  return register
+
+class TriggerState:
+  """Welche Ereignisse einer Sitzung gerade eintreten können."""
+
+  def __init__(self):
+    self.seen = None # GameState.key() beim letzten Abgleich
+    self.armed = set() # Indizes der Ereignisse, deren Bedingung erfüllt ist
+
+  def sync(self, state):
+    """Wertet die Bedingungen neu aus, deren Flags sich seit dem letzten Abgleich geändert haben."""
+    key = state.key()
+    if key == self.seen:
+      return
+    stale = set()
+    for name in state.changed(self.seen):
+      stale.update(TRIGGER_DEPENDENTS.get(name, ()))
+    self.seen = key
+    for index in stale:
+      if TRIGGERS[index].when(state):
+        self.armed.add(index)
+      else:
+        self.armed.discard(index)
+
+def fire_triggers(session, group=None):
+  """Lässt eintretende Ereignisse geschehen (alle Gruppen oder nur `group`)."""
+  triggers = session.triggers
+  triggers.sync(session.game_state)
+  fired = set() # Gruppen, in denen schon etwas eingetreten ist
+  last = -1
+  while triggers.armed:
+    pending = [index for index in triggers.armed
+               if index > last and TRIGGERS[index].group not in fired
+               and (group is None or TRIGGERS[index].group == group)]
+    if not pending:
+      return
+    last = min(pending)
+    event = TRIGGERS[last]
+    if event.chance and not session.rng.one_in(event.chance):
+      continue
+    fired.add(event.group)
+    TRIGGER_ACTIONS[event.name](session)
+    triggers.sync(session.game_state) # Die Aktion kann weitere Ereignisse auslösen oder verhindern
+
+@trigger('alarm', depends=('alert_level',), when=lambda state: state.alert_level >= ALERT_LIMIT)
+def alert_game_over(session):
+    """Der Alert-Level ist zu hoch: Das Spiel ist verloren."""
+    print_line()
+    print_banner("!" * screen_width(), 'alarm')
+    print_banner("!!! SYSTEM ALARM !!!", 'alarm')
+    pause(1)
+    print_slow("DEINE VERBINDUNG WIRD GEKAPERT! MEHRERE EXTERNE ZUGRIFFE!")
+    pause(1.5)
+    # Abhängig vom Ort andere Meldungen?
+    current_loc = session.game_state.current_location
+    if current_loc == 'APARTMENT':
+        print_slow("DU HOERST SIRENEN AUF DER STRASSE! SCHRITTE POLTERN IM TREPPENHAUS!")
+        pause(1)
+        print_slow("DIE TUER ZU DEINEM APARTMENT WIRD AUFGEBROCHEN!")
+    elif current_loc == 'CAFE':
+        print_slow("DER MANN HINTER DER THEKE ZIEHT EINE WAFFE! DIE ANDEREN GESTALTEN STEHEN AUF!")
+        pause(1)
+        print_slow("LICHTER ZUCKEN VOR DEM FENSTER!")
+    elif current_loc == 'STRASSE' or current_loc == 'TELEFONZELLE_INNERES':
+         print_slow("SCHWARZE LIMOUSINEN RASEN UM DIE ECKE! MAENNER IN SCHWARZEN ANZUEGEN SPRINGEN HERAUS!")
+    else: # Generisch
+         print_slow("EIN OHRENBETAEUBENDES RAUSCHEN ERFUELLT DEINE SINNE! DEINE SICHT VERSCHWIMMT!")
+         pause(1)
+         print_slow("DU WIRST GEWALTSAM AUS DEM SYSTEM GEWORFEN!")
+
+    pause(1.5)
+    print_slow("'Wir haben ihn.', hörst du eine kalte Stimme sagen.")
+    pause(1)
+    print_slow("Alles wird schwarz...")
+    print_slow("\n" + "-"*screen_width())
+    print_banner("--- VERBINDUNG PERMANENT UNTERBROCHEN ---", 'alarm')
+    print_banner("--- SPIEL ENDE ---", 'alarm')
+    print_rule("!")
+    emit_event('game_over', reason='alarm', alert_level=session.game_state.alert_level)
+    sys.exit()
+
+@trigger('alarm', depends=('alert_level',), when=lambda state: state.alert_level >= 6, chance=3)
+def alert_warning(session):
+    """Zufällige niedrigere Bedrohung bei hohem Level."""
+    print_slow("\n[SYSTEM WARNUNG: Unbekannte Prozesse analysieren deine Netzwerkverbindung intensiv... SEI EXTREM VORSICHTIG!]")
+    pause(1)
+
+@trigger('alarm', depends=('alert_level',), when=lambda state: state.alert_level >= 4, chance=5)
+def alert_glitch(session):
+    """Zufällige niedrigere Bedrohung bei mittlerem Level."""
+    print_slow("\n(Ein kurzer Glitch auf deinem Monitor... oder bildest du dir das nur ein?)")
+    pause(0.5)
+
+# Das Telefon klingelt (Chance 1 zu 8 pro Zug), wenn der Spieler die Diskette
+# gelesen hat (weiss von der Telefonzelle), auf der Strasse steht (in der Nähe
+# der Zelle), es nicht schon klingelt und Morpheus/Oracle noch nicht kontaktiert
+# wurde - und er nicht gerade im Computer-Interface ist.
+@trigger('telefon', depends=('diskette_read', 'current_location', 'phone_ringing', 'oracle_contacted',
+                             'computer_logged_in'),
+         when=lambda state: (state.diskette_read and
+                             state.current_location == 'STRASSE' and
+                             not state.phone_ringing and
+                             not state.oracle_contacted and
+                             not state.computer_logged_in),
+         chance=8)
+def phone_rings(session):
+    """Das Telefon in der Zelle beginnt zu klingeln."""
+    print_slow("\n*** RIIING RIIING... RIIING RIIING ***")
+    pause(0.8)
+    print_slow("Das oeffentliche Telefon in der Zelle neben dir beginnt laut und eindringlich zu klingeln!")
+    session.game_state.phone_ringing = True
+    # Hinweis geben
+    print_slow("(Du koenntest zur 'TELEFONZELLE' gehen und den 'HOERER' benutzen, um abzunehmen.)")
+    increase_alert_level(session, 1) # Das Klingeln könnte Aufmerksamkeit erregen
 
 # (trigger_phone_pickup_event ist jetzt in handle_go und use_phone_receiver integriert)
 
-# --- Hauptspiel-Schleife ---
-def main():
-  """Hauptfunktion des Spiels."""
-  print_c64_header()
-  display_location()
+# --- Weltuhr ---
+# Im Server läuft auf Wunsch (--world-tick) eine Weltuhr: Zwischen den Befehlen
+# sinkt der Alert-Level langsam wieder, und ab PURSUIT_LEVEL kommt jedem Spieler
+# sein Agent über die Ausgänge der Welt Ort für Ort näher. Steht der Agent im
+# selben Ort, steigt der Alert-Level. Die Uhr treibt alle Sitzungen eines
+# Prozesses in einem Schritt voran - mit numpy vektorisiert, sonst in einer
+# einfachen Schleife. Sichtbar wird ein Schritt nur, wenn der Agent zuschlägt
+# oder der Alert-Level eine Schwelle aus ALERT_TIERS überschreitet; das läuft
+# dann im Task der Sitzung (mit den üblichen Alarm-Ereignissen). Leise
+# Änderungen schreibt die Uhr direkt. Beides kommt in die Aufzeichnung, die
+# Wiedergabe bleibt also exakt.
+try:
+  import numpy
+except ImportError: # Optional; ohne numpy rechnet die Uhr mit Listen
+  numpy = None
+
+WORLD_TICK = None # Sekunden zwischen zwei Schritten der Weltuhr (--world-tick); None = aus
+WORLD_CLOCK = None # Die WorldClock des Prozesses, solange die Weltuhr läuft
+PURSUIT_LEVEL = 3 # Ab diesem Alert-Level jagen die Agenten den Spieler
+ALERT_DECAY_TICKS = 6 # Nach so vielen ruhigen Schritten sinkt der Alert-Level um 1
+ALERT_TIERS = (4, 6, ALERT_LIMIT) # Schwellen wie bei den Alarm-Ereignissen
+WORLD_TICK_MARKER = object() # In TelnetConnection.lines: "die Weltuhr hat etwas zu melden"
+_game_state_of = operator.attrgetter('game_state')
+_alert_of = operator.attrgetter('alert_level')
+_location_of = operator.attrgetter('current_location')
+
+def pursuit_table(world):
+  """Wegetabelle der Agenten: (Orts-IDs, Index je ID, nächste Schritte, Startort der Agenten).
+
+  `hops[von * n + nach]` ist der Nachbarort auf einem kürzesten Weg (der Ort
+  selbst, wenn `nach` unerreichbar ist). Agenten starten am Ort, der am
+  weitesten vom Startort entfernt ist. Wird einmal je Welt berechnet.
+  """
+  if world.pursuit is None:
+    ids = list(world.locations)
+    index = {loc_id: i for i, loc_id in enumerate(ids)}
+    n = len(ids)
+    incoming = [[] for _ in ids]
+    for loc_id, location in world.locations.items():
+      for dest_id in location.exits.values():
+        if dest_id in index:
+          incoming[index[dest_id]].append(index[loc_id])
+    hops = [source for source in range(n) for _ in range(n)]
+    agent_start = start = index[world.start_location]
+    for target in range(n): # Breitensuche rückwärts vom Ziel
+      frontier, seen = [target], {target}
+      while frontier:
+        following = []
+        for here in frontier:
+          for source in incoming[here]:
+            if source not in seen:
+              seen.add(source)
+              hops[source * n + target] = here
+              following.append(source)
+        if target == start and following:
+          agent_start = following[0]
+        frontier = following
+    if numpy is not None:
+      hops = numpy.array(hops, dtype=numpy.int32)
+    world.pursuit = (ids, index, hops, agent_start)
+  return world.pursuit
+
+class WorldClock:
+  """Alert-Level und Agenten aller Sitzungen eines Prozesses.
+
+  Jede Sitzung hat einen Slot; Position und ruhige Schritte ihres Agenten
+  liegen in dichten Feldern (numpy-Arrays oder Listen), beim Verlassen rückt
+  der letzte Slot nach.
+  """
+
+  def __init__(self, world=None):
+    self.world = world or WORLD
+    self.ids, self.index, self.hops, self.agent_start = pursuit_table(self.world)
+    self.size = len(self.ids)
+    self.sessions = [] # Slot -> Sitzung
+    self.wakers = [] # Slot -> Rückruf, der die wartende Sitzung weckt
+    self.slots = {} # Sitzung -> Slot
+    if numpy is None:
+      self.agents, self.quiet = [], []
+    else:
+      self.agents = numpy.zeros(64, dtype=numpy.int32) # Kapazität, belegt sind len(self.sessions)
+      self.quiet = numpy.zeros(64, dtype=numpy.int32)
+
+  def join(self, session, wake):
+    """Nimmt eine Sitzung auf; `wake()` muss sie aus dem Warten auf eine Eingabe holen."""
+    slot = len(self.sessions)
+    self.slots[session] = slot
+    self.sessions.append(session)
+    self.wakers.append(wake)
+    if numpy is None:
+      self.agents.append(self.agent_start)
+      self.quiet.append(0)
+      return
+    if slot == len(self.agents):
+      self.agents = numpy.concatenate((self.agents, numpy.zeros(slot, dtype=numpy.int32)))
+      self.quiet = numpy.concatenate((self.quiet, numpy.zeros(slot, dtype=numpy.int32)))
+    self.agents[slot] = self.agent_start
+    self.quiet[slot] = 0
+
+  def leave(self, session):
+    slot = self.slots.pop(session)
+    last = len(self.sessions) - 1
+    if slot != last:
+      moved = self.sessions[last]
+      self.sessions[slot] = moved
+      self.wakers[slot] = self.wakers[last]
+      self.agents[slot] = self.agents[last]
+      self.quiet[slot] = self.quiet[last]
+      self.slots[moved] = slot
+    self.sessions.pop()
+    self.wakers.pop()
+    if numpy is None:
+      self.agents.pop()
+      self.quiet.pop()
+
+  def step(self):
+    """Ein Schritt für alle Sitzungen; liefert die Zahl der geweckten Sitzungen."""
+    if not self.sessions:
+      return 0
+    states = list(map(_game_state_of, self.sessions))
+    alerts = list(map(_alert_of, states))
+    players = list(map(self.index.__getitem__, map(_location_of, states)))
+    step = self._step_lists if numpy is None else self._step_arrays
+    woken = 0
+    for slot, delta, loud in zip(*step(alerts, players)): # Nur Sitzungen, bei denen sich etwas ändert
+      session = self.sessions[slot]
+      if session.pending_tick is not None: # Wartet schon auf die Anzeige: dazurechnen
+        session.pending_tick += delta
+      elif loud:
+        session.pending_tick = delta
+        self.wakers[slot]()
+        woken += 1
+      else:
+        apply_world_tick(session, delta, False)
+    return woken
+
+  def _step_arrays(self, alerts, players):
+    """Der Schritt mit numpy; liefert (Slots, Änderungen, laut?) der geänderten Sitzungen."""
+    count = len(alerts)
+    alert = numpy.array(alerts, dtype=numpy.int32)
+    player = numpy.array(players, dtype=numpy.int32)
+    agent = self.agents[:count] # Sichten: Änderungen landen direkt in den Feldern
+    quiet = self.quiet[:count]
+    hunting = alert >= PURSUIT_LEVEL
+    agent[hunting] = self.hops[agent[hunting] * self.size + player[hunting]]
+    caught = hunting & (agent == player)
+    quiet += 1
+    quiet[hunting] = 0
+    relaxed = quiet >= ALERT_DECAY_TICKS
+    quiet[relaxed] = 0
+    new = numpy.clip(alert + caught - relaxed, 0, 10)
+    changed = numpy.flatnonzero(new != alert)
+    alert, new = alert[changed], new[changed]
+    crossed = numpy.searchsorted(ALERT_TIERS, alert, 'right') != numpy.searchsorted(ALERT_TIERS, new, 'right')
+    return changed.tolist(), (new - alert).tolist(), (caught[changed] | crossed).tolist()
+
+  def _step_lists(self, alerts, players):
+    """Derselbe Schritt ohne numpy."""
+    hops, size, agents, quiet = self.hops, self.size, self.agents, self.quiet
+    changed, deltas, loud = [], [], []
+    for slot, alert in enumerate(alerts):
+      caught = False
+      if alert >= PURSUIT_LEVEL:
+        agents[slot] = hops[agents[slot] * size + players[slot]]
+        caught = agents[slot] == players[slot]
+        quiet[slot] = 0
+        new = min(10, alert + 1) if caught else alert
+      else:
+        quiet[slot] += 1
+        new = alert
+        if quiet[slot] >= ALERT_DECAY_TICKS:
+          quiet[slot] = 0
+          new = max(0, alert - 1)
+      if new != alert:
+        changed.append(slot)
+        deltas.append(new - alert)
+        loud.append(caught or bisect.bisect_right(ALERT_TIERS, alert) != bisect.bisect_right(ALERT_TIERS, new))
+    return changed, deltas, loud
+
+  async def run(self, interval):
+    """Treibt die Uhr alle `interval` Sekunden (echte Zeit) voran."""
+    while True:
+      await asyncio.sleep(interval)
+      self.step()
+
+def start_world_clock():
+  """Startet die Weltuhr im laufenden Event-Loop, falls --world-tick gesetzt ist."""
+  global WORLD_CLOCK
+  if WORLD_TICK:
+    WORLD_CLOCK = WorldClock()
+    asyncio.create_task(WORLD_CLOCK.run(WORLD_TICK))
+
+def apply_world_tick(session, delta, loud):
+  """Wendet eine Änderung der Weltuhr an (auch beim Nachspielen einer Aufzeichnung).
+
+  Leise Änderungen setzen nur den Alert-Level; laute zeigen den Agenten bzw.
+  die neue Stufe an und prüfen die Alarm-Ereignisse (bis zum Game Over).
+  """
+  session.recording.append(['uhr', delta, loud]) # Zwischen den Eingaben, wo sie passiert ist
+  if not loud:
+    state = session.game_state
+    state.alert_level = max(0, min(10, state.alert_level + delta))
+    return
+  if delta > 0:
+    print_slow("\n[SCHRITTE HINTER DIR... EIN AGENT HAT DEINE SPUR AUFGENOMMEN!]")
+  increase_alert_level(session, delta)
+  check_alert_level(session)
 
-  while True:
-    # 1. Alert Level prüfen (kann zum Spielende führen)
-    check_alert_level()
+def run_pending_tick(session):
+  """Holt eine von der Weltuhr gemeldete Änderung im Task der Sitzung nach."""
+  delta, session.pending_tick = session.pending_tick, None
+  if delta:
+    apply_world_tick(session, delta, True)
 
-    # 2. Zufällige Ereignisse prüfen (z.B. Telefon klingeln)
-    # Nur prüfen, wenn der Spieler nicht gerade im Computer-Interface ist
-    if game_state['current_location'] != 'KANINCHENBAU_FORUM' and not game_state['computer_logged_in']:
-         trigger_phone_event_check()
+# --- Hauptspiel-Schleife ---
+def run_turn_events(session):
+  """Was vor jeder Eingabe passiert (kann über sys.exit zum Spielende führen)."""
+  fire_triggers(session)
+
+async def play_turn(session, events=True):
+  """Ein Durchlauf der Spielschleife: Ereignisse, Eingabe, Befehl.
+
+  Läuft ein Minispiel, geht die Eingabe stattdessen an dessen nächsten Schritt.
+  `events=False` überspringt die Ereignisse - für die erste Runde einer
+  umgezogenen Sitzung, deren Ereignisse schon auf dem alten Worker liefen.
+  """
+  if session.minigame is not None:
+    minigame_step(session, await read_input(session, minigame_prompt(session)))
+    return
 
-    # 3. Spielereingabe holen
-    command = get_player_input()
-    if not command:
-      continue # Leere Eingabe ignorieren
+  # 1. + 2. Alert Level und zufällige Ereignisse prüfen
+  if events:
+    run_turn_events(session)
+
+  # 3. Spielereingabe holen
+  command = await get_player_input(session)
+  if not command:
+    return # Leere Eingabe ignorieren
+
+  # 4. Befehl parsen
+  cmd = parse_command(command)
+  if cmd is None:
+    return # Ungültiger Befehl
+
+  # 5. Befehl verarbeiten
+  print_rule() # Trennlinie vor der Antwort
+  handle_command(session, cmd)
+
+  # 6. Kleinen Moment warten (optional, für Lesbarkeit)
+  # pause(0.1)
+
+async def game_loop(session, resumed=False, intro=True):
+  """Die Spielschleife einer Sitzung (als Coroutine, damit viele parallel laufen können).
+
+  Mit `resumed=True` setzt sie eine umgezogene Sitzung direkt am Prompt fort,
+  mit `intro=False` beginnt sie ohne C64-Startbildschirm.
+  """
+  _live_sessions.add(session)
+  if TRANSCRIPT_WRITER:
+    session.transcript = TRANSCRIPT_WRITER.open(session)
+    current_renderer().transcript = session.transcript
+  moved = False
+  try:
+    if resumed:
+      await play_turn(session, events=False)
+    else:
+      if intro:
+        print_c64_header()
+      display_location(session)
+    while True:
+      await play_turn(session)
+  except SessionMoved:
+    moved = True # Die Partie läuft auf einem anderen Worker weiter
+    raise
+  finally:
+    _live_sessions.discard(session)
+    if session.profiler:
+      report_profile(stop_profiling(session))
+    if session.record_dir and not moved:
+      write_recording(session, session.record_dir)
+    if session.transcript:
+      current_renderer().transcript = None
+      session.transcript.close('umgezogen' if moved else None)
+
+def main(session=None):
+  """Hauptfunktion des Spiels im lokalen Terminal."""
+  if session is None:
+    session = GameSession(record_dir=RECORD_DIR, admin=True)
+  install_signal_handlers()
+  try:
+    asyncio.run(game_loop(session))
+  except EOFError: # Strg+D oder das Ende einer umgeleiteten Eingabe
+    print_line()
+
+# --- Stapelbetrieb ---
+# Mit --batch liest das Spiel seine Eingaben aus einer Datei oder der Standard-
+# Eingabe: ohne Startbildschirm und ohne Pausen, jede Zeile geht wie getippt an
+# den Prompt (auch an Minispiele) und erscheint hinter ihm in der Ausgabe.
+# Zeilen, die mit # beginnen, sind Kommentare. Das Ergebnis der Partie wird zum
+# Exit-Code; 1 (Absturz) und 2 (falscher Aufruf) bleiben Python und argparse.
+BATCH_EXIT_CODES = {
+    'gewonnen': 0, # Zugang zur Server-Farm erreicht (WIN_FLAG)
+    'game_over': 3, # Alert-Level zu hoch
+    'beendet': 4, # QUIT im Skript
+    'skript_zu_ende': 5, # Keine Eingaben mehr, die Partie läuft noch
+}
 
-    # 4. Befehl parsen
-    verb, args = parse_command(command)
-    if not verb:
-      continue # Ungültiger Befehl
+def batch_outcome(session, exited):
+  """Wie eine Partie im Stapelbetrieb ausgegangen ist (Schlüssel von BATCH_EXIT_CODES)."""
+  if exited and session.game_state.alert_level >= ALERT_LIMIT:
+    return 'game_over'
+  if getattr(session.game_state, WIN_FLAG):
+    return 'gewonnen'
+  return 'beendet' if exited else 'skript_zu_ende'
+
+async def run_batch(session, lines):
+  """Spielt `lines` als Eingaben der Sitzung ab; liefert das Ergebnis (siehe batch_outcome)."""
+  script = iter(lines)
+
+  async def next_line(prompt):
+    out = current_renderer()
+    echo = not out.terminal.structured # JSON-Clients bekommen den Prompt als Ereignis, ohne Echo
+    for line in script:
+      if echo:
+        out.write(prompt + line + "\n") # Wie im Terminal: die Eingabe steht hinter dem Prompt
+        out.flush()
+      return line
+    if echo:
+      out.write(prompt + "\n")
+    raise EOFError
+
+  session.read_line = next_line
+  try:
+    await game_loop(session, intro=False)
+  except EOFError:
+    return batch_outcome(session, exited=False)
+  except SystemExit: # QUIT oder Game Over beenden nur die Partie, nicht den Stapel
+    return batch_outcome(session, exited=True)
+
+def batch_main(path, seed=None):
+  """--batch: spielt die Befehle aus `path` ('-' = Standard-Eingabe); Rückgabe ist der Exit-Code."""
+  try:
+    if path == '-':
+      text = sys.stdin.read()
+    else:
+      with open(path, encoding='utf-8') as f:
+        text = f.read()
+  except OSError as e:
+    print(f"SKRIPT NICHT LESBAR: {e}", file=sys.stderr)
+    return 2
+  lines = [line for line in text.splitlines() if not line.lstrip().startswith('#')]
+  session = GameSession(seed=seed, record_dir=RECORD_DIR, admin=True)
+  started = time.perf_counter()
+  outcome = asyncio.run(run_batch(session, lines))
+  elapsed = time.perf_counter() - started
+  current_renderer().flush()
+  print(f"ERGEBNIS: {outcome.upper()} NACH {len(session.recording)} EINGABEN ({elapsed * 1e3:.0f} ms)",
+        file=sys.stderr)
+  return BATCH_EXIT_CODES[outcome]
+
+# --- Messung & Profiling ---
+# Auf Wunsch werden Befehlsverteilung, jeder Handler, die Ereignis-Prüfungen und
+# die Ausgabe-Funktionen durch zeitmessende Hüllen ersetzt. Ist die Messung aus,
+# stehen wieder die ursprünglichen Funktionen in den Tabellen - sie kostet dann
+# nichts. Handler warten nie auf Eingaben (Minispiele laufen über minigame_step).
+# Unter POSIX schaltet SIGUSR1 die Messung, SIGUSR2 das Profil aller Sitzungen um.
+INSTRUMENTED_FUNCTIONS = ('handle_command', 'minigame_step', 'run_turn_events', 'check_alert_level',
+                          'display_location', 'print_slow', 'print_line', 'pause', 'clear_screen')
+PROFILE_DIR = 'profile' # Wohin PROFIL und SIGUSR2 die cProfile-Dateien schreiben
+
+class TimingHistogram:
+  """Aufrufe und Laufzeiten eines Messpunkts.
+
+  Die Zeiten landen in Eimern mit Zweierpotenzen von Mikrosekunden (Eimer i
+  für Zeiten unter 2**i µs), das reicht für p50/p99 und kostet O(1) pro Aufruf.
+  """
+
+  def __init__(self):
+    self.calls = 0
+    self.total = 0.0
+    self.max = 0.0
+    self.buckets = [0] * 40
+
+  def add(self, seconds):
+    self.calls += 1
+    self.total += seconds
+    if seconds > self.max:
+      self.max = seconds
+    self.buckets[min(int(seconds * 1e6).bit_length(), 39)] += 1
+
+  def percentile(self, fraction):
+    """Obergrenze des Eimers, in den das Perzentil fällt (in Sekunden)."""
+    rank = fraction * self.calls
+    seen = 0
+    for i, count in enumerate(self.buckets):
+      seen += count
+      if count and seen >= rank:
+        return min((1 << i) / 1e6, self.max)
+    return self.max
+
+class Metrics:
+  """Alle Messpunkte des Prozesses (über alle Sitzungen)."""
+
+  def __init__(self):
+    self.points = {}
+
+  def record(self, name, seconds):
+    histogram = self.points.get(name)
+    if histogram is None:
+      histogram = self.points[name] = TimingHistogram()
+    histogram.add(seconds)
+
+  def reset(self):
+    self.points.clear()
+
+  def report(self):
+    """Tabelle aller Messpunkte, teuerste zuerst (Zeiten in µs)."""
+    lines = [f"{'MESSPUNKT':<28} {'AUFRUFE':>8} {'GESAMT ms':>10} {'MITTEL':>8} {'P50':>8} {'P99':>8} {'MAX':>8}"]
+    for name, h in sorted(self.points.items(), key=lambda entry: -entry[1].total):
+      lines.append(f"{name:<28} {h.calls:>8} {h.total * 1e3:>10.1f} {h.total / h.calls * 1e6:>8.0f}"
+                   f" {h.percentile(0.5) * 1e6:>8.0f} {h.percentile(0.99) * 1e6:>8.0f} {h.max * 1e6:>8.0f}")
+    if len(lines) == 1:
+      lines.append("(NOCH KEINE MESSWERTE)")
+    return lines
+
+METRICS = Metrics()
+_instrumented = [] # (Tabelle, Schlüssel, ursprüngliche Funktion), solange die Messung läuft
+_live_sessions = set() # Sitzungen, deren Spielschleife gerade läuft (für SIGUSR2)
+
+def _timed(name, func):
+  """Hülle um `func`, die jeden Aufruf unter `name` in METRICS einträgt."""
+  record = METRICS.record
+  perf_counter = time.perf_counter
+
+  def timed(*args, **kwargs):
+    started = perf_counter()
+    try:
+      return func(*args, **kwargs)
+    finally:
+      record(name, perf_counter() - started)
+  timed.__wrapped__ = func
+  return timed
+
+def metrics_enabled():
+  return bool(_instrumented)
+
+def enable_metrics():
+  """Ersetzt die Messpunkte durch zeitmessende Hüllen."""
+  if _instrumented:
+    return
+  namespace = globals()
+  targets = [(namespace, name, name) for name in INSTRUMENTED_FUNCTIONS]
+  targets += [(COMMAND_HANDLERS, verb, 'handler.' + verb) for verb in COMMAND_HANDLERS]
+  targets += [(TRIGGER_ACTIONS, name, 'ereignis.' + name) for name in TRIGGER_ACTIONS]
+  for table, key, name in targets:
+    _instrumented.append((table, key, table[key]))
+    table[key] = _timed(name, table[key])
+
+def disable_metrics():
+  """Stellt die ursprünglichen Funktionen wieder her (die Messwerte bleiben)."""
+  while _instrumented:
+    table, key, func = _instrumented.pop()
+    table[key] = func
+
+def start_profiling(session):
+  """Profiliert die Sitzung ab ihrer nächsten Eingabe.
+
+  Eingeschaltet wird das Profil nur, während der Code dieser Sitzung läuft
+  (read_input schaltet es beim Warten ab), so dass andere Sitzungen im selben
+  Prozess nicht mitgezählt werden.
+  """
+  session.profiler = cProfile.Profile()
+
+def stop_profiling(session, directory=PROFILE_DIR):
+  """Beendet das Profil der Sitzung und speichert es; liefert den Dateinamen."""
+  profiler, session.profiler = session.profiler, None
+  profiler.disable()
+  path = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{session.seed:08x}.prof")
+  try:
+    os.makedirs(directory, exist_ok=True)
+    profiler.dump_stats(path)
+  except OSError as e:
+    print(f"PROFIL NICHT GESPEICHERT: {e}", file=sys.stderr)
+    return None
+  return path
+
+def report_profile(path):
+  if path:
+    print(f"PROFIL GESPEICHERT: {path} (ansehen mit: python3 -m pstats {path})", file=sys.stderr)
+
+def _toggle_metrics_signal(*_):
+  """SIGUSR1: Messung starten bzw. beenden und die Tabelle ins Fehlerprotokoll schreiben."""
+  if metrics_enabled():
+    disable_metrics()
+    print("\n".join(METRICS.report()), file=sys.stderr)
+  else:
+    METRICS.reset()
+    enable_metrics()
+    print("MESSUNG LAEUFT.", file=sys.stderr)
+
+def _toggle_profiling_signal(*_):
+  """SIGUSR2: Alle laufenden Sitzungen profilieren bzw. ihre Profile speichern."""
+  sessions = list(_live_sessions)
+  if any(session.profiler for session in sessions):
+    for session in sessions:
+      if session.profiler:
+        report_profile(stop_profiling(session))
+  else:
+    for session in sessions:
+      start_profiling(session)
+    print(f"PROFIL LAEUFT FUER {len(sessions)} SITZUNG(EN).", file=sys.stderr)
+
+def install_signal_handlers(loop=None):
+  """Richtet SIGUSR1/SIGUSR2 ein (im Server über die Ereignisschleife, also nie mitten in einem Zug)."""
+  if not hasattr(signal, 'SIGUSR1'): # z.B. Windows
+    return
+  for signum, handler in ((signal.SIGUSR1, _toggle_metrics_signal), (signal.SIGUSR2, _toggle_profiling_signal)):
+    if loop:
+      loop.add_signal_handler(signum, handler)
+    else:
+      signal.signal(signum, handler)
+
+# --- Aufzeichnung & Wiedergabe ---
+# Jede Sitzung lässt sich als (Seed, Eingaben) aufzeichnen. Weil aller Zufall
+# aus session.rng kommt, führt dieselbe Eingabefolge mit demselben Seed immer
+# zum selben Endzustand; die Wiedergabe prüft das über eine Prüfsumme.
+RECORDING_FORMAT = 1
+RECORD_DIR = None # Mit --record gesetzt: Verzeichnis für die Aufzeichnungen
+
+def state_digest(session):
+  """Prüfsumme über den Spielzustand (unabhängig von Hash-Reihenfolgen)."""
+  world = session.world
+  changed_locations = {}
+  for loc_id in session.versions:
+    if loc_id in world.locations:
+      changed_locations[loc_id] = _field_diff(session.locations[loc_id], world.locations[loc_id])
+  state = [session.game_state.as_dict(), list(session.inventory), dict(session.placement.where), changed_locations]
+  if session.minigame is not None: # Nur dann, damit ältere Aufzeichnungen gültig bleiben
+    state.append(session.minigame)
+  return format(zlib.crc32(json.dumps(state, sort_keys=True).encode('utf-8')), '08x')
+
+def recording_of(session):
+  """Die Aufzeichnung einer Sitzung als JSON-fähiges dict."""
+  return {
+      'format': RECORDING_FORMAT,
+      'world': session.world.fingerprint,
+      'seed': session.seed,
+      'commands': list(session.recording),
+      'digest': state_digest(session),
+  }
+
+def write_recording(session, directory):
+  """Schreibt die Aufzeichnung einer beendeten Sitzung als eigene JSON-Datei."""
+  name = f"{time.strftime('%Y%m%d-%H%M%S')}-{session.seed:08x}.json"
+  try:
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, name), 'w', encoding='utf-8') as f:
+      json.dump(recording_of(session), f, ensure_ascii=False)
+  except OSError as e:
+    print(f"AUFZEICHNUNG NICHT GESPEICHERT: {e}", file=sys.stderr)
+
+async def replay_session(recording, world=None):
+  """Spielt eine Aufzeichnung ohne Ausgabe und Wartezeiten nach; liefert die Sitzung."""
+  commands = iter(recording['commands'])
+
+  async def next_command(prompt):
+    for entry in commands:
+      if isinstance(entry, list): # Schritt der Weltuhr, siehe apply_world_tick()
+        apply_world_tick(session, *entry[1:])
+        continue
+      return entry
+    raise EOFError # Aufzeichnung zu Ende
+
+  session = GameSession(read_line=next_command, world=world, save_dir=None, seed=recording['seed'])
+  if recording.get('world') != session.world.fingerprint:
+    raise ValueError("AUFZEICHNUNG GEHOERT ZU EINER ANDEREN WELT")
+  _active_renderer.set(NullRenderer())
+  try:
+    await game_loop(session)
+  except (EOFError, SystemExit): # Ende der Eingaben, QUIT oder Game Over
+    pass
+  return session
+
+def replay_files(paths):
+  """Spielt Aufzeichnungen nach und vergleicht den Endzustand; Rückgabe ist der Exit-Code."""
+  failures = 0
+  started = time.perf_counter()
+  for path in paths:
+    try:
+      with open(path, encoding='utf-8') as f:
+        recording = json.load(f)
+      if recording.get('format') != RECORDING_FORMAT:
+        raise ValueError(f"UNBEKANNTES FORMAT {recording.get('format')}")
+      session = asyncio.run(replay_session(recording))
+    except (OSError, ValueError, KeyError) as e:
+      print(f"FEHLER   {path}: {e}")
+      failures += 1
+      continue
+    digest = state_digest(session)
+    if digest == recording['digest']:
+      print(f"OK       {path} ({len(recording['commands'])} EINGABEN)")
+    else:
+      print(f"ANDERS   {path}: ERWARTET {recording['digest']}, ERHALTEN {digest}")
+      failures += 1
+  elapsed = time.perf_counter() - started
+  print(f"{len(paths)} AUFZEICHNUNGEN IN {elapsed:.2f}s, {failures} FEHLGESCHLAGEN")
+  return 1 if failures else 0
+
+# --- Transkripte ---
+# Für Support und Moderation lässt sich jede Sitzung vollständig mitschreiben.
+# Die Spielschleife hängt Eingaben und Ausgaben nur an einen Ringpuffer im
+# Speicher an; ein Hintergrund-Thread leert alle Puffer in Stapeln und hängt
+# sie als gzip-Blöcke an Segmentdateien an (JSON-Zeilen, zcat-lesbar). Läuft
+# ein Puffer über, fällt der älteste Eintrag weg und wird gezählt.
+TRANSCRIPT_BUFFER = 4096 # Einträge pro Sitzung, bevor die ältesten verworfen werden
+TRANSCRIPT_INTERVAL = 1.0 # Sekunden zwischen zwei Stapeln des Schreib-Threads
+TRANSCRIPT_SEGMENT_SIZE = 8 * 1024 * 1024 # Bytes (komprimiert), dann beginnt ein neues Segment
+TRANSCRIPT_WRITER = None # Mit --transcripts gesetzt: der laufende TranscriptWriter
+_transcript_ids = itertools.count(1)
+
+class Transcript:
+  """Ringpuffer einer Sitzung; wird nur vom Spiel gefüllt und nur vom Writer geleert."""
+
+  def __init__(self, writer, session, buffer_size=TRANSCRIPT_BUFFER):
+    self.writer = writer
+    self.id = f"{os.getpid()}-{next(_transcript_ids)}"
+    self.events = collections.deque(maxlen=buffer_size) # (Nr, Zeit, Art, Text)
+    self.count = 0 # Nummer des nächsten Eintrags; Lücken in 'nr' zeigen Verworfenes
+    self.dropped = 0
+    self.reported_drops = 0
+    self.pending = [] # Ausgabe seit der letzten Eingabe, wird ein Eintrag
+    self.closed = False
+    self._append('start', {'seed': session.seed, 'welt': session.world.fingerprint, 'client': session.client})
+
+  def _append(self, kind, text):
+    events = self.events
+    if len(events) == events.maxlen:
+      self.dropped += 1 # deque wirft beim Anhängen den ältesten Eintrag hinaus
+    events.append((self.count, time.time(), kind, text))
+    self.count += 1
+    if len(events) * 2 > events.maxlen:
+      self.writer.wake.set() # Nicht bis zum nächsten Intervall warten
+
+  def _close_output(self):
+    if self.pending:
+      self._append('ausgabe', "".join(self.pending))
+      self.pending = []
+
+  def output(self, text):
+    self.pending.append(text)
+
+  def input(self, line):
+    self._close_output()
+    self._append('eingabe', line)
+
+  def close(self, reason=None):
+    self._close_output()
+    self._append('ende', reason)
+    self.closed = True
+
+  def drain(self):
+    """Holt alle bisherigen Einträge als JSON-fähige dicts heraus (im Writer-Thread)."""
+    records = []
+    while True:
+      try:
+        number, stamp, kind, text = self.events.popleft()
+      except IndexError:
+        break
+      if kind == 'ausgabe':
+        text = ANSI_SEQUENCE.sub('', text)
+      records.append({'sitzung': self.id, 'nr': number, 'zeit': round(stamp, 3), 'art': kind, 'text': text})
+    dropped = self.dropped
+    if dropped != self.reported_drops:
+      records.append({'sitzung': self.id, 'zeit': round(time.time(), 3), 'art': 'verworfen',
+                      'text': dropped - self.reported_drops})
+      self.reported_drops = dropped
+    return records
+
+class TranscriptWriter(threading.Thread):
+  """Hintergrund-Thread, der die Ringpuffer aller Sitzungen in Segmentdateien schreibt."""
+
+  def __init__(self, directory, segment_size=TRANSCRIPT_SEGMENT_SIZE, interval=TRANSCRIPT_INTERVAL):
+    super().__init__(name='transkripte', daemon=True)
+    self.directory = directory
+    self.segment_size = segment_size
+    self.interval = interval
+    self.wake = threading.Event()
+    self.lock = threading.Lock() # Schützt nur die Liste der Transkripte, nie eine Ein-/Ausgabe
+    self.transcripts = []
+    self.stopping = False
+    self.file = None
+    self.size = 0
+    self.segments = 0
+
+  def open(self, session):
+    """Beginnt das Transkript einer Sitzung."""
+    transcript = Transcript(self, session)
+    with self.lock:
+      self.transcripts.append(transcript)
+    return transcript
+
+  def run(self):
+    while not self.stopping:
+      self.wake.wait(self.interval)
+      self.wake.clear()
+      self.flush()
+    self.flush()
+    if self.file:
+      self.file.close()
+
+  def flush(self):
+    """Schreibt alles, was in den Puffern steht, als einen gzip-Block."""
+    with self.lock:
+      transcripts = list(self.transcripts)
+    records = []
+    for transcript in transcripts:
+      closed = transcript.closed # Vor dem Leeren lesen, sonst gehen die letzten Einträge verloren
+      records += transcript.drain()
+      if closed:
+        with self.lock:
+          self.transcripts.remove(transcript)
+    if not records:
+      return
+    data = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+    block = gzip.compress(data.encode('utf-8'))
+    try:
+      if self.file is None or self.size and self.size + len(block) > self.segment_size:
+        self._next_segment()
+      self.file.write(block)
+      self.file.flush()
+      self.size += len(block)
+    except OSError as e:
+      print(f"TRANSKRIPT NICHT GESCHRIEBEN: {e}", file=sys.stderr)
+
+  def _next_segment(self):
+    if self.file:
+      self.file.close()
+    os.makedirs(self.directory, exist_ok=True)
+    self.segments += 1
+    name = f"transkript-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self.segments:04d}.jsonl.gz"
+    self.file = open(os.path.join(self.directory, name), 'ab') # Nur anhängen, nie überschreiben
+    self.size = 0
+
+  def stop(self):
+    """Schreibt die restlichen Einträge und beendet den Thread."""
+    self.stopping = True
+    self.wake.set()
+    self.join()
+
+# --- Löser (Zustandsraum-Suche) ---
+# Der Löser behandelt handle_command als Übergangsfunktion: Ein Zustand ist ein
+# Spielstand (save_snapshot), ein Zug ist ein Befehl samt aller Eingaben, die
+# ein dadurch gestartetes Minispiel abfragt (minigame_step). Zufall wird nicht gewürfelt, sondern als
+# Zufallsknoten aufgefächert - jeder Ausgang wird einmal durchgespielt.
+# Gleiche Zustände werden über einen Hash erkannt und nur einmal untersucht;
+# die Breitensuche verteilt jede Ebene auf einen Prozess-Pool.
+WIN_FLAG = 'server_farm_access_granted'
+SOLVER_MAX_STATES = 200000
+SOLVER_VERBS = ('NIMM', 'LIES', 'BENUTZE', 'SCHAU', 'HACKE', 'SCANNE', 'OEFFNE', 'DRUECKE')
+SOLVER_ANSWERS = { # Antworten, die nur im Code stehen (jeweils eine richtige und eine falsche)
+    'DEKRYPTIERE': ('REDPILL', 'FALSCH'),
+    'CODE': ('1999', '0000'),
+}
+MINIGAME_ANSWERS = ( # (Anfang der Eingabeaufforderung, mögliche Antworten)
+    ('PASSWORT', ('matrix', 'falsch')),
+    ('COMPUTER>', ('ONLINE GEHEN', 'LIES DISKETTE', 'SCANNE NETZWERK', 'LOGOUT')),
+    ('WELCHEN PORT', ('1', '2', '3', '4', '5', '6')),
+)
+MAX_MINIGAME_INPUTS = 3 # Längere Eingabefolgen innerhalb eines Zuges werden nicht verfolgt
+GAME_OVER_KEY = b'GAME OVER' # Alle Spielenden fallen in einen Zustand zusammen
+
+class ChanceRandom:
+  """Ersatz für session.rng im Löser: folgt einem vorgegebenen Pfad von Ausgängen.
+
+  Jeder Aufruf ist ein Zufallsknoten. Ist der Pfad zu Ende, wird Ausgang 0
+  gewählt und die Zahl der Ausgänge gemerkt, damit der Löser die übrigen
+  nachspielen kann.
+  """
+
+  def __init__(self, path=()):
+    self.path = path
+    self.nodes = [] # Wahrscheinlichkeiten der Ausgänge je Zufallsknoten, in Aufrufreihenfolge
+
+  def _pick(self, probabilities):
+    index = len(self.nodes)
+    self.nodes.append(probabilities)
+    return self.path[index] if index < len(self.path) else 0
+
+  def randint(self, a, b):
+    return a + self._pick((1 / (b - a + 1),) * (b - a + 1))
+
+  def choice(self, seq):
+    return seq[self._pick((1 / len(seq),) * len(seq))]
+
+  def one_in(self, n):
+    return self._pick((1 - 1 / n, 1 / n)) == 1 # Nur zwei Ausgänge statt n
+
+  def shuffle(self, seq):
+    pass # Die Reihenfolge sieht der Spieler und wählt danach; probiert werden ohnehin alle Antworten
+
+def state_key(session):
+  """Hash des Spielzustands, unabhängig von Hash- und Einfügereihenfolgen."""
+  world = session.world
+  locations = {}
+  for loc_id in session.versions:
+    if loc_id in world.locations:
+      diff = _field_diff(session.locations[loc_id], world.locations[loc_id])
+      if diff:
+        locations[loc_id] = diff
+  items = {item_id: _field_diff(session.items[item_id], world.items[item_id])
+           for item_id in session.touched_items}
+  state = [session.game_state.key(), dict(session.placement.where), locations, items, session.minigame]
+  return hashlib.blake2b(json.dumps(state, sort_keys=True).encode('utf-8'), digest_size=16).digest()
+
+def solver_moves(session):
+  """Alle Befehle, die der Löser im aktuellen Zustand ausprobiert."""
+  loc_id = session.game_state.current_location
+  location = session.locations[loc_id]
+  inventory = list(session.inventory)
+  objects = list(dict.fromkeys(list(session.placement.items_at(loc_id)) + inventory
+                               + list(location.interactables) + list(location.details)
+                               + list(CODE_TARGETS)))
+  moves = [f"GEHE {exit_name}" for exit_name in location.exits]
+  moves += [f"{verb} {obj}" for verb in SOLVER_VERBS for obj in objects]
+  moves += [f"REDE MIT {npc}" for npc in sorted(session.world.npcs[loc_id])]
+  moves += [f"BENUTZE {item} MIT {target}" for item in inventory for target in objects if target != item]
+  moves += [f"DEKRYPTIERE {obj} MIT {key}" for obj in objects for key in SOLVER_ANSWERS['DEKRYPTIERE']]
+  moves += [f"CODE {code}" for code in SOLVER_ANSWERS['CODE']]
+  moves += ['ONLINE GEHEN']
+  return moves
+
+def minigame_answers(prompt):
+  """Die Antworten, die der Löser auf eine Eingabeaufforderung probiert."""
+  for prefix, answers in MINIGAME_ANSWERS:
+    if prompt.startswith(prefix):
+      return answers
+  return ()
+
+def _run_sync(coro):
+  """Führt eine Coroutine aus, die nie wirklich warten muss (Eingaben kommen aus einer Liste)."""
+  try:
+    coro.send(None)
+  except StopIteration as stop:
+    return stop.value
+  coro.close()
+  raise RuntimeError("Coroutine wartet auf etwas anderes als Eingaben")
+
+def _run_move(session, lines, path):
+  """Spielt einen Zug im aktuellen Zustand; Ergebnis ist (Art, Eingabeaufforderung, Zufallsknoten)."""
+  rng = session.rng = ChanceRandom(path)
+  try:
+    handle_command(session, _parse_move(lines[0]))
+    for line in lines[1:]:
+      if session.minigame is None:
+        break # Übrige Antworten fragt niemand mehr ab
+      minigame_step(session, line)
+    if session.minigame is not None: # Das Minispiel will eine weitere Eingabe
+      return 'input', minigame_prompt(session), rng.nodes
+    run_turn_events(session) # Was vor der nächsten Eingabe passiert, gehört zum Zug
+  except SystemExit:
+    return 'game_over', None, rng.nodes
+  return 'ok', None, rng.nodes
+
+_solver_session = None # Arbeitssitzung des Löser-Prozesses
+_solver_parsed = {} # Befehlszeile -> Command; dieselben Züge kommen in jedem Zustand wieder
+
+def _parse_move(line):
+  cmd = _solver_parsed.get(line)
+  if cmd is None:
+    cmd = _solver_parsed[line] = parse_command(line)
+  return cmd
+
+def _solver_init(world):
+  """Bereitet einen Löser-Prozess vor: eine wiederverwendete Sitzung, keine Ausgabe."""
+  global _solver_session
+  _active_renderer.set(NullRenderer())
+  _solver_session = GameSession(world=world, save_dir=None, seed=0)
+
+def _solver_expand(snapshot):
+  """Alle Nachfolger eines Zustands: Liste von (Eingaben, [(Schlüssel, Art, Spielstand, Wahrscheinlichkeit, Ort, Fortschritt)])."""
+  session = _solver_session
+  restore_snapshot(session, snapshot)
+  parent_key = state_key(session)
+  expansions = []
+  dirty = False
+  prompts_seen = set() # Zustände mitten im Minispiel, die schon weiterverfolgt werden
+  for move in solver_moves(session):
+    outcomes = {} # Eingaben -> Schlüssel -> [Art, Spielstand, Wahrscheinlichkeit, Ort, Fortschritt]
+    pending = collections.deque([((move,), (), None)]) # Kürzere Eingabefolgen zuerst
+    while pending:
+      lines, path, waiting = pending.popleft()
+      if dirty:
+        restore_snapshot(session, snapshot)
+      # Die meisten Züge ändern nichts; dann entfallen Schlüssel und Zurücksetzen
+      before = (session.game_state.key(), dict(session.versions), set(session.touched_items))
+      kind, prompt, nodes = _run_move(session, lines, path)
+      after = (session.game_state.key(), session.versions, session.touched_items)
+      dirty = kind != 'ok' or before != after
+      chosen = path + (0,) * (len(nodes) - len(path))
+      for index in range(len(path), len(nodes)): # Die übrigen Ausgänge neuer Zufallsknoten
+        for outcome in range(1, len(nodes[index])):
+          pending.append((lines, chosen[:index] + (outcome,), waiting))
+      if kind == 'input':
+        # Steht das Minispiel nach der letzten Antwort unverändert an derselben
+        # Stelle (z.B. unbekannter COMPUTER-Befehl), bringt Weiterprobieren nichts.
+        # Erreichen mehrere Züge oder Antworten denselben Zustand (z.B. HACKE
+        # SERVER und SCANNE PORTS; übrige Versuche stehen in session.minigame),
+        # genügt es, einen davon weiterzuverfolgen.
+        state = (session.minigame, after[0], dict(after[1]), set(after[2]))
+        seen = state_key(session)
+        if len(lines) <= MAX_MINIGAME_INPUTS and state != waiting and seen not in prompts_seen:
+          prompts_seen.add(seen)
+          for answer in minigame_answers(prompt):
+            pending.append((lines + (answer,), chosen, state))
+        continue
+      probability = 1.0
+      for outcome, probabilities in zip(chosen, nodes):
+        probability *= probabilities[outcome]
+      if kind == 'game_over':
+        key, child, where, progress = GAME_OVER_KEY, None, None, -1
+      elif not dirty:
+        continue # Zug ändert nichts
+      else:
+        key = state_key(session)
+        if key == parent_key:
+          continue
+        if getattr(session.game_state, WIN_FLAG):
+          kind = 'win'
+        child = save_snapshot(session)
+        where = f"{session.game_state.current_location}, ALERT {session.game_state.alert_level}"
+        progress = bin(session.game_state.flags).count('1') # Gesetzte Flags
+      entry = outcomes.setdefault(lines, {}).setdefault(key, [kind, child, 0.0, where, progress])
+      entry[2] += probability
+    for lines, children in outcomes.items():
+      expansions.append((lines, [(key, *entry) for key, entry in children.items()]))
+  return expansions
+
+def solve(world=None, jobs=None, max_states=SOLVER_MAX_STATES):
+  """Durchsucht den Zustandsraum breitenweise und liefert einen Bericht als dict."""
+  world = world or WORLD
+  jobs = jobs or os.cpu_count() or 1
+  started = time.perf_counter()
+  token = _active_renderer.set(NullRenderer())
+  try:
+    root = GameSession(world=world, save_dir=None, seed=0)
+    root.rng = ChanceRandom()
+    display_location(root)
+    run_turn_events(root)
+    root_key = state_key(root)
+    frontier = [(root_key, save_snapshot(root))]
+  finally:
+    _active_renderer.reset(token)
+
+  parents = {root_key: None} # Schlüssel -> (Vorgänger, Eingaben, Wahrscheinlichkeit)
+  places = {root_key: f"{world.start_location}, ALERT 0"}
+  furthest, furthest_progress = root_key, -1 # Zustand mit den meisten gesetzten Flags
+  edges = {} # Untersuchte Zustände -> Nachfolger
+  wins = []
+  depth = 0
+  if jobs > 1:
+    import multiprocessing
+    pool = multiprocessing.Pool(jobs, initializer=_solver_init, initargs=(world,))
+    expand_all = lambda snapshots: pool.map(_solver_expand, snapshots, chunksize=max(1, len(snapshots) // (jobs * 4)))
+  else:
+    pool = None
+    _solver_init(world)
+    expand_all = lambda snapshots: [_solver_expand(snapshot) for snapshot in snapshots]
+  try:
+    while frontier and len(parents) < max_states:
+      results = expand_all([snapshot for _, snapshot in frontier])
+      next_frontier = []
+      for (key, _), expansions in zip(frontier, results):
+        children = edges[key] = set()
+        for lines, outcomes in expansions:
+          for child_key, kind, child, probability, where, progress in outcomes:
+            children.add(child_key)
+            if child_key in parents:
+              continue
+            parents[child_key] = (key, lines, probability)
+            places[child_key] = where
+            if progress > furthest_progress:
+              furthest, furthest_progress = child_key, progress
+            if kind == 'win':
+              wins.append(child_key)
+            elif kind == 'ok':
+              next_frontier.append((child_key, child))
+      frontier = next_frontier
+      depth += 1
+  finally:
+    if pool is not None:
+      pool.close()
+      pool.join()
+
+  # Von welchen Zuständen aus ist ein Sieg noch erreichbar? (Rückwärtssuche)
+  predecessors = collections.defaultdict(list)
+  for key, children in edges.items():
+    for child_key in children:
+      predecessors[child_key].append(key)
+  can_win = set(wins)
+  queue = collections.deque(wins)
+  while queue:
+    for key in predecessors[queue.popleft()]:
+      if key not in can_win:
+        can_win.add(key)
+        queue.append(key)
+  complete = not frontier
+  softlocks = [key for key in edges if key not in can_win] if complete else []
+
+  def path_to(key):
+    steps = []
+    while parents[key] is not None:
+      key, lines, probability = parents[key]
+      steps.append((lines, probability))
+    return steps[::-1]
+
+  return {
+      'states': len(parents),
+      'expanded': len(edges),
+      'depth': depth,
+      'complete': complete,
+      'elapsed': time.perf_counter() - started,
+      'jobs': jobs,
+      'solution': path_to(wins[0]) if wins else None,
+      'furthest': (places[furthest], path_to(furthest)),
+      'game_over_reachable': GAME_OVER_KEY in parents,
+      'softlocks': [(places[key], path_to(key)) for key in softlocks],
+      'dead_ends': [(places[key], path_to(key)) for key in softlocks if not edges[key]],
+  }
+
+def _format_step(lines, probability):
+  text = " / ".join(lines)
+  return text if probability > 0.9999 else f"{text}  [ZUFALL {probability:.0%}]"
+
+def print_solver_report(report, examples=5):
+  """Gibt den Bericht von solve() aus; Rückgabe ist der Exit-Code (0 = lösbar, ohne Softlocks)."""
+  print(f"{report['states']} ZUSTAENDE, {report['expanded']} UNTERSUCHT, TIEFE {report['depth']}, "
+        f"{report['elapsed']:.2f}s MIT {report['jobs']} PROZESS(EN)")
+  if not report['complete']:
+    print("ZUSTANDSGRENZE ERREICHT - SUCHE UNVOLLSTAENDIG, SOFTLOCKS NICHT GEPRUEFT")
+  solution = report['solution']
+  if solution is None:
+    print("KEINE LOESUNG GEFUNDEN!")
+    where, path = report['furthest']
+    print(f"AM WEITESTEN GEKOMMEN ({where}):")
+    for number, (lines, probability) in enumerate(path, 1):
+      print(f"  {number:2}. {_format_step(lines, probability)}")
+  else:
+    print(f"KUERZESTE LOESUNG ({len(solution)} ZUEGE):")
+    for number, (lines, probability) in enumerate(solution, 1):
+      print(f"  {number:2}. {_format_step(lines, probability)}")
+  print(f"GAME OVER ERREICHBAR: {'JA' if report['game_over_reachable'] else 'NEIN'}")
+  softlocks = report['softlocks']
+  if solution is None:
+    return 1 # Ohne Lösung ist jeder Zustand ein Softlock
+  print(f"SOFTLOCKS (KEIN WEG MEHR ZUM ZIEL): {len(softlocks)}, DAVON SACKGASSEN (KEIN ZUG AENDERT ETWAS): {len(report['dead_ends'])}")
+  for where, path in sorted(softlocks, key=lambda entry: len(entry[1]))[:examples]:
+    print(f"  - {where}: " + " | ".join(_format_step(lines, probability) for lines, probability in path))
+  return 1 if softlocks else 0
+
+# --- Fuzzer ---
+# Erzeugt Befehlsfolgen aus dem Wortschatz des Spiels (Verben samt Aliasen,
+# Ausgänge, Gegenstände, Details, Minispiel-Antworten) und spielt sie ohne
+# Ausgabe und Pausen in frischen Sitzungen durch. Gemessen wird, welche
+# Zeilenübergänge (Kanten) im Spielcode ausgeführt wurden; Folgen, die neue
+# Kanten erreichen, kommen in den Korpus und werden weiter mutiert. Weil
+# sys.settrace das Spiel stark bremst, läuft jede Folge zuerst ungemessen und
+# wird nur nachgemessen, wenn sie einen noch unbekannten Spielzustand erreicht.
+FUZZ_DIR = 'fuzz_funde'
+FUZZ_ROUND = 2.0 # Sekunden je Runde; danach gleichen die Prozesse ihren Korpus ab
+FUZZ_MAX_LINES = 30
+FUZZ_JUNK = ('', ' ', 'MIT', 'AN DEN', '???', '0', '-1', '99999999', 'x' * 300, 'ÄÖÜ ß', 'GEHE GEHE GEHE', '\t')
+
+class InvariantError(AssertionError):
+  """Der Spielzustand ist in sich widersprüchlich."""
+
+def check_invariants(session):
+  """Prüft den Spielzustand auf Widersprüche und wirft InvariantError."""
+  state = session.game_state
+  problems = []
+  if state.current_location not in session.locations:
+    problems.append(f"UNBEKANNTER ORT {state.current_location!r}")
+  if not isinstance(state.alert_level, int) or not 0 <= state.alert_level <= 10:
+    problems.append(f"ALERT-LEVEL {state.alert_level!r} AUSSERHALB 0..10")
+  for item_id, loc_id in session.placement.where.items():
+    if item_id not in session.items:
+      problems.append(f"UNBEKANNTER GEGENSTAND {item_id!r}")
+    if loc_id is not None and item_id not in session.placement.at.get(loc_id, ()):
+      problems.append(f"{item_id} FEHLT IM INDEX VON {loc_id}")
+  for loc_id, items in session.placement.at.items():
+    for item_id in items:
+      if session.placement.where.get(item_id) != loc_id:
+        problems.append(f"{item_id} DOPPELT ODER FALSCH IM INDEX VON {loc_id}")
+  if state.computer_logged_in and not state.apartment_password_cracked:
+    problems.append("EINGELOGGT OHNE GEKNACKTES PASSWORT")
+  if state.server_farm_access_granted and not (state.server_farm_card_used and state.server_farm_code_correct):
+    problems.append("ZUGANG OHNE KARTE UND CODE")
+  session.triggers.sync(state)
+  expected = {index for index, event in enumerate(TRIGGERS) if event.when(state)}
+  if session.triggers.armed != expected: # Bedingung liest ein Flag, das nicht in depends steht
+    names = sorted(TRIGGERS[index].name for index in session.triggers.armed ^ expected)
+    problems.append(f"EREIGNISSE VERALTET: {', '.join(names)}")
+  if problems:
+    raise InvariantError("; ".join(problems))
+
+def fuzz_vocabulary(world):
+  """Wortschatz des Fuzzers: (Verben, Objekte, Minispiel-Antworten)."""
+  verbs = sorted(COMMANDS) + sorted(' '.join(words) for words in MULTIWORD_COMMANDS)
+  objects = set(CODE_TARGETS) | set(world.items) | set(PREPOSITIONS)
+  for location in world.locations.values():
+    objects.update(location.exits)
+    objects.update(location.interactables)
+    objects.update(location.details)
+    objects.update(location.npcs)
+  answers = {answer for values in SOLVER_ANSWERS.values() for answer in values}
+  answers.update(answer for _, values in MINIGAME_ANSWERS for answer in values)
+  return verbs, sorted(objects), sorted(answers)
+
+_fuzz_session = None # Arbeitssitzung des Fuzz-Prozesses
+_fuzz_start = None # Spielstand direkt nach dem Spielstart (wie in game_loop)
+_fuzz_vocabulary = None
+
+def _fuzz_init(world):
+  """Bereitet einen Fuzz-Prozess vor: eine wiederverwendete Sitzung, keine Ausgabe."""
+  global _fuzz_session, _fuzz_start, _fuzz_vocabulary
+  _active_renderer.set(NullRenderer())
+  _fuzz_session = GameSession(world=world, save_dir=None, seed=0)
+  display_location(_fuzz_session)
+  _fuzz_start = save_snapshot(_fuzz_session)
+  _fuzz_vocabulary = fuzz_vocabulary(world)
+
+def _fuzz_run(lines, seed):
+  """Spielt eine Befehlsfolge ab dem Spielstart; liefert (Fund oder None, Zahl der Befehle)."""
+  session = _fuzz_session
+  restore_snapshot(session, _fuzz_start)
+  session.rng = SessionRandom(seed)
+  session.recording.clear()
+  script = iter(lines)
+
+  async def scripted_input(prompt):
+    for line in script:
+      return line
+    raise EOFError
+
+  session.read_line = scripted_input
+  try:
+    while True:
+      _run_sync(play_turn(session))
+      check_invariants(session)
+  except EOFError:
+    return None, len(session.recording)
+  except BaseException as e: # Auch SystemExit: jedes Spielende wird als Fund gemeldet
+    return _fuzz_finding(e), len(session.recording)
+
+def _fuzz_finding(error):
+  """Signatur eines Fundes: (Art, Stelle), unabhängig von Befehlsfolge und Fehlertext."""
+  frame = traceback.extract_tb(error.__traceback__)[-1]
+  where = f"{os.path.basename(frame.filename)}:{frame.lineno} in {frame.name}"
+  if isinstance(error, SystemExit):
+    return 'exit', f"sys.exit() {where}"
+  if isinstance(error, InvariantError):
+    return 'invariante', str(error)
+  return 'absturz', f"{type(error).__name__} {where}"
+
+def _fuzz_traced(lines, seed):
+  """Wie _fuzz_run, misst aber die ausgeführten Kanten (Zeile -> Zeile) im Spielcode."""
+  filename = _fuzz_run.__code__.co_filename
+  arcs = set()
+
+  def tracer(frame, event, arg):
+    if frame.f_code.co_filename != filename:
+      return None
+    first = frame.f_code.co_firstlineno
+    last = [0]
+
+    def local(frame, event, arg):
+      if event == 'line':
+        arcs.add((first, last[0], frame.f_lineno))
+        last[0] = frame.f_lineno
+      return local
+    return local
+
+  sys.settrace(tracer)
+  try:
+    result = _fuzz_run(lines, seed)
+  finally:
+    sys.settrace(None)
+  return result, arcs
+
+def _fuzz_line(rng):
+  """Eine zufällige Eingabezeile aus dem Wortschatz."""
+  verbs, objects, answers = _fuzz_vocabulary
+  roll = rng.random()
+  if roll < 0.55:
+    return f"{rng.choice(verbs)} {rng.choice(objects)}"
+  if roll < 0.7:
+    return f"{rng.choice(verbs)} {rng.choice(objects)} {rng.choice(PREPOSITIONS)} {rng.choice(objects + answers)}"
+  if roll < 0.8:
+    return rng.choice(verbs)
+  if roll < 0.93:
+    return rng.choice(answers)
+  return rng.choice(FUZZ_JUNK)
+
+def _fuzz_mutate(rng, corpus):
+  """Eine neue Befehlsfolge aus einem Eintrag des Korpus."""
+  lines = list(rng.choice(corpus)) if corpus else []
+  for _ in range(rng.randint(1, 4)):
+    roll = rng.random()
+    if roll < 0.45 or not lines:
+      lines.insert(rng.randint(0, len(lines)), _fuzz_line(rng))
+    elif roll < 0.6:
+      del lines[rng.randrange(len(lines))]
+    elif roll < 0.8:
+      lines[rng.randrange(len(lines))] = _fuzz_line(rng)
+    elif corpus:
+      other = rng.choice(corpus) # Kreuzung mit einem zweiten Eintrag
+      lines = lines[:rng.randint(0, len(lines))] + list(other[rng.randint(0, len(other)):])
+  return lines[:FUZZ_MAX_LINES]
+
+def _fuzz_round(args):
+  """Eine Runde in einem Prozess; liefert (Fälle, Befehle, neue Korpus-Einträge, Kanten, Funde)."""
+  seed, duration, corpus, known_arcs = args
+  rng = random.Random(seed)
+  arcs = set(known_arcs)
+  states = set()
+  new_entries = []
+  findings = {}
+  cases = commands = 0
+  deadline = time.perf_counter() + duration
+  while time.perf_counter() < deadline:
+    for _ in range(50): # Uhr nicht nach jedem Fall abfragen
+      lines = _fuzz_mutate(rng, corpus)
+      case_seed = rng.getrandbits(32)
+      finding, executed = _fuzz_run(lines, case_seed)
+      cases += 1
+      commands += executed
+      if finding is not None:
+        findings.setdefault(finding, (lines, case_seed))
+        continue
+      key = state_key(_fuzz_session)
+      if key in states:
+        continue
+      states.add(key) # Neuer Zustand: nachmessen, ob auch neuer Code erreicht wurde
+      _, case_arcs = _fuzz_traced(lines, case_seed)
+      if not case_arcs <= arcs:
+        arcs |= case_arcs
+        new_entries.append(lines)
+        corpus = corpus + [lines]
+  return cases, commands, new_entries, arcs - set(known_arcs), findings
+
+def minimize_reproducer(lines, seed, finding):
+  """Kürzt eine Befehlsfolge, solange sie denselben Fund auslöst (vereinfachtes Delta-Debugging)."""
+  chunk = max(1, len(lines) // 2)
+  while True:
+    index = 0
+    while index < len(lines):
+      candidate = lines[:index] + lines[index + chunk:]
+      if _fuzz_run(candidate, seed)[0] == finding:
+        lines = candidate
+      else:
+        index += chunk
+    if chunk == 1:
+      return lines
+    chunk //= 2
+
+def write_reproducer(directory, finding, lines, seed, world):
+  """Speichert einen Fund als Aufzeichnung, die --replay nachspielen kann."""
+  kind, description = finding
+  _fuzz_run(lines, seed) # Endzustand für die Prüfsumme herstellen
+  recording = {
+      'format': RECORDING_FORMAT,
+      'world': world.fingerprint,
+      'seed': seed,
+      'commands': lines,
+      'digest': state_digest(_fuzz_session),
+      'finding': description,
+  }
+  name = f"{kind}-{zlib.crc32(description.encode('utf-8')):08x}.json"
+  os.makedirs(directory, exist_ok=True)
+  with open(os.path.join(directory, name), 'w', encoding='utf-8') as f:
+    json.dump(recording, f, ensure_ascii=False, indent=1)
+  return os.path.join(directory, name)
+
+def fuzz(duration, world=None, jobs=None, directory=FUZZ_DIR, seed=None):
+  """Fuzzt `duration` Sekunden lang auf allen Kernen; gibt die Statistik aus, Rückgabe ist der Exit-Code."""
+  world = world or WORLD
+  jobs = jobs or os.cpu_count() or 1
+  rng = random.Random(seed)
+  corpus = [[]]
+  arcs = set()
+  findings = {}
+  cases = commands = 0
+  started = time.perf_counter()
+  if jobs > 1:
+    import multiprocessing
+    pool = multiprocessing.Pool(jobs, initializer=_fuzz_init, initargs=(world,))
+    run_round = lambda tasks: pool.map(_fuzz_round, tasks)
+  else:
+    pool = None
+    run_round = lambda tasks: [_fuzz_round(task) for task in tasks]
+  _fuzz_init(world) # Auch hier, zum Verkleinern der Funde
+  try:
+    while True:
+      remaining = duration - (time.perf_counter() - started)
+      if remaining <= 0:
+        break
+      tasks = [(rng.getrandbits(32), min(FUZZ_ROUND, remaining), corpus, arcs) for _ in range(jobs)]
+      for round_cases, round_commands, new_entries, new_arcs, round_findings in run_round(tasks):
+        cases += round_cases
+        commands += round_commands
+        if not new_arcs <= arcs:
+          arcs |= new_arcs
+          corpus.extend(new_entries)
+        for finding, case in round_findings.items():
+          findings.setdefault(finding, case)
+      elapsed = time.perf_counter() - started
+      print(f"[{elapsed:6.1f}s] {cases} FAELLE, {commands / elapsed:,.0f} BEFEHLE/s, "
+            f"{len(arcs)} KANTEN, KORPUS {len(corpus)}, {len(findings)} FUNDE")
+  finally:
+    if pool is not None:
+      pool.close()
+      pool.join()
+
+  for finding, (lines, case_seed) in sorted(findings.items()):
+    lines = minimize_reproducer(lines, case_seed, finding)
+    path = write_reproducer(directory, finding, lines, case_seed, world)
+    print(f"{finding[0].upper():10} {finding[1]}\n           {len(lines)} BEFEHL(E) -> {path}")
+  return 1 if any(kind != 'exit' for kind, _ in findings) else 0
+
+# --- Benchmarks ---
+# Misst mit festem Seed, wie schnell die Engine ist: Befehle je Verb, Ortsanzeige
+# und Umbruch (mit und ohne Cache), Minispiel-Runden und ganze Durchläufe -
+# auch in künstlich vergrößerten Welten (10- und 100-fach), damit sichtbar
+# wird, was mit der Weltgröße wächst. Alles läuft ohne Ausgabe und Pausen.
+BENCH_SEED = 1 # Mit diesem Seed gelingt der Terminal-Hack im Durchlauf beim ersten Versuch
+BENCH_TIME = 0.03 # Mindestdauer je Durchgang in Sekunden
+BENCH_MIN_OPS = 50
+BENCH_REPEATS = 10 # Runden über alle Messungen; je Messung zählt der schnellste Durchgang (wie timeit.repeat)
+BENCH_RETRIES = 20 # So viele frische Prozesse messen einen vermuteten Rückschritt nach, bevor er gilt
+BENCH_RETRY_PAUSE = 1 # Sekunden zwischen den Nachmessungen, damit sie nicht alle in dieselbe Lastspitze fallen
+BENCH_FILE = 'bench_ergebnis.json'
+BENCH_TOLERANCE = 0.25 # So viel langsamer als die Basislinie gilt noch nicht als Rückschritt
+BENCH_SCALES = (1, 10, 100)
+BENCH_CLOCK_SESSIONS = 1000 # So viele Sitzungen treibt die Weltuhr im Benchmark voran
+BENCH_VERBS = ( # (Befehl, Eingaben für Minispiele)
+    ('GEHE RAUS', ()),
+    ('NIMM ZETTEL', ()),
+    ('SCHAU', ()),
+    ('SCHAU COMPUTER', ()),
+    ('LIES ZETTEL', ()),
+    ('INVENTAR', ()),
+    ('HILFE', ()),
+    ('DEKRYPTIERE NACHRICHT MIT REDPILL', ()),
+    ('BENUTZE COMPUTER', ('matrix', 'LOGOUT')),
+    ('HACKE COMPUTER', ('matrix', 'LOGOUT')),
+    ('DRUECKE BETT', ()),
+    ('OEFFNE FENSTER', ()),
+    ('SCANNE PORTS', ()),
+    ('CODE 1999', ()),
+    ('TANZE', ()), # Unbekanntes Verb
+)
+PLAYTHROUGHS = {
+    # Intro -> Passwort -> Dekryption -> Forum -> Cafe-Hack -> Tür der Server-Farm. Mit der
+    # jetzigen Alert-Bilanz endet dieser Weg noch im Cafe mit Game Over (siehe --solve).
+    'durchlauf': (
+        'LIES ZETTEL', 'DEKRYPTIERE NACHRICHT MIT REDPILL', 'BENUTZE COMPUTER', 'matrix', 'ONLINE GEHEN',
+        'SCHAU ORACLE', 'GEHE LOGOUT', 'GEHE RAUS', 'GEHE CAFE', 'HACKE TERMINAL', 'NIMM DATEN_DISKETTE',
+        'REDE MIT MANN', 'NIMM SCHLUESSELKARTE', 'GEHE RAUS', 'GEHE GASSE', 'GEHE SERVER-FARM',
+        'BENUTZE SCHLUESSELKARTE MIT KARTENLESER', 'OEFFNE TUER',
+    ),
+    # Derselbe Weg ohne Cafe-Hack; kommt bis an die Tür
+    'durchlauf.tuer': (
+        'LIES ZETTEL', 'DEKRYPTIERE NACHRICHT MIT REDPILL', 'BENUTZE COMPUTER', 'matrix', 'ONLINE GEHEN',
+        'SCHAU ORACLE', 'GEHE LOGOUT', 'GEHE RAUS', 'GEHE CAFE', 'REDE MIT MANN', 'NIMM SCHLUESSELKARTE',
+        'GEHE RAUS', 'GEHE GASSE', 'GEHE SERVER-FARM', 'BENUTZE SCHLUESSELKARTE MIT KARTENLESER', 'OEFFNE TUER',
+    ),
+}
 
-    # 5. Befehl verarbeiten
-    print("-" * WIDTH) # Trennlinie vor der Antwort
-    handle_command(verb, args)
+def synthetic_world(data, factor):
+  """Vervielfacht eine Weltdefinition: `factor` Kopien aller Orte und Gegenstände.
+
+  Kopie 0 behält die Original-IDs (damit die Rätsel im Code funktionieren),
+  Kopie k hängt '_k' an. Die Startorte der Kopien sind über einen Ausgang
+  'WEITER' zu einer Kette verbunden, damit alles erreichbar bleibt.
+  """
+  def clone_id(some_id, k):
+    return some_id if k == 0 else f"{some_id}_{k}"
+
+  start = data['start_location']
+  locations, items = {}, {}
+  for k in range(factor):
+    for loc_id, location in data['locations'].items():
+      copy_ = json.loads(json.dumps(location))
+      copy_['exits'] = {name: clone_id(dest, k) for name, dest in location.get('exits', {}).items()}
+      locations[clone_id(loc_id, k)] = copy_
+    if k + 1 < factor:
+      locations[clone_id(start, k)]['exits']['WEITER'] = clone_id(start, k + 1)
+    for item_id, item in data['items'].items():
+      copy_ = dict(item)
+      if item.get('location') is not None:
+        copy_['location'] = clone_id(item['location'], k)
+      items[clone_id(item_id, k)] = copy_
+  return compile_world({'format': data['format'], 'start_location': start, 'locations': locations, 'items': items})
+
+def _bench(op, setup=None):
+  """Misst eine Operation wiederholt (ein Durchgang); liefert die Einzelzeiten in Nanosekunden."""
+  timings = []
+  clock_ns = time.perf_counter_ns
+  deadline = time.perf_counter() + BENCH_TIME
+  while len(timings) < BENCH_MIN_OPS or time.perf_counter() < deadline:
+    if setup is not None:
+      setup()
+    started = clock_ns()
+    op()
+    timings.append(clock_ns() - started)
+  return timings
+
+def _bench_once(sample):
+  """Ein Durchgang `sample()`; liefert ops/s sowie p50/p99 in Mikrosekunden.
+
+  Wie timeit: vorher aufräumen, und nur während des Durchgangs keine Garbage-Collection.
+  """
+  gc.collect()
+  gc_was_enabled = gc.isenabled()
+  gc.disable()
+  try:
+    timings = sorted(sample())
+  finally:
+    if gc_was_enabled:
+      gc.enable()
+  return {
+      'ops': round(len(timings) / (sum(timings) / 1e9), 1),
+      'p50_us': round(timings[len(timings) // 2] / 1000, 2),
+      'p99_us': round(timings[min(len(timings) - 1, len(timings) * 99 // 100)] / 1000, 2),
+  }
+
+def _bench_session(world, inputs=()):
+  """Eine Sitzung für Messungen; Minispiele bekommen `inputs`, danach EOFError."""
+  session = GameSession(world=world, save_dir=None, seed=BENCH_SEED)
+  session.inputs = list(inputs)
+
+  async def scripted_input(prompt):
+    if not session.inputs:
+      raise EOFError
+    return session.inputs.pop(0)
+
+  session.read_line = scripted_input
+  return session
+
+def _bench_turn(session, line):
+  """Ein Befehl wie in der Spielschleife (ohne Eingabe): parsen, ausführen, ein Minispiel zu Ende spielen."""
+  try:
+    handle_command(session, parse_command(line))
+    while session.minigame is not None:
+      _run_sync(play_turn(session, events=False))
+  except (EOFError, SystemExit):
+    pass
+
+def _bench_playthrough(world, lines):
+  """Ein kompletter Durchlauf mit der Spielschleife, von der neuen Sitzung an."""
+  session = _bench_session(world, lines)
+  try:
+    _run_sync(game_loop(session))
+  except (EOFError, SystemExit):
+    pass
+  return session
+
+def _bench_minigame(start, snapshot, line, inputs):
+  """Minispiel-Runden: Zeiten von einer Eingabeaufforderung zur nächsten (ein Durchgang)."""
+  gaps = []
+
+  def timed_input(prompt):
+    now = time.perf_counter_ns()
+    if start.last_prompt is not None:
+      gaps.append(now - start.last_prompt)
+    start.last_prompt = now
+    if not start.inputs:
+      raise EOFError
+    return start.inputs.pop(0)
+
+  async def read_line(prompt):
+    return timed_input(prompt)
+
+  scripted_input = start.read_line
+  deadline = time.perf_counter() + BENCH_TIME
+  try:
+    while len(gaps) < BENCH_MIN_OPS or time.perf_counter() < deadline:
+      restore_snapshot(start, snapshot)
+      start.read_line, start.inputs, start.last_prompt = read_line, list(inputs), None
+      _bench_turn(start, line)
+  finally:
+    start.read_line = scripted_input # Die anderen Messungen mit derselben Sitzung erwarten wieder die Skript-Eingabe
+  return gaps
+
+def _bench_cases(world):
+  """Die Messungen für eine Welt: [(Name, sample)], jedes sample() ist ein Durchgang.
+
+  Jede Messung stellt ihren Ausgangszustand selbst her, die Reihenfolge ist also beliebig.
+  """
+  start = _bench_session(world)
+  display_location(start) # Erste Nachricht wie beim Spielstart
+  snapshot = save_snapshot(start)
+  cases = []
+
+  def case(name, op, setup=None):
+    cases.append((name, lambda: _bench(op, setup)))
+
+  def restored(setup=None):
+    def restore():
+      restore_snapshot(start, snapshot)
+      if setup is not None:
+        setup()
+    return restore
+
+  case('session.neu', lambda: GameSession(world=world, save_dir=None, seed=BENCH_SEED))
+  case('spielstand.speichern', lambda: save_snapshot(start), restored())
+  case('spielstand.laden', lambda: restore_snapshot(start, snapshot))
+  for line, inputs in BENCH_VERBS:
+    def setup(inputs=inputs):
+      restore_snapshot(start, snapshot)
+      start.inputs = list(inputs)
+    case(f"befehl.{line.split()[0]}" + ("" if len(line.split()) == 1 else f" {line.split(None, 1)[1]}"),
+         lambda line=line: _bench_turn(start, line), setup)
+  case('display_location.cache', lambda: display_location(start), restored())
+  case('display_location.neu', lambda: display_location(start), restored(SCREEN_CACHE.clear))
+  text = world.locations[world.start_location].description
+  case('wrap_text.cache', lambda: wrap_text(text))
+  case('wrap_text.neu', lambda: wrap_text(text), WRAP_CACHE.clear)
+
+  # Weltuhr: ein Schritt für viele Sitzungen (flache Kopien, nur game_state ist eigen)
+  world_clock = WorldClock(world)
+  location_ids = list(world.locations)
+  crowd = []
+  for slot in range(BENCH_CLOCK_SESSIONS):
+    clone = copy.copy(start)
+    clone.game_state = start.game_state.copy()
+    clone.game_state.current_location = location_ids[slot % len(location_ids)]
+    clone.recording = []
+    crowd.append(clone)
+    world_clock.join(clone, lambda: None)
+
+  def reset_crowd():
+    for slot, clone in enumerate(crowd):
+      clone.game_state.alert_level = slot % 8
+      clone.pending_tick = None
+      clone.recording.clear()
+  case('weltuhr.schritt', world_clock.step, reset_crowd)
+  for name, lines in PLAYTHROUGHS.items():
+    case(name, lambda lines=lines: _bench_playthrough(world, lines))
+
+  # Minispiel-Runden: Zeit von einer Eingabeaufforderung zur nächsten
+  for name, line, inputs in (('minispiel.computer', 'BENUTZE COMPUTER', ('matrix',) + ('SCANNE NETZWERK',) * 200),
+                             ('minispiel.passwort', 'BENUTZE COMPUTER', ('falsch', 'falsch', 'falsch'))):
+    cases.append((name, lambda line=line, inputs=inputs: _bench_minigame(start, snapshot, line, inputs)))
+  return cases
+
+def run_benchmarks(scales=BENCH_SCALES, world_file=WORLD_FILE, names=None):
+  """Führt die Messungen aus (alle oder nur `names`); liefert {Name: {'ops', 'p50_us', 'p99_us'}}.
+
+  Gemessen wird in BENCH_REPEATS Runden über alle Messungen, je Messung
+  zählt der schnellste Durchgang - so streuen die Durchgänge einer Messung
+  über die ganze Laufzeit, und eine kurz ausgebremste Maschine verfälscht
+  nicht gerade die letzten Messungen.
+  """
+  with open(world_file, encoding='utf-8') as f:
+    data = json.load(f)
+  samples = {}
+  results = {}
+  token = _active_renderer.set(NullRenderer(width=WIDTH))
+  try:
+    for factor in scales:
+      suffix = '' if factor == 1 else f"@{factor}x"
+      for name, sample in _bench_cases(synthetic_world(data, factor)):
+        if names is None or name + suffix in names:
+          samples[name + suffix] = sample
+    for _ in range(BENCH_REPEATS):
+      for name, sample in samples.items():
+        result = _bench_once(sample)
+        if name not in results or result['p50_us'] < results[name]['p50_us']:
+          results[name] = result
+  finally:
+    _active_renderer.reset(token)
+  return results
+
+def _speed_ratio(result, before):
+  """Tempo relativ zur Basislinie (über den Median; robust gegen einzelne Ausreißer)."""
+  return before['p50_us'] / max(result['p50_us'], 0.01)
+
+def compare_benchmarks(results, baseline, tolerance=BENCH_TOLERANCE):
+  """Messungen, die mehr als `tolerance` langsamer sind als die Basislinie: [(Name, Tempo)]."""
+  regressions = []
+  for name, result in results.items():
+    before = baseline.get(name)
+    if before and _speed_ratio(result, before) < 1 - tolerance:
+      regressions.append((name, _speed_ratio(result, before)))
+  return regressions
+
+def _bench_fresh_process(names, world_file):
+  """Misst `names` in einem neuen Interpreter nach; liefert dessen Ergebnisse."""
+  with tempfile.TemporaryDirectory() as directory:
+    out_file = os.path.join(directory, 'nachmessung.json')
+    subprocess.run([sys.executable, os.path.abspath(__file__), '--bench', '--bench-out', out_file,
+                    '--world', world_file, '--bench-only', *names], stdout=subprocess.DEVNULL, check=True)
+    with open(out_file, encoding='utf-8') as f:
+      return json.load(f)['results']
+
+def bench_main(out_file=BENCH_FILE, baseline_file=None, tolerance=BENCH_TOLERANCE, scales=BENCH_SCALES,
+               world_file=WORLD_FILE, names=None):
+  """Misst, schreibt JSON, vergleicht mit der Basislinie; Rückgabe ist der Exit-Code.
+
+  Wie schnell eine Messung läuft, hängt auch vom Prozess ab (Speicherlayout,
+  Nachbarn auf derselben Maschine) - Wiederholen im selben Prozess hilft da
+  nicht. Vermutete Rückschritte messen deshalb bis zu BENCH_RETRIES frische
+  Prozesse nach; es zählt der schnellste.
+  """
+  baseline = {}
+  if baseline_file:
+    with open(baseline_file, encoding='utf-8') as f:
+      baseline = json.load(f)['results']
+  results = run_benchmarks(scales, world_file, names)
+  for _ in range(BENCH_RETRIES):
+    suspects = [name for name, _ in compare_benchmarks(results, baseline, tolerance)]
+    if not suspects:
+      break
+    time.sleep(BENCH_RETRY_PAUSE)
+    for name, result in _bench_fresh_process(suspects, world_file).items():
+      if result['p50_us'] < results[name]['p50_us']:
+        results[name] = result
+  print(f"{'MESSUNG':48} {'OPS/S':>12} {'P50 US':>10} {'P99 US':>10} {'VS BASIS':>9}")
+  for name, result in results.items():
+    before = baseline.get(name)
+    ratio = f"{_speed_ratio(result, before):8.2f}x" if before else ''
+    print(f"{name:48} {result['ops']:12,.0f} {result['p50_us']:10.2f} {result['p99_us']:10.2f} {ratio:>9}")
+  with open(out_file, 'w', encoding='utf-8') as f:
+    json.dump({
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'seed': BENCH_SEED,
+        'results': results,
+    }, f, indent=1)
+  print(f"ERGEBNISSE GESCHRIEBEN: {out_file}")
+  regressions = compare_benchmarks(results, baseline, tolerance)
+  for name, ratio in regressions:
+    print(f"RUECKSCHRITT: {name} NUR NOCH {ratio:.0%} DER BASISLINIE")
+  return 1 if regressions else 0
+
+# --- Netzwerk-Server (Telnet) ---
+IAC, SB, SE = 255, 250, 240 # Telnet-Steuerbytes
+DO, NAWS = 253, 31 # "Bitte melde deine Fenstergröße" (RFC 1073)
+TELNET_OPTION_COMMANDS = (251, 252, 253, 254) # WILL, WONT, DO, DONT
+TELNET_TERMINAL = 'ansi' # Terminal-Backend der Clients ('plain' für reinen Text)
+MAX_LINE_BYTES = 2 ** 16 # Längere Eingabezeilen beenden die Verbindung (wie das Limit von asyncio.StreamReader)
+
+class TelnetFilter:
+  """Entfernt Telnet-Steuersequenzen (IAC ...) aus dem Bytestrom eines Clients.
+
+  Läuft über den rohen Strom, bevor er in Zeilen zerlegt wird: Eine
+  Sequenz darf über Paketgrenzen reichen, und die Nutzdaten einer
+  Unterverhandlung dürfen 0x0A/0x0D enthalten (NAWS mit 10 oder 13
+  Spalten). Unterverhandlungen (IAC SB <option> ... IAC SE) werden an
+  `on_subnegotiation(option, payload)` weitergereicht.
+  """
+
+  def __init__(self, on_subnegotiation=None):
+    self.on_subnegotiation = on_subnegotiation
+    self.mode = 'daten' # 'daten', 'iac' (nach IAC) oder 'option' (Optionsbyte nach WILL/WONT/DO/DONT)
+    self.sub_payload = None # bytearray während einer Unterverhandlung
+
+  def feed(self, data):
+    """Nimmt empfangene Bytes an und liefert die darin enthaltenen Nutzdaten."""
+    if self.mode == 'daten' and self.sub_payload is None and IAC not in data:
+      return data
+    out = bytearray()
+    for byte in data:
+      if self.mode == 'iac':
+        self.mode = 'daten'
+        if byte == IAC: # Maskiertes 0xFF
+          (out if self.sub_payload is None else self.sub_payload).append(IAC)
+        elif byte == SB:
+          self.sub_payload = bytearray()
+        elif byte == SE:
+          if self.sub_payload and self.on_subnegotiation:
+            self.on_subnegotiation(self.sub_payload[0], bytes(self.sub_payload[1:]))
+          self.sub_payload = None
+        elif byte in TELNET_OPTION_COMMANDS:
+          self.mode = 'option'
+      elif self.mode == 'option':
+        self.mode = 'daten'
+      elif byte == IAC:
+        self.mode = 'iac'
+      else:
+        (out if self.sub_payload is None else self.sub_payload).append(byte)
+    return bytes(out)
+
+class QueuedRenderer(TypewriterRenderer):
+  """Renderer für Netzwerk-Sitzungen.
+
+  Handler dürfen im Server nie blockieren. Frames und Pausen landen deshalb
+  in einer Zeitleiste, die `play()` asynchron an den Client ausspielt.
+  """
+
+  def __init__(self, baud=None, terminal=None):
+    super().__init__(baud=baud, clock=Clock(clock.mode, clock.scale), terminal=terminal or TERMINALS[TELNET_TERMINAL]())
+    self.timeline = collections.deque() # str = Frame, float = Pause in echten Sekunden
+
+  def _emit(self, text):
+    self.timeline.append(self.terminal.translate(text))
+
+  def _emit_encoded(self, data):
+    self.timeline.append(data)
+
+  def _wait(self, seconds):
+    self.clock.elapsed += seconds # Virtuelle Zeit zählen, aber nicht blockieren
+    wall = self.clock.wall_time(seconds)
+    if wall > 0:
+      self.timeline.append(wall)
+
+  def _skip_requested(self):
+    return False # Übersprungen wird beim Abspielen, siehe play()
+
+  async def play(self, writer, skip_requested):
+    """Spielt die Zeitleiste ab; wartet nicht mehr, sobald `skip_requested()` wahr ist."""
+    while self.timeline:
+      if writer.is_closing():
+        self.timeline.clear()
+        raise ConnectionResetError("Client hat die Verbindung getrennt")
+      item = self.timeline.popleft()
+      if isinstance(item, str):
+        writer.write(item.replace("\n", "\r\n").encode('utf-8'))
+      elif not skip_requested():
+        await writer.drain()
+        await asyncio.sleep(item)
+    await writer.drain()
+
+class TelnetConnection:
+  """Eine Spielerverbindung: liest Zeilen, spielt Ausgabe ab, führt die Spielschleife."""
+
+  def __init__(self, reader, writer):
+    self.reader = reader
+    self.writer = writer
+    self.renderer = QueuedRenderer(baud=renderer.baud)
+    self.lines = asyncio.Queue() # Empfangene Zeilen; None = Verbindung beendet, MOVE_MARKER = umziehen
+    self.playing = False # Wird gerade Ausgabe abgespielt?
+    self.skip = False # Hat der Spieler die laufende Ausgabe mit ENTER übersprungen?
+    self.session = None
+    self.move_requested = False # Soll die Sitzung am nächsten Prompt auf einen anderen Worker?
+    self.prompt_shown = False # Steht der Prompt schon beim Client (beim Umzug nicht doppelt zeigen)
+    self.telnet = TelnetFilter(self._subnegotiation)
+    self.pending = bytearray() # Empfangen, aber noch ohne Zeilenende (geht beim Umzug mit)
+
+  async def _read_lines(self):
+    """Liest Zeilen vom Client, solange die Verbindung offen ist."""
+    cancelled = False
+    try:
+      while True:
+        data = await self.reader.read(4096)
+        if not data:
+          if self.pending: # Wie StreamReader.readline: der Rest ohne Zeilenende zählt noch
+            self._received(bytes(self.pending))
+            self.pending.clear()
+          break
+        self.pending += self.telnet.feed(data)
+        end = self.pending.find(b'\n')
+        while end >= 0:
+          line = bytes(self.pending[:end])
+          del self.pending[:end + 1]
+          self._received(line)
+          end = self.pending.find(b'\n')
+        if len(self.pending) > MAX_LINE_BYTES:
+          break # Das ist keine Eingabezeile mehr: Verbindung beenden
+    except ConnectionError:
+      pass
+    except asyncio.CancelledError:
+      cancelled = True # Partie vorbei oder Umzug - die Verbindung selbst ist nicht beendet
+      raise
+    finally:
+      if not cancelled:
+        self.lines.put_nowait(None)
+
+  def _received(self, raw):
+    line = raw.decode('utf-8', errors='replace').rstrip("\r\n")
+    if line == "" and self.playing:
+      self.skip = True # ENTER während der Ausgabe überspringt nur die Animation
+    else:
+      self.lines.put_nowait(line)
+
+  def _subnegotiation(self, option, payload):
+    """Übernimmt die vom Client gemeldete Fensterbreite (NAWS) als Umbruchbreite."""
+    if option == NAWS and len(payload) >= 2:
+      columns = payload[0] << 8 | payload[1]
+      if columns:
+        self.renderer.width = max(20, min(columns - 10, 200)) # Rand wie bei 80 Spalten / WIDTH 70
+
+  def request_move(self):
+    """Lässt die Sitzung umziehen, sobald sie auf eine Eingabe wartet (sofort, falls sie das schon tut)."""
+    self.move_requested = True
+    if self.session and self.session.at_prompt:
+      self.lines.put_nowait(MOVE_MARKER)
+
+  def wake(self):
+    """Weckt die auf eine Eingabe wartende Sitzung für ein Ereignis der Weltuhr."""
+    self.lines.put_nowait(WORLD_TICK_MARKER)
+
+  async def read_line(self, prompt):
+    """Zeigt ausstehende Ausgabe und den Prompt an und wartet auf die nächste Zeile."""
+    while True:
+      moving = self.move_requested
+      if not moving: # Beim Umzug bleibt offen, ob der Prompt schon beim Client steht
+        if not self.prompt_shown:
+          self.renderer.write(prompt)
+        self.prompt_shown = False
+      self.renderer.flush()
+      self.playing = True
+      try:
+        await self.renderer.play(self.writer, lambda: self.skip or not self.lines.empty())
+      finally:
+        self.playing = False
+        self.skip = False
+      if moving:
+        raise SessionMoved # Prompt zeigt erst der neue Worker
+      line = await self.lines.get()
+      if line is MOVE_MARKER:
+        self.prompt_shown = True
+        raise SessionMoved
+      if line is WORLD_TICK_MARKER:
+        run_pending_tick(self.session) # Ausgabe, danach wieder der Prompt
+        continue
+      if line is None:
+        raise EOFError
+      return line
+
+  async def run(self, moved_state=None):
+    """Führt eine komplette Partie über diese Verbindung.
+
+    `moved_state` setzt eine auf einem anderen Worker begonnene Partie fort.
+    Zieht die Sitzung selbst weiter, liefert run() ihren Zustand für den
+    nächsten Worker zurück (sonst None); die Verbindung bleibt dann offen.
+    """
+    _active_renderer.set(self.renderer) # Gilt nur für den Task dieser Verbindung
+    session = self._resume(moved_state) if moved_state is not None else None
+    resumed = session is not None
+    if session is None:
+      if moved_state is None:
+        self.writer.write(bytes([IAC, DO, NAWS])) # Fenstergröße erfragen (für den Textumbruch)
+      session = GameSession(read_line=self.read_line, save_dir=None, # Spielstände bleiben im Speicher
+                            record_dir=RECORD_DIR)
+      peer = self.writer.get_extra_info('peername')
+      session.client = f"{peer[0]}:{peer[1]}" if peer else None
+    self.session = session
+    if WORLD_CLOCK:
+      WORLD_CLOCK.join(session, self.wake)
+      if session.pending_tick is not None: # Vom alten Worker mitgebracht
+        self.wake()
+    reader_task = asyncio.create_task(self._read_lines())
+    moved = False
+    try:
+      await game_loop(session, resumed=resumed)
+    except SessionMoved:
+      moved = True
+    except (EOFError, ConnectionError):
+      pass # Client hat die Verbindung getrennt
+    except SystemExit:
+      pass # QUIT oder Game Over beendet nur diese Sitzung, nicht den Server
+    except Exception as e: # Ein Fehler in einer Sitzung darf den Server nicht stoppen
+      print(f"FEHLER IN SITZUNG {self.writer.get_extra_info('peername')}: {e!r}", file=sys.stderr)
+    finally:
+      reader_task.cancel()
+      if WORLD_CLOCK:
+        WORLD_CLOCK.leave(session)
+      if not moved:
+        try:
+          self.renderer.flush()
+          await self.renderer.play(self.writer, lambda: True)
+          self.writer.close()
+          await self.writer.wait_closed()
+        except (ConnectionError, OSError):
+          pass
+    if moved:
+      return await self._handover(reader_task)
+    return None
+
+  def _resume(self, state):
+    """Baut eine umgezogene Sitzung wieder auf; None, wenn ihr Stand nicht mehr zur Welt passt."""
+    self.renderer.width = state['breite']
+    for line in state['zeilen']:
+      self.lines.put_nowait(line)
+    self.pending[:] = state['puffer']
+    self.telnet.mode, sub_payload = state['telnet']
+    self.telnet.sub_payload = None if sub_payload is None else bytearray(sub_payload)
+    session = GameSession(read_line=self.read_line, save_dir=None, seed=state['seed'], record_dir=RECORD_DIR)
+    try:
+      restore_snapshot(session, state['stand'])
+    except SnapshotError as e: # Beim Deploy wurde eine andere Welt geladen
+      print_slow(f"\nDER SERVER WURDE AKTUALISIERT ({e}). DEIN SPIEL BEGINNT VON VORN.")
+      return None
+    session.rng.setstate(state['zufall'])
+    session.recording = state['eingaben']
+    session.save_slots = state['spielstaende']
+    session.client = state['client']
+    session.pending_tick = state['uhr']
+    self.prompt_shown = state['prompt']
+    return session
+
+  async def _handover(self, reader_task):
+    """Packt eine umziehende Sitzung samt ungelesener Eingaben für den nächsten Worker ein.
+
+    Liefert None, wenn der Client inzwischen getrennt hat - dann endet die Partie hier.
+    """
+    try:
+      await reader_task
+    except asyncio.CancelledError:
+      pass
+    session = self.session
+    lines = []
+    while not self.lines.empty():
+      line = self.lines.get_nowait()
+      if line is None:
+        if session.record_dir:
+          write_recording(session, session.record_dir)
+        return None
+      if line is not MOVE_MARKER and line is not WORLD_TICK_MARKER:
+        lines.append(line)
+    return {'stand': save_snapshot(session), 'seed': session.seed, 'zufall': session.rng.getstate(),
+            'eingaben': session.recording, 'spielstaende': session.save_slots, 'client': session.client,
+            'zeilen': lines, 'puffer': bytes(self.pending), 'breite': self.renderer.width,
+            'prompt': self.prompt_shown, 'uhr': session.pending_tick,
+            'telnet': (self.telnet.mode, None if self.telnet.sub_payload is None else bytes(self.telnet.sub_payload))}
+
+async def handle_telnet_client(reader, writer):
+  """Callback für asyncio.start_server: eine neue Verbindung = eine neue Sitzung."""
+  await TelnetConnection(reader, writer).run()
+
+async def serve(host, port):
+  """Startet den Telnet-Server und bedient beliebig viele Spieler parallel."""
+  server = await asyncio.start_server(handle_telnet_client, host, port, backlog=1024)
+  install_signal_handlers(asyncio.get_running_loop())
+  start_world_clock()
+  addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+  print(f"MATRIX-SERVER LAEUFT AUF {addresses}")
+  async with server:
+    await server.serve_forever()
+
+# --- Mehrprozess-Server (Sharding) ---
+# Ein asyncio-Prozess nutzt nur einen Kern. Mit --workers nimmt ein Supervisor
+# die Verbindungen an und reicht jeden Client-Socket (per SCM_RIGHTS, nur POSIX)
+# an den Worker mit den wenigsten Sitzungen weiter; die Worker sind eigene
+# Prozesse, die das Skript neu starten. Eine Sitzung kann zwischen Workern
+# umziehen: An jedem Prompt (auch mitten im Minispiel, dessen Zustand im
+# Spielstand steht) packt der alte Worker Spielstand, Zufallszustand,
+# Eingaben und ungelesene Bytes ein und gibt den Socket zurück, der Supervisor
+# reicht beides an einen anderen Worker weiter. So gleicht der Supervisor die
+# Last aus, und SIGHUP startet alle Worker nacheinander neu (Deploy), ohne dass
+# eine Verbindung abreißt.
+#
+# Nachrichten auf dem Kanal (Unix-Socketpaar): 4 Bytes Länge + marshal-Daten,
+# ein Socket hängt als Zusatzdaten am Längenfeld.
+#   Supervisor -> Worker: ('sitzung', zustand|None) + Socket, ('abgeben', n), ('beenden',)
+#   Worker -> Supervisor: ('last', n), ('sitzung', zustand) + Socket, ('beendet',)
+REBALANCE_INTERVAL = 5.0 # Sekunden zwischen zwei Blicken auf die Lastverteilung
+REBALANCE_MIN = 2 # Ab so vielen überzähligen Sitzungen zieht der Supervisor welche um
+_CHANNEL_HEADER = struct.Struct('>I')
+MOVE_MARKER = object() # In TelnetConnection.lines: "jetzt umziehen"
+
+class SessionMoved(Exception):
+  """Die Sitzung verlässt diesen Worker und läuft auf einem anderen weiter."""
+
+async def _socket_ready(sock, write=False):
+  """Wartet, bis ein nicht-blockierender Socket lesbar (oder schreibbar) ist."""
+  loop = asyncio.get_running_loop()
+  ready = loop.create_future()
+  watch, unwatch = (loop.add_writer, loop.remove_writer) if write else (loop.add_reader, loop.remove_reader)
+  watch(sock.fileno(), lambda: ready.done() or ready.set_result(None))
+  try:
+    await ready
+  finally:
+    unwatch(sock.fileno())
+
+async def _recv_exact(sock, size):
+  data = bytearray()
+  while len(data) < size:
+    chunk = await asyncio.get_running_loop().sock_recv(sock, size - len(data))
+    if not chunk:
+      raise EOFError
+    data += chunk
+  return bytes(data)
+
+async def channel_send(channel, message, fds=()):
+  """Schickt eine Nachricht (und optional Sockets) über den Kanal."""
+  data = marshal.dumps(message, 4)
+  while True:
+    try:
+      sent = socket.send_fds(channel, [_CHANNEL_HEADER.pack(len(data))], fds)
+      break
+    except BlockingIOError:
+      await _socket_ready(channel, write=True)
+  if sent < _CHANNEL_HEADER.size: # Kommt bei 4 Bytes praktisch nie vor
+    await asyncio.get_running_loop().sock_sendall(channel, _CHANNEL_HEADER.pack(len(data))[sent:])
+  await asyncio.get_running_loop().sock_sendall(channel, data)
+
+async def channel_recv(channel):
+  """Empfängt eine Nachricht; liefert (nachricht, fds). EOFError, wenn die Gegenseite weg ist."""
+  while True:
+    try:
+      header, fds, _, _ = socket.recv_fds(channel, _CHANNEL_HEADER.size, 4)
+      break
+    except BlockingIOError:
+      await _socket_ready(channel)
+  if not header:
+    raise EOFError
+  header += await _recv_exact(channel, _CHANNEL_HEADER.size - len(header))
+  (size,) = _CHANNEL_HEADER.unpack(header)
+  return marshal.loads(await _recv_exact(channel, size)), fds
+
+class SocketReader:
+  """Liest direkt vom Socket (statt asyncio.StreamReader, der Bytes in seinem Puffer festhielte).
+
+  Angefangene Zeilen hält TelnetConnection.pending - beim Umzug gehen sie
+  mit, es geht also kein Byte verloren, das der Client schon geschickt hat.
+  """
+
+  def __init__(self, sock):
+    self.sock = sock
+
+  async def read(self, size):
+    return await asyncio.get_running_loop().sock_recv(self.sock, size)
+
+class SocketWriter:
+  """Gegenstück zu SocketReader mit der Schnittstelle von asyncio.StreamWriter, die das Spiel braucht."""
+
+  def __init__(self, sock):
+    self.sock = sock
+    self.pending = bytearray()
+    self.closed = False
+
+  def write(self, data):
+    self.pending += data
+
+  async def drain(self):
+    if self.pending:
+      data = bytes(self.pending)
+      self.pending.clear()
+      await asyncio.get_running_loop().sock_sendall(self.sock, data)
+
+  def is_closing(self):
+    return self.closed
+
+  def close(self):
+    self.closed = True
+
+  async def wait_closed(self):
+    pass
+
+  def get_extra_info(self, name):
+    if name == 'peername':
+      try:
+        return self.sock.getpeername()
+      except OSError:
+        return None
+    return None
+
+class ShardWorker:
+  """Ein Worker-Prozess: spielt die Sitzungen, die ihm der Supervisor zuteilt."""
+
+  def __init__(self, channel):
+    self.channel = channel
+    self.connections = set()
+    self.send_lock = asyncio.Lock()
+    self.draining = False
+    self.done = asyncio.Event()
+
+  async def send(self, message, fds=()):
+    async with self.send_lock:
+      await channel_send(self.channel, message, fds)
+
+  async def report(self):
+    await self.send(('last', len(self.connections)))
+
+  async def run(self):
+    install_signal_handlers(asyncio.get_running_loop())
+    start_world_clock()
+    listener = asyncio.create_task(self.listen())
+    await asyncio.wait([listener, asyncio.create_task(self.done.wait())], return_when=asyncio.FIRST_COMPLETED)
+    listener.cancel()
+
+  async def listen(self):
+    try:
+      while True:
+        message, fds = await channel_recv(self.channel)
+        if message[0] == 'sitzung':
+          self.adopt(fds[0], message[1])
+        elif message[0] == 'abgeben':
+          for connection in [c for c in self.connections if not c.move_requested][:message[1]]:
+            connection.request_move()
+        elif message[0] == 'beenden':
+          self.draining = True
+          for connection in list(self.connections):
+            connection.request_move()
+          await self._finish_if_drained()
+    except (EOFError, ConnectionError):
+      pass # Supervisor ist weg: Worker beendet sich mit ihm
+
+  def adopt(self, fd, state):
+    """Nimmt eine Sitzung sofort in die Liste auf, damit ein gleich folgendes 'beenden' sie mitnimmt."""
+    sock = socket.socket(fileno=fd)
+    sock.setblocking(False)
+    connection = TelnetConnection(SocketReader(sock), SocketWriter(sock))
+    self.connections.add(connection)
+    if self.draining: # Kam noch unterwegs an: gleich weiterreichen
+      connection.request_move()
+    asyncio.create_task(self.host(sock, connection, state))
+
+  async def host(self, sock, connection, state):
+    """Führt eine Sitzung auf diesem Worker und gibt sie bei einem Umzug an den Supervisor zurück."""
+    try:
+      await self.report()
+      moved_state = await connection.run(state)
+      if moved_state is not None:
+        await self.send(('sitzung', moved_state), [sock.fileno()])
+    except (EOFError, ConnectionError):
+      pass # Supervisor ist weg
+    finally:
+      sock.close()
+      self.connections.discard(connection)
+      try:
+        await self.report()
+        await self._finish_if_drained()
+      except (EOFError, OSError):
+        pass
+
+  async def _finish_if_drained(self):
+    if self.draining and not self.connections:
+      await self.send(('beendet',))
+      self.done.set()
+
+def run_worker(fd):
+  """Einstieg eines Worker-Prozesses (--worker-fd)."""
+  signal.signal(signal.SIGINT, signal.SIG_IGN) # Strg+C gilt dem Supervisor, der beendet die Worker
+  channel = socket.socket(fileno=fd)
+  channel.setblocking(False)
+  asyncio.run(ShardWorker(channel).run())
+
+class WorkerHandle:
+  """Sicht des Supervisors auf einen Worker-Prozess."""
+
+  def __init__(self, process, channel):
+    self.process = process
+    self.channel = channel
+    self.load = 0 # Sitzungen laut letzter Meldung (plus seither zugeteilte)
+    self.draining = False # Wird gerade für einen Neustart geleert
+    self.send_lock = asyncio.Lock()
+    self.finished = asyncio.Event()
+
+  async def send(self, message, fds=()):
+    async with self.send_lock:
+      await channel_send(self.channel, message, fds)
+
+class Supervisor:
+  """Nimmt Verbindungen an und verteilt die Sitzungen auf Worker-Prozesse."""
+
+  def __init__(self, host, port, workers, worker_command):
+    self.host = host
+    self.port = port
+    self.size = workers
+    self.worker_command = worker_command
+    self.workers = []
+    self.restarting = None # Laufender Neustart (Task)
+    self.restart_pending = False # Während des Neustarts kam noch ein SIGHUP
+
+  def spawn(self):
+    """Startet einen neuen Worker (mit dem aktuellen Code auf der Platte)."""
+    ours, theirs = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+    process = subprocess.Popen(self.worker_command + ['--worker-fd', str(theirs.fileno())], pass_fds=[theirs.fileno()])
+    theirs.close()
+    ours.setblocking(False)
+    worker = WorkerHandle(process, ours)
+    self.workers.append(worker)
+    asyncio.create_task(self.listen(worker))
+    return worker
+
+  async def listen(self, worker):
+    """Verarbeitet die Meldungen eines Workers, bis er sich beendet."""
+    try:
+      while True:
+        message, fds = await channel_recv(worker.channel)
+        if message[0] == 'last':
+          worker.load = message[1]
+        elif message[0] == 'sitzung':
+          try:
+            await self.assign(fds[0], message[1], exclude=worker)
+          finally:
+            os.close(fds[0])
+        elif message[0] == 'beendet':
+          break
+    except (EOFError, ConnectionError):
+      pass
+    self.workers.remove(worker)
+    worker.channel.close()
+    await asyncio.get_running_loop().run_in_executor(None, worker.process.wait)
+    if not worker.draining: # Abgestürzt: dessen Sitzungen sind verloren, aber die Kapazität nicht
+      print(f"WORKER {worker.process.pid} BEENDET (CODE {worker.process.returncode}), STARTE NEU", file=sys.stderr)
+      self.spawn()
+    worker.finished.set()
+
+  async def assign(self, fd, state, exclude=None):
+    """Gibt eine Sitzung an den Worker mit den wenigsten Sitzungen."""
+    candidates = [w for w in self.workers if not w.draining and w is not exclude]
+    if not candidates:
+      candidates = [w for w in self.workers if not w.draining]
+    if not candidates:
+      return # Kein Worker mehr da (Server fährt herunter): die Verbindung wird geschlossen
+    worker = min(candidates, key=lambda w: w.load)
+    worker.load += 1
+    await worker.send(('sitzung', state), [fd])
+
+  def request_restart(self):
+    """SIGHUP: kommt er während eines Neustarts, folgt danach genau ein weiterer."""
+    if self.restarting:
+      self.restart_pending = True
+    else:
+      self.restarting = asyncio.create_task(self.restart_workers())
+
+  async def restart_workers(self):
+    """Startet alle Worker nacheinander neu; ihre Sitzungen ziehen auf die anderen um."""
+    try:
+      while True:
+        self.restart_pending = False
+        for old in [w for w in self.workers if not w.draining]:
+          self.spawn()
+          old.draining = True
+          await old.send(('beenden',))
+          await old.finished.wait()
+        print("ALLE WORKER NEU GESTARTET", file=sys.stderr)
+        if not self.restart_pending:
+          break
+    finally:
+      self.restarting = None
+
+  async def rebalance(self):
+    """Zieht regelmäßig Sitzungen vom vollsten zum leersten Worker um."""
+    while True:
+      await asyncio.sleep(REBALANCE_INTERVAL)
+      active = [w for w in self.workers if not w.draining]
+      if len(active) < 2:
+        continue
+      busiest = max(active, key=lambda w: w.load)
+      idlest = min(active, key=lambda w: w.load)
+      surplus = (busiest.load - idlest.load) // 2
+      if surplus >= REBALANCE_MIN:
+        await busiest.send(('abgeben', surplus))
+
+  async def run(self):
+    loop = asyncio.get_running_loop()
+    listener = socket.create_server((self.host, self.port), backlog=1024)
+    listener.setblocking(False)
+    for _ in range(self.size):
+      self.spawn()
+    loop.add_signal_handler(signal.SIGHUP, self.request_restart)
+    asyncio.create_task(self.rebalance())
+    print(f"MATRIX-SERVER LAEUFT AUF {listener.getsockname()} MIT {self.size} WORKERN")
+    while True:
+      client, _ = await loop.sock_accept(listener)
+      try:
+        await self.assign(client.fileno(), None)
+      finally:
+        client.close() # Der Worker hat jetzt seine eigene Kopie
+
+def worker_command(cli_args):
+  """Kommandozeile für Worker-Prozesse: dieselben Spieloptionen wie der Supervisor."""
+  command = [sys.executable, os.path.abspath(__file__)]
+  for option, value in (('--tempo', cli_args.tempo), ('--baud', cli_args.baud), ('--world', cli_args.world), ('--record', cli_args.record),
+                        ('--transcripts', cli_args.transcripts), ('--terminal', cli_args.terminal)):
+    if value is not None:
+      command += [option, str(value)]
+  if cli_args.world_tick:
+    command += ['--world-tick', str(cli_args.world_tick)]
+  if cli_args.metrics:
+    command.append('--metrics')
+  return command
 
-    # 6. Kleinen Moment warten (optional, für Lesbarkeit)
-    # time.sleep(0.1)
+def parse_listen_address(text):
+  """Zerlegt '[HOST:]PORT' in (host, port); Typ-Funktion für --server."""
+  host, _, port = text.rpartition(':')
+  try:
+    number = int(port)
+  except ValueError:
+    raise argparse.ArgumentTypeError(f"'{text}' ist keine Adresse der Form [HOST:]PORT") from None
+  if not 0 <= number <= 65535:
+    raise argparse.ArgumentTypeError(f"Port {number} liegt nicht zwischen 0 und 65535")
+  return host or '0.0.0.0', number
 
 
 if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Matrix - Text Adventure")
+  parser.add_argument('--tempo',
+                      help="Spieltempo: 'real', 'instant' oder ein Faktor wie 10 (zehnmal schneller); "
+                           "Standard: real, mit --batch instant")
+  parser.add_argument('--baud', type=int, choices=[300, 1200, 2400, 9600],
+                      help="Schreibmaschine als Modem mit dieser Baud-Rate emulieren")
+  parser.add_argument('--server', type=parse_listen_address, metavar='[HOST:]PORT',
+                      help="Als Telnet-Server starten, der viele Spieler gleichzeitig bedient")
+  parser.add_argument('--workers', type=int, nargs='?', const=os.cpu_count() or 1, metavar='N',
+                      help="Server auf N Worker-Prozesse verteilen (ohne N: einer pro Kern); "
+                           "SIGHUP startet sie ohne Verbindungsabbruch neu")
+  parser.add_argument('--worker-fd', type=int, help=argparse.SUPPRESS) # Intern: Kanal zum Supervisor
+  parser.add_argument('--world-tick', type=float, metavar='SEKUNDEN',
+                      help="Im Server: Weltuhr mit diesem Takt - Alert-Level sinkt mit der Zeit, "
+                           "ab Stufe 3 jagen Agenten die Spieler")
+  parser.add_argument('--terminal', choices=sorted(TERMINALS),
+                      help="Ausgabe: 'ansi', 'curses' (Vollbild), 'plain' (reiner Text) oder 'json' "
+                           "(ein Ereignis pro Zeile fuer Programme); "
+                           "Standard: ansi im Terminal, sonst plain")
+  parser.add_argument('--world', metavar='DATEI',
+                      help="Andere Weltdatei (JSON) statt welt.json laden")
+  parser.add_argument('--check-world', metavar='DATEI',
+                      help="Nur die Weltdatei pruefen und Fehler melden, nicht spielen")
+  parser.add_argument('--solve', action='store_true',
+                      help="Zustandsraum durchsuchen: kuerzeste Loesung, Game Over und Softlocks melden")
+  parser.add_argument('--fuzz', type=float, metavar='SEKUNDEN',
+                      help="Befehlsfolgen fuzzen und Funde als Aufzeichnungen ablegen")
+  parser.add_argument('--fuzz-dir', default=FUZZ_DIR, metavar='VERZEICHNIS',
+                      help="Wohin --fuzz die verkleinerten Funde schreibt")
+  parser.add_argument('--bench', action='store_true',
+                      help="Benchmarks ausfuehren und als JSON speichern")
+  parser.add_argument('--bench-out', default=BENCH_FILE, metavar='DATEI',
+                      help="Wohin --bench die Ergebnisse schreibt")
+  parser.add_argument('--bench-baseline', metavar='DATEI',
+                      help="Mit frueheren Ergebnissen vergleichen; Rueckschritte ergeben Exit-Code 1")
+  parser.add_argument('--bench-tolerance', type=float, default=BENCH_TOLERANCE,
+                      help="Erlaubter Verlust gegenueber der Basislinie (0.25 = 25%%)")
+  parser.add_argument('--bench-only', metavar='MESSUNG', nargs='+',
+                      help="Nur diese Messungen ausfuehren (Namen wie in der Ergebnistabelle)")
+  parser.add_argument('--metrics', action='store_true',
+                      help="Laufzeiten von Befehlen, Ereignissen und Ausgabe messen und am Ende ausgeben")
+  parser.add_argument('--jobs', type=int,
+                      help="Prozesse fuer --solve und --fuzz (Standard: alle Kerne)")
+  parser.add_argument('--max-states', type=int, default=SOLVER_MAX_STATES,
+                      help="Obergrenze der Zustaende fuer --solve")
+  parser.add_argument('--seed', type=int,
+                      help="Zufall festlegen (lokales Spiel und --fuzz)")
+  parser.add_argument('--record', metavar='VERZEICHNIS',
+                      help="Jede Sitzung als (Seed, Eingaben) in dieses Verzeichnis aufzeichnen")
+  parser.add_argument('--transcripts', metavar='VERZEICHNIS',
+                      help="Ein- und Ausgaben aller Sitzungen als komprimierte Transkripte mitschreiben")
+  parser.add_argument('--replay', metavar='DATEI', nargs='+',
+                      help="Aufzeichnungen ohne Ausgabe nachspielen und den Endzustand pruefen")
+  parser.add_argument('--batch', metavar='DATEI', nargs='?', const='-',
+                      help="Befehle aus DATEI (ohne: Standard-Eingabe) ohne Intro und Pausen abspielen; "
+                           "Exit-Code 0 gewonnen, 3 Game Over, 4 QUIT, 5 Skript zu Ende")
+  cli_args = parser.parse_args()
+  if cli_args.check_world:
+      try:
+          checked = load_world(cli_args.check_world)
+      except (OSError, ValueError) as e: # WorldError und JSON-Fehler sind ValueErrors
+          print(e, file=sys.stderr)
+          sys.exit(1)
+      print(f"WELT OK: {len(checked.locations)} ORTE, {len(checked.items)} GEGENSTAENDE")
+      sys.exit(0)
+  if cli_args.world:
+      try:
+          WORLD = load_world(cli_args.world)
+      except (OSError, ValueError) as e:
+          parser.error(str(e))
+  if cli_args.replay:
+      sys.exit(replay_files(cli_args.replay))
+  if cli_args.bench:
+      sys.exit(bench_main(cli_args.bench_out, cli_args.bench_baseline, cli_args.bench_tolerance,
+                         world_file=cli_args.world or WORLD_FILE, names=cli_args.bench_only))
+  if cli_args.fuzz:
+      sys.exit(fuzz(cli_args.fuzz, jobs=cli_args.jobs, directory=cli_args.fuzz_dir, seed=cli_args.seed))
+  if cli_args.solve:
+      sys.exit(print_solver_report(solve(jobs=cli_args.jobs, max_states=cli_args.max_states)))
+  RECORD_DIR = cli_args.record
+  if cli_args.transcripts:
+      TRANSCRIPT_WRITER = TranscriptWriter(cli_args.transcripts)
+      TRANSCRIPT_WRITER.start()
+  if cli_args.metrics:
+      enable_metrics()
+  renderer.baud = cli_args.baud
+  if cli_args.workers is not None:
+      if not cli_args.server:
+          parser.error("--workers gibt es nur zusammen mit --server")
+      if cli_args.workers < 1:
+          parser.error("--workers braucht mindestens einen Worker")
+      if not hasattr(socket, 'send_fds') or not hasattr(signal, 'SIGHUP'):
+          parser.error("--workers braucht ein POSIX-System")
+  if cli_args.batch is not None and (cli_args.server or cli_args.worker_fd is not None):
+      parser.error("--batch gibt es nur fuer das lokale Spiel")
+  if cli_args.world_tick is not None:
+      if not (cli_args.server or cli_args.worker_fd is not None):
+          parser.error("--world-tick gibt es nur zusammen mit --server")
+      if cli_args.world_tick <= 0:
+          parser.error("--world-tick braucht einen positiven Takt")
+      WORLD_TICK = cli_args.world_tick
+  if cli_args.terminal and (cli_args.server or cli_args.worker_fd is not None):
+      if cli_args.terminal == 'curses':
+          parser.error("--terminal curses gibt es nur fuer das lokale Spiel")
+      TELNET_TERMINAL = cli_args.terminal
+  elif cli_args.terminal:
+      renderer.terminal = TERMINALS[cli_args.terminal]()
+      if cli_args.terminal == 'curses':
+          renderer.width = max(20, min(WIDTH, renderer.terminal.width - 2))
+  try:
+      configure_clock_from_arg(cli_args.tempo or ('instant' if cli_args.batch is not None else 'real'))
+  except ValueError as e:
+      parser.error(str(e))
   try:
-      main()
+      if cli_args.worker_fd is not None:
+          run_worker(cli_args.worker_fd)
+      elif cli_args.server and cli_args.workers:
+          asyncio.run(Supervisor(*cli_args.server, cli_args.workers, worker_command(cli_args)).run())
+      elif cli_args.server:
+          asyncio.run(serve(*cli_args.server))
+      elif cli_args.batch is not None:
+          sys.exit(batch_main(cli_args.batch, seed=cli_args.seed))
+      else:
+          main(GameSession(seed=cli_args.seed, record_dir=RECORD_DIR, admin=True))
   except KeyboardInterrupt:
       print_slow("\n\nSpiel durch Benutzer unterbrochen. Bis bald!")
-      sys.exit()
\ No newline at end of file
+      sys.exit()
+  finally:
+      renderer.flush()
+      renderer.terminal.close()
+      if TRANSCRIPT_WRITER:
+          TRANSCRIPT_WRITER.stop()
+      if cli_args.metrics:
+          print("\n".join(METRICS.report()), file=sys.stderr)
\ No newline at end of file
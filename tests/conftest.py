@@ -0,0 +1,84 @@
+"""Gemeinsame Helfer: das Spiel als Modul laden und in eigenen Prozessen ausführen."""
+import importlib.util
+import os
+import pathlib
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+SCRIPT = ROOT / 'Matrix_v2.0.py'
+
+def load_matrix():
+  """Lädt Matrix_v2.0.py als Modul (der Dateiname ist kein gültiger Modulname)."""
+  spec = importlib.util.spec_from_file_location('matrix', SCRIPT)
+  module = importlib.util.module_from_spec(spec)
+  spec.loader.exec_module(module)
+  return module
+
+@pytest.fixture(scope='session')
+def matrix():
+  module = load_matrix()
+  module._active_renderer.set(module.NullRenderer())
+  return module
+
+def run_python(code, hashseed, *args, stdin=None):
+  """Führt `code` in einem neuen Interpreter mit festem PYTHONHASHSEED aus; liefert stdout.
+
+  Im Code steht das Spiel als `m` bereit (ohne Ausgabe), die Argumente in `sys.argv[1:]`.
+  """
+  prelude = (f"import sys; sys.path.insert(0, {str(ROOT / 'tests')!r}); import conftest; "
+             "m = conftest.load_matrix(); m._active_renderer.set(m.NullRenderer())\n")
+  env = dict(os.environ, PYTHONHASHSEED=str(hashseed))
+  result = subprocess.run([sys.executable, '-c', prelude + code, *args], input=stdin, env=env,
+                          capture_output=True, text=True, check=True, timeout=60)
+  return result.stdout
+
+def run_game(*args, hashseed=None, stdin=None, cwd=None):
+  """Startet das Spiel selbst als Prozess; liefert das CompletedProcess."""
+  env = dict(os.environ)
+  env.pop('PYTHONHASHSEED', None)
+  if hashseed is not None:
+    env['PYTHONHASHSEED'] = str(hashseed)
+  return subprocess.run([sys.executable, str(SCRIPT), *args], input=stdin, env=env, cwd=cwd,
+                        capture_output=True, text=True, timeout=60)
+
+PROMPT = "WAS TUN?> "
+
+def free_port():
+  """Ein gerade freier TCP-Port auf 127.0.0.1."""
+  with socket.socket() as sock:
+    sock.bind(('127.0.0.1', 0))
+    return sock.getsockname()[1]
+
+class Client:
+  """Spielt wie ein Telnet-Client: schickt Zeilen und liest bis zum nächsten Prompt."""
+
+  def __init__(self, port):
+    deadline = time.monotonic() + 10
+    while True:
+      try:
+        self.sock = socket.create_connection(('127.0.0.1', port), timeout=10)
+        break
+      except OSError:
+        if time.monotonic() > deadline:
+          raise
+        time.sleep(0.1)
+    self.buffer = ""
+    self.read_until_prompt()
+
+  def read_until_prompt(self):
+    while PROMPT not in self.buffer:
+      data = self.sock.recv(65536)
+      if not data:
+        raise ConnectionError("Server hat die Verbindung getrennt")
+      self.buffer += data.decode('utf-8', 'replace').replace("\r\n", "\n")
+    answer, _, self.buffer = self.buffer.partition(PROMPT)
+    return answer
+
+  def command(self, line):
+    self.sock.sendall(line.encode('utf-8') + b"\r\n")
+    return self.read_until_prompt()
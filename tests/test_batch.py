@@ -0,0 +1,46 @@
+"""Stapelbetrieb (--batch): ein kleines Skript für jeden Exit-Code."""
+import pytest
+
+from conftest import run_game
+
+WRONG_PASSWORDS = "BENUTZE COMPUTER\nfalsch\nfalsch\nfalsch\n"
+
+@pytest.fixture
+def before_the_door(matrix, tmp_path):
+  """Ein Spielstand vor der Server-Farm: Karte durchgezogen, Code bekannt. Liefert den Code."""
+  session = matrix.GameSession(save_dir=None, seed=1)
+  state = session.game_state
+  state.current_location = 'SERVER_FARM_EINGANG'
+  state.server_farm_hacked = True
+  state.server_farm_card_used = True
+  (tmp_path / matrix.SAVE_DIR).mkdir()
+  (tmp_path / matrix.SAVE_DIR / 'ziel.sav').write_bytes(matrix.save_snapshot(session))
+  return state.server_farm_access_code
+
+def batch(script, cwd=None):
+  return run_game('--batch', '--seed', '1', stdin=script, cwd=cwd)
+
+def test_won(before_the_door, tmp_path):
+  result = batch(f"# Kommentare zählen nicht\nLADEN ZIEL\nCODE {before_the_door}\n", cwd=tmp_path)
+  assert "ERGEBNIS: GEWONNEN NACH 2 EINGABEN" in result.stderr
+  assert result.returncode == 0
+
+def test_game_over():
+  result = batch(WRONG_PASSWORDS * 3 + "SCHAU\n")
+  assert "ERGEBNIS: GAME_OVER" in result.stderr
+  assert result.returncode == 3
+
+def test_quit():
+  result = batch("NIMM ZETTEL\nQUIT\nSCHAU\n")
+  assert "ERGEBNIS: BEENDET NACH 2 EINGABEN" in result.stderr
+  assert result.returncode == 4
+
+def test_script_ended():
+  result = batch("NIMM ZETTEL\nSCHAU\n")
+  assert "ERGEBNIS: SKRIPT_ZU_ENDE NACH 2 EINGABEN" in result.stderr
+  assert result.returncode == 5
+
+def test_unreadable_script(tmp_path):
+  result = run_game('--batch', str(tmp_path / 'fehlt.txt'))
+  assert "SKRIPT NICHT LESBAR" in result.stderr
+  assert result.returncode == 2
@@ -0,0 +1,8 @@
+"""Fuzzer (--fuzz) als Rauchtest: Funde lassen sich nachspielen."""
+
+def test_fuzz_findings_replay(matrix, tmp_path, capsys):
+  assert matrix.fuzz(3, jobs=1, directory=str(tmp_path), seed=1) == 0 # Nur erwartete Funde (QUIT, Game Over)
+  findings = sorted(str(path) for path in tmp_path.glob('*.json'))
+  assert findings
+  assert matrix.replay_files(findings) == 0
+  assert "0 FEHLGESCHLAGEN" in capsys.readouterr().out
@@ -0,0 +1,17 @@
+"""JSON-Ausgabe (--terminal json): Ereignisse für Programme, die selbst darstellen."""
+import json
+
+from conftest import run_game
+
+SCRIPT_LINES = "LIES ZETTEL\nSCHAU FENSTER\nGEHE RAUS\nGEHE CAFE\nREDE MIT MANN\n"
+
+def events():
+  result = run_game('--batch', '--terminal', 'json', stdin=SCRIPT_LINES)
+  return [json.loads(line) for line in result.stdout.splitlines()]
+
+def test_messages_are_not_wrapped_by_the_server():
+  texts = [event['text'] for event in events() if event['event'] == 'message']
+  prose = [text for text in texts if len(text) > 70 and "\n- " not in text] # Listen dürfen Zeilen haben
+  assert len(prose) >= 3
+  assert [text for text in prose if "\n" in text] == []
+  assert any("Dein CRT-Monitor flackert vor dir" in text for text in prose)
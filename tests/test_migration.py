@@ -0,0 +1,54 @@
+"""Umzug zwischen Workern: das Inventar bleibt, wie der Spieler es kennt."""
+import os
+import queue
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from conftest import SCRIPT, Client, free_port
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, 'send_fds') or not hasattr(signal, 'SIGHUP'),
+                                reason="--workers braucht ein POSIX-System")
+
+@pytest.fixture
+def server():
+  env = dict(os.environ)
+  env.pop('PYTHONHASHSEED', None) # Jeder Worker bekommt seine eigene Hash-Reihenfolge
+  port = free_port()
+  process = subprocess.Popen([sys.executable, str(SCRIPT), '--server', f'127.0.0.1:{port}', '--workers', '2',
+                              '--tempo', 'instant', '--terminal', 'plain'],
+                             stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, env=env)
+  lines = queue.Queue()
+  threading.Thread(target=lambda: [lines.put(line) for line in process.stdout], daemon=True).start()
+  try:
+    yield port, process, lines
+  finally:
+    process.send_signal(signal.SIGINT)
+    try:
+      process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+      process.kill()
+
+def _wait_for(lines, text, timeout=30):
+  deadline = time.monotonic() + timeout
+  while True:
+    line = lines.get(timeout=max(0.1, deadline - time.monotonic()))
+    if text in line:
+      return
+
+def test_inventory_survives_rolling_restarts(server):
+  port, process, lines = server
+  client = Client(port)
+  for line in ('NIMM ZETTEL', 'GEHE RAUS', 'GEHE CAFE', 'REDE MIT MANN', 'NIMM SCHLUESSELKARTE'):
+    client.command(line)
+  before = client.command('INVENTAR')
+  assert 'ZETTEL' in before and 'SCHLUESSELKARTE' in before
+  for _ in range(4): # Jeder Neustart zieht die Sitzung in einen frischen Prozess um
+    process.send_signal(signal.SIGHUP)
+    _wait_for(lines, "ALLE WORKER NEU GESTARTET")
+    assert client.command('INVENTAR') == before
@@ -0,0 +1,37 @@
+"""Aufzeichnungen: Nachspielen in einem anderen Prozess mit anderer Hash-Reihenfolge."""
+import json
+
+import pytest
+
+from conftest import run_game
+
+# Zwei Gegenstände im Inventar, dazwischen Speichern und Laden
+COMMANDS = ['NIMM ZETTEL', 'GEHE RAUS', 'GEHE CAFE', 'REDE MIT MANN', 'NIMM SCHLUESSELKARTE',
+            'SPEICHERN', 'LADEN', 'INVENTAR', 'QUIT']
+
+@pytest.fixture(scope='module')
+def recordings(tmp_path_factory):
+  """Dieselbe Partie, aufgezeichnet unter mehreren Hash-Seeds."""
+  paths = []
+  for hashseed in (0, 1, 2, 3):
+    workdir = tmp_path_factory.mktemp(f"seed{hashseed}")
+    result = run_game('--tempo', 'instant', '--terminal', 'plain', '--seed', '5', '--record', 'aufnahmen',
+                      hashseed=hashseed, stdin="\n".join(COMMANDS) + "\n", cwd=workdir)
+    assert result.returncode == 0, result.stderr
+    [path] = (workdir / 'aufnahmen').iterdir()
+    paths.append(path)
+  return paths
+
+def test_recording_covers_save_and_load(recordings):
+  recording = json.loads(recordings[0].read_text(encoding='utf-8'))
+  assert recording['commands'] == COMMANDS
+
+def test_digest_does_not_depend_on_hash_seed(recordings):
+  digests = {json.loads(path.read_text(encoding='utf-8'))['digest'] for path in recordings}
+  assert len(digests) == 1
+
+@pytest.mark.parametrize('hashseed', [4, 5, 6, 7])
+def test_replay_in_other_process(recordings, hashseed):
+  result = run_game('--replay', *map(str, recordings), hashseed=hashseed)
+  assert result.returncode == 0, result.stdout
+  assert "0 FEHLGESCHLAGEN" in result.stdout
@@ -0,0 +1,64 @@
+"""Telnet-Server: Adressen und Eingabestrom."""
+import argparse
+import signal
+import subprocess
+import sys
+
+import pytest
+
+from conftest import SCRIPT, Client, free_port, run_game
+
+IAC, SB, SE, DO, NAWS = 255, 250, 240, 253, 31
+
+@pytest.mark.parametrize('text, expected', [('4000', ('0.0.0.0', 4000)), ('127.0.0.1:23', ('127.0.0.1', 23))])
+def test_parse_listen_address(matrix, text, expected):
+  assert matrix.parse_listen_address(text) == expected
+
+@pytest.mark.parametrize('text', ['abc', 'host:', '127.0.0.1:x', '70000'])
+def test_parse_listen_address_rejects(matrix, text):
+  with pytest.raises(argparse.ArgumentTypeError):
+    matrix.parse_listen_address(text)
+
+def test_bad_server_address_is_a_usage_error():
+  result = run_game('--server', 'localhost:telnet')
+  assert result.returncode == 2
+  assert "argument --server" in result.stderr and "Traceback" not in result.stderr
+
+def naws(columns, rows):
+  return bytes([IAC, SB, NAWS, columns >> 8, columns & 0xFF, rows >> 8, rows & 0xFF, IAC, SE])
+
+@pytest.mark.parametrize('chunk', [1, 2, 5, 1000])
+def test_telnet_filter_keeps_sequences_across_chunks(matrix, chunk):
+  reports = []
+  telnet = matrix.TelnetFilter(lambda option, payload: reports.append((option, payload)))
+  stream = b'NIMM' + bytes([IAC, DO, 1]) + naws(10, 13) + b' ' + bytes([IAC, IAC]) + b'\r\n'
+  out = b''.join(telnet.feed(stream[i:i + chunk]) for i in range(0, len(stream), chunk))
+  assert out == b'NIMM \xff\r\n'
+  assert reports == [(NAWS, b'\x00\n\x00\r')]
+
+@pytest.fixture
+def server():
+  port = free_port()
+  process = subprocess.Popen([sys.executable, str(SCRIPT), '--server', f'127.0.0.1:{port}', '--tempo', 'instant',
+                              '--terminal', 'plain'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+  try:
+    yield port
+  finally:
+    process.send_signal(signal.SIGINT)
+    try:
+      process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+      process.kill()
+
+def test_window_size_with_newline_bytes_is_not_a_command(server):
+  client = Client(server)
+  client.command('NIMM ZETTEL')
+  client.sock.sendall(naws(10, 10) + b'INVENTAR\r\n')
+  assert 'ZETTEL' in client.read_until_prompt()
+
+def test_overlong_line_closes_only_that_connection(server):
+  client = Client(server)
+  client.sock.sendall(b'A' * 100_000)
+  while client.sock.recv(65536):
+    pass
+  assert 'ZETTEL' in Client(server).command('NIMM ZETTEL')
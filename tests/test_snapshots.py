@@ -0,0 +1,64 @@
+"""Spielstände: Reihenfolge über Prozessgrenzen und fehlerhafte Spielstände."""
+import marshal
+
+import pytest
+
+from conftest import run_python
+
+# Karte zuerst, der Zettel wird abgelegt und wieder genommen: erwartet ist die Reihenfolge im Inventar
+MOVES = [('SCHLUESSELKARTE', '@INVENTAR'), ('ZETTEL', '@INVENTAR'), ('DATEN_DISKETTE', '@INVENTAR'),
+         ('ZETTEL', 'APARTMENT'), ('ZETTEL', '@INVENTAR')]
+EXPECTED = ['SCHLUESSELKARTE', 'DATEN_DISKETTE', 'ZETTEL']
+
+SAVE = """
+session = m.GameSession(save_dir=None, seed=1)
+for item_id, loc_id in %r:
+  session.placement.move(item_id, loc_id)
+print(list(session.inventory))
+print(m.save_snapshot(session).hex())
+""" % (MOVES,)
+
+LOAD = """
+session = m.GameSession(save_dir=None, seed=1)
+m.restore_snapshot(session, bytes.fromhex(sys.argv[1]))
+print(list(session.inventory))
+"""
+
+@pytest.mark.parametrize('save_seed, load_seed', [(0, 1), (1, 2), (2, 3), (3, 0), (7, 11)])
+def test_inventory_order_survives_other_hash_seed(save_seed, load_seed):
+  saved_inventory, snapshot = run_python(SAVE, save_seed).splitlines()
+  assert saved_inventory == repr(EXPECTED)
+  assert run_python(LOAD, load_seed, snapshot).strip() == repr(EXPECTED)
+
+def _session_with_changes(matrix):
+  session = matrix.GameSession(save_dir=None, seed=1)
+  session.placement.move('ZETTEL', matrix.INVENTORY)
+  session.game_state.alert_level = 3
+  session.edit_item('ZETTEL').read_text = "GEAENDERT"
+  return session
+
+def _with_payload(matrix, snapshot, **changes):
+  header = snapshot[:matrix._SNAPSHOT_HEADER.size]
+  state_diff, placement, location_diffs, item_diffs, minigame = marshal.loads(snapshot[len(header):])
+  fields = dict(state_diff=state_diff, placement=placement, location_diffs=location_diffs,
+                item_diffs=item_diffs, minigame=minigame)
+  fields.update(changes)
+  return header + marshal.dumps(tuple(fields.values()), 4)
+
+@pytest.mark.parametrize('changes', [
+    {'item_diffs': {'ZETTEL': {'detials': 'x'}}}, # Unbekanntes Feld
+    {'item_diffs': {'GIBTS_NICHT': {'name': 'x'}}}, # Unbekannter Gegenstand mit Änderungen
+    {'location_diffs': {'MOND': {'name': 'x'}}}, # Unbekannter Ort
+    {'placement': {'GIBTS_NICHT': '@INVENTAR'}},
+    {'placement': {'ZETTEL': 'MOND'}},
+    {'placement': [1, 2]},
+    {'minigame': ('gibts_nicht',)},
+])
+def test_broken_snapshot_leaves_session_untouched(matrix, changes):
+  session = _session_with_changes(matrix)
+  fresh = matrix.save_snapshot(matrix.GameSession(save_dir=None, seed=1))
+  before = (matrix.save_snapshot(session), list(session.inventory), session.game_state.key())
+  with pytest.raises(matrix.SnapshotError):
+    matrix.restore_snapshot(session, _with_payload(matrix, fresh, **changes))
+  assert (matrix.save_snapshot(session), list(session.inventory), session.game_state.key()) == before
+  assert session.items['ZETTEL'].read_text == "GEAENDERT"
@@ -0,0 +1,22 @@
+"""Solver (--solve) als Rauchtest auf der mitgelieferten Welt."""
+import pytest
+
+@pytest.fixture(scope='module')
+def report(matrix):
+  return matrix.solve(jobs=1)
+
+def test_solver_explores_the_whole_world(report):
+  assert report['complete']
+  assert report['states'] == 1943 # Ändert sich nur mit der Welt oder den Spielregeln
+  assert report['game_over_reachable']
+
+def test_solver_reports_the_furthest_line(report):
+  assert report['solution'] is None # Mit der jetzigen Alert-Bilanz nicht lösbar
+  where, path = report['furthest']
+  assert where.startswith('CAFE')
+  assert any(probability < 1 for _, probability in path) # Der Cafe-Hack gelingt nur mit Glück (ChanceRandom)
+
+def test_solver_stops_at_max_states(matrix):
+  small = matrix.solve(jobs=1, max_states=100)
+  assert not small['complete']
+  assert 100 <= small['states'] < 1943
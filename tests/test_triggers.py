@@ -0,0 +1,90 @@
+"""Ereignisse (@trigger): Neuauswertung über depends, einmalige Ereignisse, Zufall und Alarmgrenze."""
+import pytest
+
+def scripted_session(m, lines, seed=5):
+  session = m.GameSession(save_dir=None, seed=seed)
+  inputs = list(lines)
+
+  async def read_line(prompt):
+    if not inputs:
+      raise EOFError
+    return inputs.pop(0)
+
+  session.read_line = read_line
+  return session
+
+@pytest.fixture
+def fired(matrix, monkeypatch):
+  """Protokolliert (Zug, Ereignis) für jede ausgeführte Aktion."""
+  log = []
+  for name, action in list(matrix.TRIGGER_ACTIONS.items()):
+    def logged(session, name=name, action=action):
+      log.append((len(session.recording), name))
+      action(session)
+    monkeypatch.setitem(matrix.TRIGGER_ACTIONS, name, logged)
+  return log
+
+def play(m, session):
+  try:
+    m._run_sync(m.game_loop(session, intro=False))
+  except (EOFError, SystemExit):
+    pass
+
+def index_of(m, name):
+  return next(i for i, event in enumerate(m.TRIGGERS) if event.name == name)
+
+def on_the_street(m, session):
+  session.game_state.diskette_read = True
+  session.game_state.current_location = 'STRASSE'
+
+def test_condition_is_reevaluated_when_a_dependency_changes(matrix):
+  session = matrix.GameSession(save_dir=None, seed=1)
+  phone = index_of(matrix, 'phone_rings')
+  session.triggers.sync(session.game_state)
+  assert phone not in session.triggers.armed
+  on_the_street(matrix, session)
+  session.triggers.sync(session.game_state)
+  assert phone in session.triggers.armed
+  session.game_state.computer_logged_in = True
+  session.triggers.sync(session.game_state)
+  assert phone not in session.triggers.armed
+
+@pytest.mark.parametrize('seed', [1, 2, 3, 4])
+def test_phone_rings_once_on_the_turn_the_session_rng_decides(matrix, fired, seed):
+  session = scripted_session(matrix, ['SCHAU'] * 40, seed)
+  on_the_street(matrix, session)
+  rolls = matrix.SessionRandom()
+  rolls.setstate(session.rng.getstate()) # Dieselben Würfe wie die Sitzung: einer pro Zug, bis es klingelt
+  expected_turn = next(turn for turn in range(40) if rolls.one_in(8))
+  play(matrix, session)
+  assert fired == [(expected_turn, 'phone_rings')]
+  assert session.game_state.phone_ringing
+
+def test_same_seed_same_event_order(matrix, fired):
+  logs = []
+  for _ in range(2):
+    fired.clear()
+    session = scripted_session(matrix, ['SCHAU'] * 40, seed=9)
+    on_the_street(matrix, session)
+    session.game_state.alert_level = 5 # Auch die Glitches der Gruppe 'alarm' würfeln mit
+    play(matrix, session)
+    logs.append(list(fired))
+  assert logs[0] == logs[1]
+  assert {name for _, name in logs[0]} >= {'phone_rings', 'alert_glitch'}
+
+def test_alarm_fires_exactly_at_alert_limit(matrix, fired):
+  session = matrix.GameSession(save_dir=None, seed=1)
+  session.game_state.alert_level = matrix.ALERT_LIMIT - 1
+  matrix.check_alert_level(session)
+  assert 'alert_game_over' not in [name for _, name in fired]
+  matrix.increase_alert_level(session, 1)
+  with pytest.raises(SystemExit):
+    matrix.check_alert_level(session)
+  assert fired[-1] == (0, 'alert_game_over')
+
+def test_game_over_comes_before_the_next_command(matrix, fired):
+  session = scripted_session(matrix, ['NIMM ZETTEL', 'SCHAU'])
+  session.game_state.alert_level = matrix.ALERT_LIMIT
+  play(matrix, session)
+  assert fired == [(0, 'alert_game_over')] # Vor der ersten Eingabe, und die Warnung derselben Gruppe entfällt
+  assert session.recording == []
@@ -0,0 +1,34 @@
+"""Tippfehler-Vorschläge (TypoIndex): ein Fehler bekommt einen Vorschlag, zwei nicht."""
+import pytest
+
+from conftest import run_game
+
+@pytest.mark.parametrize('typo', ['NIMN', 'NIM', 'NIMMM', 'INMM'])
+def test_one_edit_verb_typo(matrix, typo):
+  assert matrix.verb_index().suggest(typo) == 'NIMM'
+
+@pytest.mark.parametrize('typo', ['ZETEL', 'ZETTTEL', 'ZTTTEL', 'ZETTLE'])
+def test_one_edit_object_typo(matrix, typo):
+  assert matrix.object_index(matrix.WORLD, 'APARTMENT').suggest(typo) == 'ZETTEL'
+
+@pytest.mark.parametrize('typo', ['NMIN', 'NIMMMM', 'ZTEL', 'ZETTELXX', 'ETZTLE'])
+def test_two_edits_get_no_suggestion(matrix, typo):
+  assert matrix.verb_index().suggest(typo) is None
+  assert matrix.object_index(matrix.WORLD, 'APARTMENT').suggest(typo) is None
+
+def test_ties_go_to_the_alphabetically_first_word(matrix):
+  index = matrix.TypoIndex(['KORTE', 'KARTE', 'KURTE'])
+  assert index.suggest('KXRTE') == 'KARTE'
+  assert index.suggest('KXRTE', accept=lambda word: word != 'KARTE') == 'KORTE'
+
+def test_known_and_short_words_get_no_suggestion(matrix):
+  index = matrix.TypoIndex(['ZETTEL', 'AB'])
+  assert index.suggest('ZETTEL') is None
+  assert index.suggest('AC') is None
+
+def test_suggestions_in_the_game():
+  result = run_game('--batch', '--terminal', 'plain', stdin="NIMN ZETTEL\nNIMM ZETEL\nSCHUA\nNIMM ZTEL\n")
+  assert "MEINTEST DU 'NIMM ZETTEL'?" in result.stdout
+  assert "MEINTEST DU 'ZETTEL'?" in result.stdout
+  assert "MEINTEST DU 'SCHAU'?" in result.stdout
+  assert result.stdout.count("MEINTEST DU") == 3 # ZTEL ist zwei Fehler entfernt
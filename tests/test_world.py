@@ -0,0 +1,70 @@
+"""Weltdatei: Fehlermeldungen von compile_world und welt.json ohne Verluste."""
+import copy
+import json
+
+import pytest
+
+from conftest import ROOT, run_game
+
+@pytest.fixture
+def data():
+  with open(ROOT / 'welt.json', encoding='utf-8') as f:
+    return json.load(f)
+
+def problems(matrix, data):
+  with pytest.raises(matrix.WorldError) as error:
+    matrix.compile_world(data)
+  return error.value.problems
+
+def fields(entry):
+  """Alle Felder eines kompilierten Eintrags in der Form der Weltdatei."""
+  out = {}
+  for field in entry.FIELDS:
+    value = getattr(entry, field)
+    out[field] = dict(value) if hasattr(value, 'items') else list(value) if isinstance(value, tuple) else value
+  return out
+
+def with_defaults(entries, cls):
+  """Die Einträge der Weltdatei mit allen Feldern (fehlende mit ihrem Standardwert)."""
+  def default(value):
+    return {} if hasattr(value, 'items') else [] if isinstance(value, tuple) else value
+  return {entry_id: {field: entry.get(field, default(value)) for field, value in cls.FIELDS.items()}
+          for entry_id, entry in entries.items()}
+
+def test_welt_json_round_trips(matrix, data):
+  world = matrix.compile_world(copy.deepcopy(data))
+  assert world.start_location == data['start_location']
+  assert {loc_id: fields(location) for loc_id, location in world.locations.items()} == \
+         with_defaults(data['locations'], matrix.Location)
+  assert {item_id: fields(item) for item_id, item in world.items.items()} == with_defaults(data['items'], matrix.Item)
+  assert list(world.locations) == list(data['locations']) # Reihenfolge wie in der Datei
+  assert world.fingerprint == matrix.WORLD.fingerprint
+
+def test_unknown_format(matrix, data):
+  data['format'] = 99
+  assert problems(matrix, data) == [f"UNBEKANNTES FORMAT 99 (ERWARTET {matrix.WORLD_FORMAT})"]
+
+def test_dangling_exit(matrix, data):
+  data['locations']['APARTMENT']['exits']['KELLER'] = 'KELLER'
+  assert problems(matrix, data) == ["ORT 'APARTMENT': AUSGANG 'KELLER' FUEHRT INS NICHTS ('KELLER')"]
+
+def test_unknown_item_location(matrix, data):
+  data['items']['ZETTEL']['location'] = 'MOND'
+  assert problems(matrix, data) == ["GEGENSTAND 'ZETTEL': STARTORT 'MOND' EXISTIERT NICHT"]
+
+def test_all_problems_are_reported_together(matrix, data):
+  data['start_location'] = 'NIRGENDWO'
+  data['items']['ZETTEL']['farbe'] = 'gelb'
+  del data['locations']['CAFE']['description']
+  found = problems(matrix, data)
+  assert "STARTORT 'NIRGENDWO' EXISTIERT NICHT" in found
+  assert "GEGENSTAND 'ZETTEL': UNBEKANNTES FELD 'farbe'" in found
+  assert "ORT 'CAFE': FELD 'description' FEHLT" in found
+
+def test_check_world_reports_problems(tmp_path, data):
+  data['locations']['APARTMENT']['exits']['KELLER'] = 'KELLER'
+  path = tmp_path / 'welt.json'
+  path.write_text(json.dumps(data), encoding='utf-8')
+  result = run_game('--check-world', str(path))
+  assert result.returncode == 1
+  assert "FEHLERHAFTE WELT:\n- ORT 'APARTMENT': AUSGANG 'KELLER' FUEHRT INS NICHTS ('KELLER')" in result.stderr